@@ -2,8 +2,7 @@ from flask import Flask, request, send_from_directory, jsonify
 from werkzeug.utils import secure_filename
 import os
 from parser import extract_text_from_pdf, analyze_resume
-from weasyprint import HTML
-import pdfplumber
+from resume_scanner import HeadingTable, scan_resume
 import re
 from flask_cors import CORS
 
@@ -79,11 +78,9 @@ def upload_file():
             optimized_filename = f"optimized_{filename}"
             optimized_file_path = os.path.join(app.config['PROCESSED_FOLDER'], optimized_filename)
 
-            # Apply reference formatting and generate final PDF
-            candidate_name, contact_info, matched_content = match_content_to_template(optimized_text)
-
-            # ✅ Ensure all required arguments are passed correctly
-            generate_final_pdf(candidate_name, contact_info, matched_content, optimized_filename)
+            # Parse the optimized text once and generate the final PDF from it
+            resume = scan_resume(optimized_text, SECTION_HEADINGS)
+            generate_final_pdf(resume, optimized_filename)
 
             return jsonify({
                 "message": "File uploaded and processed",
@@ -99,92 +96,22 @@ def download_file(filename):
     """Allow users to download processed resumes."""
     return send_from_directory(app.config['PROCESSED_FOLDER'], filename)
 
-def match_content_to_template(extracted_text):
-    """Extracts candidate name, contact details, and sections, while ensuring proper structuring."""
-
-    # Split text into lines and filter out empty ones
-    lines = [line.strip() for line in extracted_text.split("\n") if line.strip()]
-
-    candidate_name = "Candidate Name"  # Default fallback name
-    contact_info = ""  # Contact details placeholder
-    matched_content = {}
-
-    # Define expected sections (excluding "Contact Information")
-    section_titles = {
-        "summary": "Summary",
-        "experience": "Experience",
-        "education": "Education",
-        "skills": "Skills",
-        "projects": "Projects",
-        "certifications": "Certifications",
-        "activities": "Activities"
-    }
-
-    current_section = None
-    section_data = {}
-
-    # Regular expressions for contact information
-    email_pattern = re.compile(r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}")
-    phone_pattern = re.compile(r"\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}")
-    linkedin_pattern = re.compile(r"(https?://)?(www\.)?linkedin\.com/in/[a-zA-Z0-9-_/]+", re.IGNORECASE)
-    github_pattern = re.compile(r"(https?://)?(www\.)?github\.com/[a-zA-Z0-9-_/]+", re.IGNORECASE)
-
-    extracted_contact_details = {
-        "email": None,
-        "phone": None,
-        "linkedin": None,
-        "github": None
-    }
-
-    # Process each line
-    for line in lines:
-        # Extract Name (First non-empty line is assumed to be the name)
-        if candidate_name == "Candidate Name" and len(line.split()) > 1:
-            candidate_name = line.strip()
-            continue  # Skip to next line after setting the name
-
-        # Detect and extract contact details
-        if email_pattern.search(line):
-            extracted_contact_details["email"] = email_pattern.search(line).group()
-        if phone_pattern.search(line):
-            extracted_contact_details["phone"] = phone_pattern.search(line).group()
-        if linkedin_pattern.search(line):
-            extracted_contact_details["linkedin"] = linkedin_pattern.search(line).group()
-        if github_pattern.search(line):
-            extracted_contact_details["github"] = github_pattern.search(line).group()
-
-        # Identify sections
-        normalized_line = line.lower().strip().rstrip(":")  # Normalize section titles
-        if normalized_line in section_titles:
-            current_section = section_titles[normalized_line]
-            section_data[current_section] = []  # Start new section
-            continue
-
-        # Assign content to the detected section
-        if current_section:
-            section_data[current_section].append(line)
-
-    # Format contact details
-    contact_info_parts = []
-    if extracted_contact_details["phone"]:
-        contact_info_parts.append(f"{extracted_contact_details['phone']}")
-    if extracted_contact_details["email"]:
-        contact_info_parts.append(f"<a href='mailto:{extracted_contact_details['email']}'>{extracted_contact_details['email']}</a>")
-    if extracted_contact_details["linkedin"]:
-        contact_info_parts.append(f"<a href='{extracted_contact_details['linkedin']}' target='_blank'>LinkedIn</a>")
-    if extracted_contact_details["github"]:
-        contact_info_parts.append(f"<a href='{extracted_contact_details['github']}' target='_blank'>GitHub</a>")
-
-    contact_info = " | ".join(contact_info_parts) if contact_info_parts else "No contact info found."
-
-    # Convert lists into formatted text
-    for section, content_lines in section_data.items():
-        matched_content[section] = "\n".join(content_lines)
-
-    return candidate_name, contact_info, matched_content
-def generate_final_pdf(candidate_name, contact_info, matched_content, output_filename):
-    """Generate a PDF using WeasyPrint with formatted sections and blue headings, ensuring a one-page layout."""
+# Section titles this endpoint lays out (excluding "Contact Information")
+SECTION_HEADINGS = HeadingTable({
+    "summary": "Summary",
+    "experience": "Experience",
+    "education": "Education",
+    "skills": "Skills",
+    "projects": "Projects",
+    "certifications": "Certifications",
+    "activities": "Activities"
+})
+
+def generate_final_pdf(resume, output_filename):
+    """Generate a PDF of a parsed Resume using WeasyPrint with formatted sections and blue headings, ensuring a one-page layout."""
     final_output_path = os.path.abspath(os.path.join(PROCESSED_FOLDER, output_filename))
+    candidate_name = resume.name or "Candidate Name"
+    contact_info = resume.contact.as_html() or "No contact info found."
     
     html_content = f"""
     <html>
@@ -261,13 +188,13 @@ def generate_final_pdf(candidate_name, contact_info, matched_content, output_fil
     """
 
     # Add sections dynamically, ensuring no duplicate headers
-    for section_title, section_content in matched_content.items():
-        if not section_content.strip():
+    for section in resume.sections.values():
+        if not section.lines:
             continue  # Skip empty sections
 
-        html_content += f"<div class='section'><h2>{section_title}</h2><hr>"
+        html_content += f"<div class='section'><h2>{section.title}</h2><hr>"
 
-        for line in section_content.split('\n'):
+        for line in section.lines:
             # Make sure links are clickable
             if "http" in line or "www." in line:
                 line = re.sub(r"(https?://[^\s]+)", r'<a href="\1" target="_blank">\1</a>', line)
@@ -283,7 +210,8 @@ def generate_final_pdf(candidate_name, contact_info, matched_content, output_fil
     </html>
     """
 
-    # Save PDF
+    # Save PDF (WeasyPrint is imported here; it is slow to load)
+    from weasyprint import HTML
     HTML(string=html_content).write_pdf(final_output_path)
     return final_output_path
 
@@ -1,10 +1,32 @@
-from flask import Flask, request, send_from_directory, jsonify
+from flask import Flask, Response, request, send_from_directory, jsonify
+from werkzeug.datastructures import MultiDict
 from werkzeug.utils import secure_filename
+import json
 import os
-import re
+import tempfile
+import time
+import uuid
 from dotenv import load_dotenv
-from parser import extract_text_from_pdf, analyze_resume
-from weasyprint import HTML
+import parser
+from parser import (
+    extract_text_cached,
+    extract_texts_cached,
+    file_sha256,
+    analyze_resume_streaming,
+    analyze_resume_streaming_many,
+    unique_categories,
+    find_near_duplicate,
+    TEXT_CACHE,
+    ANALYSIS_CACHE,
+)
+from job_queue import JobQueue, QueueFullError
+from ats_scorer import score_resume_many
+from ranking import ANALYZERS, rank_texts
+from search_index import get_search_index, index_resume, resume_key
+from near_dup import get_near_dup_index, owner_key
+from resume_scanner import HTML_HEADINGS, scan_resume
+from pdf_engines import ENGINES
+from llm_client import get_llm_client
 from flask_cors import CORS
 
 # Load environment variables from key.env file in root directory
@@ -16,6 +38,19 @@ print(f"🔍 .env file path: {os.path.join(os.getcwd(), '../key.env')}")
 app = Flask(__name__)
 CORS(app)
 
+def warm_up():
+    """
+    Import WeasyPrint and set up the parser's LLM client ahead of the first
+    upload. Runs at start-up when RESUME_WARMUP=1; worker start-up hooks can
+    also call it directly.
+    """
+    print("🔥 Warming up WeasyPrint and the LLM client...")
+    import weasyprint  # noqa: F401
+    parser.warm_up(nlp=False)
+
+if os.getenv("RESUME_WARMUP") == "1":
+    warm_up()
+
 @app.route('/')
 def home():
     return "Resume Analyzer Backend is Running!"
@@ -29,6 +64,12 @@ os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 os.makedirs(PROCESSED_FOLDER, exist_ok=True)
 os.makedirs(REFERENCE_FOLDER, exist_ok=True)
 
+# Bounded worker pool that runs the upload pipeline off the request thread
+job_queue = JobQueue()
+
+# Most job categories one upload may be analyzed for
+MAX_CATEGORIES = int(os.getenv("RESUME_MAX_CATEGORIES", "5"))
+
 @app.route('/upload_template', methods=['POST'])
 def upload_template():
     """
@@ -49,8 +90,18 @@ def upload_template():
 @app.route('/upload', methods=['POST'])
 def upload_file():
     """
-    Upload and process a user resume, applying an AI-optimized rewrite and
-    final PDF formatting (blue/white style).
+    Accept a user resume and queue it for processing. The AI rewrite and
+    final PDF formatting (blue/white style) run on the worker pool; poll
+    /jobs/<job_id> for progress and /jobs/<job_id>/result for the output.
+
+    Send job_category several times (or a comma-separated job_categories)
+    to analyze the resume for several roles in one job: the text is
+    extracted once and the result is keyed by category.
+
+    An optional client_id (a random id the client keeps, at least 16
+    characters) lets the upload be compared with that client's earlier
+    uploads and found again through /search; uploads are never compared
+    or searched across clients.
     """
     try:
         print("🔍 Starting resume upload process...")
@@ -71,66 +122,53 @@ def upload_file():
         
         if not file.filename.lower().endswith('.pdf'):
             return jsonify({"error": "Invalid file format. Only PDFs are allowed."}), 400
-            
-        print(f"📁 Processing file: {file.filename}")
-        filename = secure_filename(file.filename)
-        file_path = os.path.join(UPLOAD_FOLDER, filename)
-        file.save(file_path)
-        print(f"✅ File saved to: {file_path}")
-
-        # Extract text from the uploaded PDF
-        print("📖 Extracting text from PDF...")
-        resume_text = extract_text_from_pdf(file_path)
-        print(f"✅ Extracted {len(resume_text)} characters")
-
-        # (Optional) check for a job_category in the POST form data
-        job_category = request.form.get('job_category', 'General')
-        print(f"🎯 Job category: {job_category}")
 
-        # Check OpenAI API key
+        # Check OpenAI API key up front so the client gets an immediate error
         api_key = os.getenv("OPENAI_API_KEY")
         if not api_key:
             print("❌ OPENAI_API_KEY not found in environment")
             return jsonify({"error": "OpenAI API key not configured"}), 500
         print(f"🔑 API key found: {api_key[:10]}...")
+            
+        # (Optional) one or more job categories in the POST form data
+        job_categories = requested_categories(request.form)
+        if len(job_categories) > MAX_CATEGORIES:
+            return jsonify({"error": f"Too many job categories (at most {MAX_CATEGORIES})."}), 400
+        print(f"🎯 Job categories: {', '.join(job_categories)}")
+
+        # (Optional) PDF extraction engine; defaults to PDF_ENGINE
+        pdf_engine = request.form.get('pdf_engine') or None
+        if pdf_engine and pdf_engine not in ENGINES:
+            return jsonify({"error": f"Unknown pdf_engine. Choose one of: {', '.join(ENGINES)}"}), 400
+
+        # Near-duplicate checks and search only look at this client's own uploads
+        owner = owner_key(request.form.get('client_id'))
+
+        # The job reads the file later, so two uploads of "resume.pdf" must
+        # not share a path (or an output file): prefix a unique id
+        print(f"📁 Processing file: {file.filename}")
+        filename = f"{uuid.uuid4().hex}_{secure_filename(file.filename)}"
+        file_path = os.path.join(UPLOAD_FOLDER, filename)
+        file.save(file_path)
+        print(f"✅ File saved to: {file_path}")
 
-        # 1) Send the resume text to OpenAI for optimization
-        print("🤖 Calling OpenAI API...")
-        feedback = analyze_resume(resume_text, job_category)
-
-        # 2) If successful, get the optimized text
-        if "optimized_resume" in feedback:
-            print("✅ OpenAI API call successful")
-            optimized_text = feedback["optimized_resume"]
-
-            # Generate a new PDF that visually matches your desired style
-            optimized_filename = f"optimized_{filename}"
-            optimized_file_path = os.path.join(PROCESSED_FOLDER, optimized_filename)
-
-            # 3) Extract structured content (name, contact, sections) from optimized text
-            candidate_name, contact_info, matched_content = match_content_to_template(optimized_text)
-
-            # 4) Build final PDF with the color scheme, fonts, and layout you want
-            generate_final_pdf(
-                candidate_name=candidate_name,
-                contact_info=contact_info,
-                matched_content=matched_content,
-                output_filename=optimized_filename
-            )
-
-            # Print the link to the console (for easy copy-paste)
-            download_link = f"/download/{optimized_filename}"
-            print(f"✅ Your download link is: {download_link}")
-
-            # Return JSON with the same link
-            return jsonify({
-                "message": f"File uploaded and processed successfully. Download your optimized resume at: {download_link}",
-                "download_url": download_link,
-                "ai_feedback": feedback  # <--- include the entire feedback dict
-            }), 200
-        else:
-            print(f"❌ OpenAI API failed: {feedback}")
-            return jsonify({"error": "Failed to optimize resume"}), 500
+        try:
+            if len(job_categories) == 1:
+                job_id = job_queue.submit(process_resume, file_path, filename, job_categories[0], pdf_engine, owner)
+            else:
+                job_id = job_queue.submit(process_resume_many, file_path, filename, job_categories, pdf_engine, owner)
+        except QueueFullError as e:
+            remove_upload(file_path)
+            return jsonify({"error": str(e)}), 503
+        print(f"📬 Queued job {job_id}")
+
+        return jsonify({
+            "message": "File uploaded and queued for processing.",
+            "job_id": job_id,
+            "status_url": f"/jobs/{job_id}",
+            "events_url": f"/jobs/{job_id}/events",
+            "result_url": f"/jobs/{job_id}/result"
+        }), 202
             
     except Exception as e:
         print(f"❌ Error in upload_file: {str(e)}")
@@ -138,115 +176,420 @@ def upload_file():
         traceback.print_exc()
         return jsonify({"error": f"Server error: {str(e)}"}), 500
 
-@app.route('/download/<filename>', methods=['GET'])
-def download_file(filename):
+def requested_categories(form):
+    """Job categories from repeated job_category fields and/or a comma-separated job_categories."""
+    job_categories = form.getlist('job_category')
+    if form.get('job_categories'):
+        job_categories += form['job_categories'].split(',')
+    return unique_categories(job_categories) or ['General']
+
+@app.route('/score', methods=['POST'])
+def score():
     """
-    Allow users to download processed resumes.
+    Quick local ATS keyword score, no AI call: how many of the job
+    category's lexicon keywords the resume contains, plus the matched and
+    missing ones. Send a PDF as 'file' or plain 'text', and job categories
+    as for /upload; the response is keyed by category.
     """
-    return send_from_directory(PROCESSED_FOLDER, filename)
-
-def match_content_to_template(extracted_text):
-    """
-    Parse the optimized resume text to find:
-      - candidate name (first line)
-      - contact info (phone, email, LinkedIn, GitHub)
-      - sections (Skills, Projects, Education, etc.)
-    Return them so we can place them into the final PDF with consistent styling.
-    """
-    # Split text into lines
-    lines = [line.strip() for line in extracted_text.split("\n") if line.strip()]
-
-    # Defaults
-    candidate_name = "Candidate Name"
-    contact_info = ""
-    matched_content = {}
-
-    # Our recognized section titles
-    section_titles = {
-        "summary": "Summary",
-        "skills": "Skills",
-        "technical skills": "Technical Skills",
-        "technical experience": "Technical Skills",   # If GPT sometimes calls it “Technical Experience”
-        "experience": "Experience",
-        "leadership": "Leadership Experience",
-        "leadership roles": "Leadership Experience",
-        "leadership experience": "Leadership Experience",
-        "volunteer": "Volunteer Experience",
-        "volunteer work": "Volunteer Experience",
-        "volunteer experience": "Volunteer Experience",
-        "projects": "Projects",
-        "education": "Education",
-        "certifications": "Certifications",
-        "activities": "Activities",
-        "awards": "Awards"
-    }
-
-    current_section = None
-    section_data = {}
-
-    # Regex for contact info
-    email_pattern = re.compile(r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}")
-    phone_pattern = re.compile(r"\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}")
-    linkedin_pattern = re.compile(r"(https?://)?(www\.)?linkedin\.com/in/[a-zA-Z0-9-_/]+", re.IGNORECASE)
-    github_pattern = re.compile(r"(https?://)?(www\.)?github\.com/[a-zA-Z0-9-_/]+", re.IGNORECASE)
-
-    extracted_contact_details = {
-        "email": None,
-        "phone": None,
-        "linkedin": None,
-        "github": None
+    # Form fields, or the same fields as a JSON body
+    form = request.form if not request.is_json else MultiDict(request.get_json(silent=True) or {})
+    job_categories = requested_categories(form)
+    if len(job_categories) > MAX_CATEGORIES:
+        return jsonify({"error": f"Too many job categories (at most {MAX_CATEGORIES})."}), 400
+
+    start = time.perf_counter()
+    if 'file' in request.files:
+        file = request.files['file']
+        if not file.filename.lower().endswith('.pdf'):
+            return jsonify({"error": "Invalid file format. Only PDFs are allowed."}), 400
+        # Only the text is needed, so the upload is not kept
+        with tempfile.NamedTemporaryFile(suffix=".pdf", dir=UPLOAD_FOLDER) as tmp:
+            file.save(tmp)
+            tmp.flush()
+            resume_text = extract_text_cached(tmp.name)
+    elif form.get('text'):
+        resume_text = form.get('text')
+    else:
+        return jsonify({"error": "Send a PDF as 'file' or the resume as 'text'"}), 400
+
+    if not resume_text.strip():
+        return jsonify({"error": "Resume text is empty or could not be extracted."}), 400
+
+    return jsonify({
+        "scores": score_resume_many(resume_text, job_categories),
+        "elapsed_ms": round((time.perf_counter() - start) * 1000, 2)
+    }), 200
+
+@app.route('/rank', methods=['POST'])
+def rank():
+    """
+    Rank resumes against a job description by TF-IDF similarity, no AI
+    call. Send job_description plus resume PDFs as 'files' (repeat the
+    field); with no files, send client_id instead to rank the caller's
+    past uploads (the text kept for /search; result ids are their
+    resume_id). Optional top_k (default 10) and analyzer ("tokens" or
+    "keywords").
+    """
+    form = request.form if not request.is_json else MultiDict(request.get_json(silent=True) or {})
+    job_description = form.get('job_description', '')
+    if not job_description.strip():
+        return jsonify({"error": "job_description is required"}), 400
+
+    analyzer = form.get('analyzer') or None
+    if analyzer and analyzer not in ANALYZERS:
+        return jsonify({"error": f"Unknown analyzer. Choose one of: {', '.join(ANALYZERS)}"}), 400
+    try:
+        top_k = int(form.get('top_k', 10))
+    except ValueError:
+        return jsonify({"error": "top_k must be an integer"}), 400
+
+    start = time.perf_counter()
+    texts = {}
+    names = {}
+    files = request.files.getlist('files')
+    if files:
+        with tempfile.TemporaryDirectory(dir=UPLOAD_FOLDER) as tmp_dir:
+            doc_ids, pdf_paths = [], []
+            for position, file in enumerate(files):
+                if not file.filename.lower().endswith('.pdf'):
+                    return jsonify({"error": f"Invalid file format for {file.filename}. Only PDFs are allowed."}), 400
+                pdf_path = os.path.join(tmp_dir, f"{position}.pdf")
+                file.save(pdf_path)
+                name = secure_filename(file.filename)
+                doc_ids.append(name if name not in doc_ids else f"{name}#{position}")
+                pdf_paths.append(pdf_path)
+            # One batch, so uncached PDFs are extracted side by side on the process pool
+            texts = dict(zip(doc_ids, extract_texts_cached(pdf_paths)))
+    else:
+        owner = owner_key(form.get('client_id'))
+        if not owner:
+            return jsonify({"error": "Send resume PDFs as 'files', or a client_id to rank past uploads"}), 400
+        index = get_search_index()
+        for record in index.owned(owner):
+            text = index.text(record["key"])
+            if text:
+                texts[record["sha256"]] = text
+                names[record["sha256"]] = record["name"]
+
+    if not texts:
+        return jsonify({"error": "No resumes to rank"}), 400
+
+    results = rank_texts(job_description, texts, k=top_k, analyzer=analyzer)
+    for result in results:
+        if result["id"] in names:
+            result["name"] = names[result["id"]]
+    return jsonify({
+        "documents": len(texts),
+        "results": results,
+        "elapsed_ms": round((time.perf_counter() - start) * 1000, 2)
+    }), 200
+
+@app.route('/search', methods=['GET'])
+def search():
+    """
+    Search the caller's past uploads by content. client_id is the id the
+    uploads were sent with; only those uploads are searched. q supports
+    AND (space), OR, NOT or a leading "-", "quoted phrases" and
+    kw:<keyword>; limit caps the results (newest first, default 20). Each
+    result's text_url returns the resume's extracted text (send the same
+    client_id), since the uploaded file itself is not kept.
+    """
+    owner = owner_key(request.args.get('client_id'))
+    if not owner:
+        return jsonify({"error": "client_id is required"}), 400
+    query = request.args.get('q', '')
+    if not query.strip():
+        return jsonify({"error": "q is required"}), 400
+    try:
+        limit = int(request.args.get('limit', 20))
+    except ValueError:
+        return jsonify({"error": "limit must be an integer"}), 400
+
+    start = time.perf_counter()
+    total, records = get_search_index().search(query, limit=limit, owner=owner)
+    return jsonify({
+        "query": query,
+        "total": total,
+        "results": [{
+            "resume_id": record["sha256"],
+            "name": record["name"],
+            "indexed_at": record["indexed_at"],
+            "chars": record["chars"],
+            "text_url": f"/search/resumes/{record['sha256']}"
+        } for record in records],
+        "elapsed_ms": round((time.perf_counter() - start) * 1000, 2)
+    }), 200
+
+@app.route('/search/resumes/<resume_id>', methods=['GET'])
+def search_resume_text(resume_id):
+    """The extracted text of one of the caller's indexed uploads (client_id as for /search)."""
+    owner = owner_key(request.args.get('client_id'))
+    if not owner:
+        return jsonify({"error": "client_id is required"}), 400
+    key = resume_key(owner, resume_id)
+    index = get_search_index()
+    record = index.get(key)
+    text = index.text(key) if record is not None else None
+    if text is None:
+        return jsonify({"error": "Resume not found"}), 404
+    return jsonify({
+        "resume_id": resume_id,
+        "name": record["name"],
+        "indexed_at": record["indexed_at"],
+        "text": text
+    }), 200
+
+def process_resume(job, file_path, filename, job_category, pdf_engine=None, owner=None):
+    """
+    Run the full resume pipeline for one queued upload: extract the text,
+    get the AI rewrite, and render the final PDF. Returns the same payload
+    /upload used to return synchronously.
+    """
+    resume_text = extract_for_job(job, file_path, pdf_engine, owner)
+
+    # Cheap local checks first, so clients have something right away
+    ats_score = score_resume_many(resume_text, [job_category])[job_category]
+    job_queue.publish(job, "ats_score", ats_score)
+    near_duplicate = report_near_duplicate(job, resume_text, owner)
+
+    # 1) Send the resume text to OpenAI for optimization
+    job_queue.set_stage(job, "analyzing")
+    print("🤖 Calling OpenAI API...")
+    # Stream the answer so clients on /jobs/<id>/events see each field early
+    feedback = analyze_resume_streaming(
+        resume_text,
+        job_category,
+        on_field=lambda name, value: job_queue.publish(job, "field", {"name": name, "value": value}),
+        owner=owner
+    )
+
+    # 2) If successful, get the optimized text
+    if "optimized_resume" not in feedback:
+        print(f"❌ OpenAI API failed: {feedback}")
+        raise RuntimeError("Failed to optimize resume")
+
+    print("✅ OpenAI API call successful")
+
+    # 3) Generate a new PDF that visually matches your desired style
+    job_queue.set_stage(job, "rendering")
+    download_link = render_optimized_pdf(feedback["optimized_resume"], f"optimized_{filename}")
+
+    return {
+        "message": f"File uploaded and processed successfully. Download your optimized resume at: {download_link}",
+        "download_url": download_link,
+        "ai_feedback": feedback,  # <--- include the entire feedback dict
+        "ats_score": ats_score,
+        "near_duplicate": near_duplicate
     }
 
-    for line in lines:
-        # 1) First non-empty line after the AI rewrite is typically the candidate name
-        if candidate_name == "Candidate Name" and len(line.split()) > 1:
-            candidate_name = line.strip()
+def process_resume_many(job, file_path, filename, job_categories, pdf_engine=None, owner=None):
+    """
+    process_resume for several job categories: the text is extracted once,
+    the analyses run concurrently, and one PDF is rendered per category.
+    Categories whose analysis failed carry an error instead; the job only
+    fails if every category did.
+    """
+    resume_text = extract_for_job(job, file_path, pdf_engine, owner)
+
+    ats_scores = score_resume_many(resume_text, job_categories)
+    for ats_score in ats_scores.values():
+        job_queue.publish(job, "ats_score", ats_score)
+    near_duplicate = report_near_duplicate(job, resume_text, owner)
+
+    job_queue.set_stage(job, "analyzing")
+    print(f"🤖 Calling OpenAI API for {len(job_categories)} categories...")
+    feedback_by_category = analyze_resume_streaming_many(
+        resume_text,
+        job_categories,
+        on_field=lambda category, name, value: job_queue.publish(
+            job, "field", {"category": category, "name": name, "value": value}
+        ),
+        owner=owner
+    )
+
+    job_queue.set_stage(job, "rendering")
+    results = {}
+    used_names = set()
+    for category, feedback in feedback_by_category.items():
+        if "optimized_resume" not in feedback:
+            print(f"❌ OpenAI API failed for {category}: {feedback}")
+            results[category] = {"error": feedback.get("error", "Failed to optimize resume"), "ats_score": ats_scores[category]}
             continue
 
-        # 2) Contact info detection
-        if email_pattern.search(line):
-            extracted_contact_details["email"] = email_pattern.search(line).group()
-        if phone_pattern.search(line):
-            extracted_contact_details["phone"] = phone_pattern.search(line).group()
-        if linkedin_pattern.search(line):
-            extracted_contact_details["linkedin"] = linkedin_pattern.search(line).group()
-        if github_pattern.search(line):
-            extracted_contact_details["github"] = github_pattern.search(line).group()
-
-        # 3) Section detection
-        normalized_line = line.lower().strip().rstrip(":")
-        if normalized_line in section_titles:
-            current_section = section_titles[normalized_line]
-            section_data[current_section] = []
-            continue
+        slug = secure_filename(category).lower() or "category"
+        if slug in used_names:
+            slug = f"{slug}_{len(used_names)}"
+        used_names.add(slug)
+        download_link = render_optimized_pdf(feedback["optimized_resume"], f"optimized_{slug}_{filename}")
+        results[category] = {"download_url": download_link, "ai_feedback": feedback, "ats_score": ats_scores[category]}
+
+    if not any("download_url" in result for result in results.values()):
+        raise RuntimeError("Failed to optimize resume")
+
+    return {
+        "message": f"File uploaded and processed for {len(results)} job categories.",
+        "categories": list(results),
+        "results": results,
+        "near_duplicate": near_duplicate
+    }
 
-        # 4) If we are in a recognized section, add content to it
-        if current_section:
-            section_data[current_section].append(line)
+def extract_for_job(job, file_path, pdf_engine=None, owner=None):
+    """
+    Extract the upload's text, reporting per-page progress on the job,
+    and index it for owner's searches (nothing is indexed without an
+    owner). The upload is deleted afterwards (the text is all the job and
+    the search index need), whether or not extraction worked.
+    """
+    try:
+        job_queue.set_stage(job, "extracting")
+        print("📖 Extracting text from PDF...")
+        resume_text = extract_text_cached(
+            file_path,
+            on_page=lambda page_number: job_queue.set_stage(job, f"extracting page {page_number}"),
+            engine=pdf_engine
+        )
+        print(f"✅ Extracted {len(resume_text)} characters")
 
-    # Build contact info line
-    contact_info_parts = []
-    if extracted_contact_details["phone"]:
-        contact_info_parts.append(extracted_contact_details["phone"])
-    if extracted_contact_details["email"]:
-        email_str = extracted_contact_details["email"]
-        contact_info_parts.append(f"<a href='mailto:{email_str}'>{email_str}</a>")
-    if extracted_contact_details["linkedin"]:
-        contact_info_parts.append(f"<a href='{extracted_contact_details['linkedin']}' target='_blank'>LinkedIn</a>")
-    if extracted_contact_details["github"]:
-        contact_info_parts.append(f"<a href='{extracted_contact_details['github']}' target='_blank'>GitHub</a>")
+        # Keep past uploads searchable; a failure here must not fail the upload
+        try:
+            if owner:
+                sha256 = file_sha256(file_path)
+                # Drop the unique prefix the upload was saved under
+                name = os.path.basename(file_path).split("_", 1)[-1]
+                index_resume(resume_key(owner, sha256), resume_text, sha256=sha256, owner=owner, name=name)
+        except Exception as e:
+            print(f"⚠️ Could not index {file_path} for search: {str(e)}")
+        return resume_text
+    finally:
+        remove_upload(file_path)
+
+def remove_upload(file_path):
+    try:
+        os.remove(file_path)
+    except FileNotFoundError:
+        pass
 
-    contact_info = " | ".join(contact_info_parts) if contact_info_parts else ""
+def report_near_duplicate(job, resume_text, owner=None):
+    """Publish how similar this upload is to the owner's earlier resume, if it is a near-duplicate."""
+    try:
+        near_duplicate = find_near_duplicate(resume_text, owner)
+    except Exception as e:
+        print(f"⚠️ Near-duplicate check failed: {str(e)}")
+        return None
+    if near_duplicate:
+        print(f"♻️ Near-duplicate of an earlier resume (similarity {near_duplicate['similarity']})")
+        job_queue.publish(job, "near_duplicate", near_duplicate)
+    return near_duplicate
+
+def render_optimized_pdf(optimized_text, optimized_filename):
+    """Lay out the optimized resume text as the final PDF and return its download link."""
+    # Parse the optimized text once (name, contact, sections) and lay it out
+    resume = scan_resume(optimized_text, HTML_HEADINGS)
+    generate_final_pdf(resume, output_filename=optimized_filename)
+
+    # Print the link to the console (for easy copy-paste)
+    download_link = f"/download/{optimized_filename}"
+    print(f"✅ Your download link is: {download_link}")
+    return download_link
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    """
+    Report the status and current pipeline stage of a queued upload.
+    """
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+
+    return jsonify({
+        "job_id": job["id"],
+        "status": job["status"],
+        "stage": job["stage"],
+        "error": job["error"],
+        "events_url": f"/jobs/{job_id}/events",
+        "result_url": f"/jobs/{job_id}/result"
+    }), 200
+
+@app.route('/jobs/<job_id>/events', methods=['GET'])
+def job_events(job_id):
+    """
+    Server-Sent Events stream for a queued upload: "stage" events as the
+    pipeline advances, an "ats_score" event with the local keyword score
+    per category, a "near_duplicate" event if the resume closely matches an
+    earlier one from the same client, a "field" event for each piece of AI feedback as
+    soon as it is generated (tagged with its category for multi-category
+    uploads), then a final "done" or "failed" event.
+    """
+    if job_queue.get(job_id) is None:
+        return jsonify({"error": "Job not found"}), 404
 
-    # Convert section content arrays into strings
-    for section_title, lines_in_section in section_data.items():
-        matched_content[section_title] = "\n".join(lines_in_section)
+    # Resume where a reconnecting EventSource left off
+    try:
+        cursor = int(request.headers.get('Last-Event-ID') or request.args.get('after') or 0)
+    except ValueError:
+        return jsonify({"error": "Last-Event-ID and after must be integers"}), 400
+    if cursor < 0:
+        return jsonify({"error": "Last-Event-ID and after must not be negative"}), 400
+
+    def stream():
+        position = cursor
+        while True:
+            events, finished = job_queue.wait_for_events(job_id, position)
+            if events is None:
+                return
+            for event in events:
+                position += 1
+                yield f"id: {position}\nevent: {event['event']}\ndata: {json.dumps(event['data'])}\n\n"
+            if finished:
+                return
+            if not events:
+                yield ": keep-alive\n\n"
+
+    return Response(stream(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+@app.route('/jobs/<job_id>/result', methods=['GET'])
+def job_result(job_id):
+    """
+    Return the processed resume payload once the job has finished.
+    Responds 202 while the job is still queued or running.
+    """
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+
+    if job["status"] == "done":
+        return jsonify(job["result"]), 200
+    if job["status"] == "failed":
+        return jsonify({"error": job["error"]}), 500
+    return jsonify({"job_id": job["id"], "status": job["status"], "stage": job["stage"]}), 202
+
+@app.route('/stats', methods=['GET'])
+def stats():
+    """
+    Report cache hit/miss counters, LLM retry/circuit breaker metrics, and
+    search and near-duplicate index sizes for this worker process.
+    """
+    return jsonify({
+        "pdf_text_cache": TEXT_CACHE.stats(),
+        "analysis_cache": ANALYSIS_CACHE.stats(),
+        "llm": get_llm_client().metrics(),
+        "search_index": get_search_index().stats(),
+        "near_duplicates": get_near_dup_index().stats()
+    }), 200
 
-    return candidate_name, contact_info, matched_content
+@app.route('/download/<filename>', methods=['GET'])
+def download_file(filename):
+    """
+    Allow users to download processed resumes.
+    """
+    return send_from_directory(PROCESSED_FOLDER, filename)
 
-def generate_final_pdf(candidate_name, contact_info, matched_content, output_filename):
+def generate_final_pdf(resume, output_filename):
     """
-    Generate a PDF using WeasyPrint with styling:
+    Generate a PDF of a parsed Resume using WeasyPrint with styling:
       - Name in the center, large
       - Phone & Email on the left, smaller
       - LinkedIn & GitHub on the right, smaller
@@ -257,11 +600,11 @@ def generate_final_pdf(candidate_name, contact_info, matched_content, output_fil
     
     """
     final_output_path = os.path.join(PROCESSED_FOLDER, output_filename)
+    candidate_name = resume.name or "Candidate Name"
+    contact_info = resume.contact.as_html()
 
-    # 1) Extract 'Education' so we can render it first
-    education_content = None
-    if "Education" in matched_content:
-        education_content = matched_content.pop("Education")
+    # 1) 'Education' is rendered first, then the rest in the order they're found
+    sections = sorted(resume.sections.values(), key=lambda section: section.title != "Education")
 
     # 2) Build the HTML/CSS
     html_content = f"""
@@ -327,33 +670,17 @@ def generate_final_pdf(candidate_name, contact_info, matched_content, output_fil
         <hr />
     """
 
-    # 3) Place 'Education' first (if present)
-    if education_content and education_content.strip():
-        html_content += """
-        <div class="section">
-            <div class="section-title">Education</div>
-            <hr />
-            <ul>
-        """
-        # Split lines and remove empty ones
-        lines = [line.strip() for line in education_content.split("\n") if line.strip()]
-        for line in lines:
-            html_content += f"<li>{line}</li>"
-        html_content += "</ul></div>"
-
-    # 4) Render remaining sections in the order they're found
-    for section_title, content in matched_content.items():
-        if not content.strip():
+    # 3) One list per section; each line becomes a bullet point
+    for section in sections:
+        if not section.lines:
             continue  # Skip empty sections
         html_content += f"""
         <div class="section">
-            <div class="section-title">{section_title}</div>
+            <div class="section-title">{section.title}</div>
             <hr />
             <ul>
         """
-        lines = [line.strip() for line in content.split("\n") if line.strip()]
-        for line in lines:
-            html_content += f"<li>{line}</li>"
+        html_content += "".join(f"<li>{line}</li>" for line in section.lines)
         html_content += "</ul></div>"
 
     # Close the HTML
@@ -362,7 +689,8 @@ def generate_final_pdf(candidate_name, contact_info, matched_content, output_fil
     </html>
     """
 
-    # 5) Write PDF with WeasyPrint
+    # 4) Write PDF with WeasyPrint (imported here; it is slow to load)
+    from weasyprint import HTML
     HTML(string=html_content).write_pdf(final_output_path)
     return final_output_path
 
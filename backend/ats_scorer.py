@@ -0,0 +1,165 @@
+import os
+import re
+import threading
+
+# Tab-separated keyword lexicon: category, weight, keyword|alias|... (override with ATS_LEXICON_PATH)
+LEXICON_PATH = os.getenv(
+    "ATS_LEXICON_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "lexicon", "category_keywords.tsv"),
+)
+# Lexicon used when a job category matches none of the lexicon's categories
+DEFAULT_CATEGORY = "general"
+
+# Words keep the punctuation that is part of skill names (c++, c#, node.js);
+# other punctuation, including "-" and "/", separates words
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#.]*[a-z0-9+#]|[a-z0-9]")
+
+
+def tokenize(text):
+    """Lowercase text and split it into keyword tokens."""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class Lexicon:
+    """
+    Per-category keyword lists loaded from the TSV lexicon. Every keyword
+    has a weight and one or more spellings, each stored as its tokens
+    joined by single spaces so a lookup is one set membership test.
+    """
+
+    def __init__(self, categories):
+        # {category: [(keyword, weight, (spelling, ...)), ...]}
+        self.categories = categories
+        self.max_ngram = max(
+            (len(spelling.split()) for keywords in categories.values()
+             for _, _, spellings in keywords for spelling in spellings),
+            default=1,
+        )
+
+    @classmethod
+    def load(cls, path=LEXICON_PATH):
+        categories = {}
+        with open(path, encoding="utf-8") as f:
+            for line_number, line in enumerate(f, start=1):
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                try:
+                    category, weight, keyword = line.split("\t")
+                    weight = float(weight)
+                except ValueError:
+                    raise ValueError(f"{path}:{line_number}: expected 'category<TAB>weight<TAB>keyword'")
+                spellings = tuple(" ".join(tokenize(spelling)) for spelling in keyword.split("|"))
+                categories.setdefault(category.strip().lower(), []).append(
+                    (keyword.split("|")[0].strip(), weight, tuple(s for s in spellings if s))
+                )
+        return cls(categories)
+
+    def resolve(self, job_category):
+        """
+        Lexicon category for a free-form job category: an exact match, else
+        the category sharing the most word stems ("Data Scientist" → "data
+        science"), else DEFAULT_CATEGORY.
+        """
+        wanted = " ".join(job_category.lower().split())
+        if wanted in self.categories:
+            return wanted
+
+        stems = {token[:5] for token in tokenize(wanted)}
+        best, best_overlap = DEFAULT_CATEGORY, 0
+        for category in self.categories:
+            overlap = len(stems & {token[:5] for token in tokenize(category)})
+            if overlap > best_overlap:
+                best, best_overlap = category, overlap
+        return best
+
+
+_lexicon = None
+_lexicon_lock = threading.Lock()
+
+
+def get_lexicon():
+    """Return the lexicon, loading it from LEXICON_PATH on first use."""
+    global _lexicon
+    if _lexicon is None:
+        with _lexicon_lock:
+            if _lexicon is None:
+                _lexicon = Lexicon.load()
+    return _lexicon
+
+
+def resume_terms(text, max_ngram):
+    """Every token of text plus every run of up to max_ngram consecutive tokens."""
+    tokens = tokenize(text)
+    terms = set(tokens)
+    for n in range(2, max_ngram + 1):
+        terms.update(" ".join(tokens[i:i + n]) for i in range(len(tokens) - n + 1))
+    return terms
+
+
+def score_terms(terms, job_category, lexicon=None):
+    """Score an already tokenized resume (see resume_terms) for one job category."""
+    lexicon = lexicon or get_lexicon()
+    category = lexicon.resolve(job_category)
+    keywords = lexicon.categories.get(category, [])
+
+    matched, missing = [], []
+    matched_weight = total_weight = 0.0
+    for keyword, weight, spellings in keywords:
+        total_weight += weight
+        if any(spelling in terms for spelling in spellings):
+            matched.append(keyword)
+            matched_weight += weight
+        else:
+            missing.append((keyword, weight))
+
+    # Most important gaps first
+    missing.sort(key=lambda item: -item[1])
+    return {
+        "job_category": job_category,
+        "lexicon_category": category,
+        "score": round(100 * matched_weight / total_weight) if total_weight else 0,
+        "matched": matched,
+        "missing": [keyword for keyword, _ in missing],
+    }
+
+
+def score_resume(text, job_category, lexicon=None):
+    """
+    Score resume text against the keyword lexicon for job_category without
+    calling the LLM. Returns the lexicon category used, a 0-100 score (the
+    weighted share of the category's keywords found), and the matched and
+    missing keywords (missing ones sorted by weight).
+    """
+    lexicon = lexicon or get_lexicon()
+    return score_terms(resume_terms(text, lexicon.max_ngram), job_category, lexicon)
+
+
+def score_resume_many(text, job_categories, lexicon=None):
+    """score_resume for several job categories, tokenizing the resume once."""
+    lexicon = lexicon or get_lexicon()
+    terms = resume_terms(text, lexicon.max_ngram)
+    return {category: score_terms(terms, category, lexicon) for category in job_categories}
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    arg_parser = argparse.ArgumentParser(description="Score a resume PDF against the ATS keyword lexicon.")
+    arg_parser.add_argument("pdf")
+    arg_parser.add_argument("--category", action="append", default=None,
+                            help="job category (repeat for several; default General)")
+    args = arg_parser.parse_args()
+
+    from parser import extract_text_from_pdf
+
+    resume_text = extract_text_from_pdf(args.pdf)
+    start = time.perf_counter()
+    scores = score_resume_many(resume_text, args.category or ["General"])
+    elapsed = (time.perf_counter() - start) * 1000
+    for result in scores.values():
+        print(f"🎯 {result['job_category']} ({result['lexicon_category']}): {result['score']}/100")
+        print(f"   ✅ matched: {', '.join(result['matched']) or '-'}")
+        print(f"   ❌ missing: {', '.join(result['missing']) or '-'}")
+    print(f"⚡ Scored in {elapsed:.2f} ms")
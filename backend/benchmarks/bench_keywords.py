@@ -0,0 +1,55 @@
+"""
+Compare per-document keyword extraction with the full spaCy pipeline
+against the batched extract_keywords_many path.
+
+Run from the backend directory:
+    python benchmarks/bench_keywords.py [--docs 1000] [--batch-size 64] [--processes 1]
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from parser import KEYWORD_POS, extract_keywords_many, extract_text_from_pdf, get_nlp  # noqa: E402
+
+
+def sample_texts(count):
+    """Cycle the sample resumes until we have count documents."""
+    pdfs = sorted(glob.glob(os.path.join(BACKEND_DIR, "data", "uploads", "*.pdf")))
+    texts = [extract_text_from_pdf(pdf) for pdf in pdfs]
+    if not texts:
+        sys.exit("No sample PDFs found in data/uploads")
+    return [texts[i % len(texts)] for i in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=1000)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--processes", type=int, default=1)
+    args = parser.parse_args()
+
+    texts = sample_texts(args.docs)
+    nlp = get_nlp()
+
+    start = time.perf_counter()
+    for text in texts:
+        {token.text.lower() for token in nlp(text) if token.pos_ in KEYWORD_POS}
+    full = time.perf_counter() - start
+
+    start = time.perf_counter()
+    extract_keywords_many(texts, batch_size=args.batch_size, n_process=args.processes)
+    batched = time.perf_counter() - start
+
+    print(f"documents:                 {len(texts)}")
+    print(f"full pipeline, one by one: {full:8.2f} s  ({len(texts) / full:8.1f} docs/s)")
+    print(f"extract_keywords_many:     {batched:8.2f} s  ({len(texts) / batched:8.1f} docs/s)")
+    print(f"speedup:                   {full / batched:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Time the pdflatex build of each corpus resume: the build generate_pdf
+used to do (a `tlmgr list --only-installed` probe and two pdflatex passes
+every time) against the current one (TeX probed once, a second pass only
+when the log or .aux asks for it), with the preamble compiled from source,
+loaded from the cached format, and through the prespawn pool (each build's
+pdflatex started ahead of time with the format loaded).
+
+Needs pdflatex (and tlmgr for the old build) on PATH. The pdflatex used is
+printed above the table so recorded numbers say what they were measured
+against; a pdflatex that is not from TeX Live or MiKTeX (e.g. a stub used
+to test the build code) only measures process runs, not real compiles.
+
+Run from the backend directory:
+    python benchmarks/bench_latex_build.py [--repeat 3]
+"""
+import argparse
+import contextlib
+import glob
+import io
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+import latex_converter  # noqa: E402
+from latex_converter import convert_to_latex, generate_pdf, get_tex_installation  # noqa: E402
+from latex_workers import get_worker_pool  # noqa: E402
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "resume_corpus")
+
+
+def two_pass_build(latex_content, output_path):
+    """The build generate_pdf used to do."""
+    build_dir = os.path.dirname(output_path)
+    tex_path = os.path.join(build_dir, "temp_resume.tex")
+    with open(tex_path, "w") as f:
+        f.write(latex_content)
+    if shutil.which("tlmgr"):
+        subprocess.run(["tlmgr", "list", "--only-installed"], capture_output=True, text=True)
+    for _ in range(2):
+        subprocess.run(
+            ["pdflatex", "-interaction=nonstopmode", "-file-line-error", "-output-directory=" + build_dir, tex_path],
+            capture_output=True, text=True,
+        )
+    os.replace(os.path.join(build_dir, "temp_resume.pdf"), output_path)
+
+
+def build_with_format(use_format):
+    def build(latex_content, output_path):
+        latex_converter.LATEX_PRECOMPILED_FORMAT = use_format
+        generate_pdf(latex_content, output_path)
+    return build
+
+
+def prespawn_build(latex_content, output_path):
+    latex_converter.LATEX_PRECOMPILED_FORMAT = True
+    get_worker_pool().build(latex_content, output_path)
+
+
+def best_of(build, latex_content, repeat):
+    timings = []
+    with tempfile.TemporaryDirectory() as output_dir:
+        output_path = os.path.join(output_dir, "resume.pdf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                build(latex_content, output_path)
+            timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def print_row(name, timings):
+    old, rerun_aware, with_format, prespawn = timings
+    print(f"{name:32s} {old * 1000:12.1f} {rerun_aware * 1000:15.1f} {with_format * 1000:10.1f} {prespawn * 1000:12.1f} {old / prespawn:8.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=3, help="Builds per resume; the best time is reported")
+    args = parser.parse_args()
+
+    if shutil.which("pdflatex") is None:
+        sys.exit("pdflatex was not found on PATH")
+    with contextlib.redirect_stdout(io.StringIO()):
+        tex = get_tex_installation()
+    print(f"pdflatex: {tex['version']} ({tex['pdflatex']})")
+    if not any(distribution in tex["version"] for distribution in ("TeX Live", "MiKTeX")):
+        print("⚠️ Not a TeX Live or MiKTeX pdflatex: timings show process runs, not real compiles")
+
+    documents = []
+    for path in sorted(glob.glob(os.path.join(CORPUS_DIR, "*.txt"))):
+        with open(path, encoding="utf-8") as f, contextlib.redirect_stdout(io.StringIO()):
+            documents.append((os.path.basename(path), convert_to_latex(f.read())))
+
+    # The first build also probes TeX and dumps the format; keep that out of the timings
+    with tempfile.TemporaryDirectory() as output_dir, contextlib.redirect_stdout(io.StringIO()):
+        generate_pdf(documents[0][1], os.path.join(output_dir, "warmup.pdf"))
+        prespawn_build(documents[0][1], os.path.join(output_dir, "warmup.pdf"))
+
+    builds = [two_pass_build, build_with_format(False), build_with_format(True), prespawn_build]
+    totals = [0.0] * len(builds)
+    print(f"{'resume':32s} {'two-pass ms':>12s} {'rerun-aware ms':>15s} {'format ms':>10s} {'prespawn ms':>12s} {'speed-up':>9s}")
+    for name, latex_content in documents:
+        timings = [best_of(build, latex_content, args.repeat) for build in builds]
+        totals = [total + timing for total, timing in zip(totals, timings)]
+        print_row(name, timings)
+    print_row("total", totals)
+
+if __name__ == "__main__":
+    main()
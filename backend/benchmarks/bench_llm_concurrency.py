@@ -0,0 +1,88 @@
+"""
+Fire many analyze_resume_async calls at the local fake OpenAI server and
+report wall time and thread count, to show that one process keeps many
+LLM calls in flight without a thread per call.
+
+Run from the backend directory:
+    python benchmarks/bench_llm_concurrency.py [--calls 50] [--delay 0.5] [--concurrency 16]
+"""
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def start_fake_server(delay):
+    """Run the fake server in its own process so its threads are not counted here."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    process = subprocess.Popen([
+        sys.executable, os.path.join(BENCH_DIR, "fake_openai_server.py"),
+        "--port", str(port), "--delay", str(delay),
+    ], stdout=subprocess.DEVNULL)
+    for _ in range(100):
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+            break
+        except OSError:
+            time.sleep(0.05)
+    return process, f"http://127.0.0.1:{port}/v1"
+
+
+async def run_calls(parser, calls):
+    peak_threads = threading.active_count()
+
+    async def one(index):
+        nonlocal peak_threads
+        # Distinct text per call so the analysis cache never short-circuits
+        result = await parser.analyze_resume_async(f"Resume number {index}\nPython developer", "Software Engineering")
+        peak_threads = max(peak_threads, threading.active_count())
+        return result
+
+    results = await asyncio.gather(*(one(i) for i in range(calls)))
+    return results, peak_threads
+
+
+def main():
+    args = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    args.add_argument("--calls", type=int, default=50)
+    args.add_argument("--delay", type=float, default=0.5, help="Fake server latency per call")
+    args.add_argument("--concurrency", type=int, default=16, help="LLM_MAX_CONCURRENCY")
+    opts = args.parse_args()
+
+    server, api_base = start_fake_server(opts.delay)
+    os.environ["OPENAI_API_BASE"] = api_base
+    os.environ["OPENAI_API_KEY"] = "sk-fake"
+    os.environ["LLM_MAX_CONCURRENCY"] = str(opts.concurrency)
+    # Keep the benchmark's cache entries out of the real cache
+    os.environ["RESUME_CACHE_DIR"] = tempfile.mkdtemp(prefix="resume-bench-cache-")
+
+    import parser  # noqa: E402  (imported after the environment is set)
+
+    try:
+        start = time.perf_counter()
+        results, peak_threads = asyncio.run(run_calls(parser, opts.calls))
+        elapsed = time.perf_counter() - start
+    finally:
+        server.terminate()
+
+    failures = sum(1 for result in results if "error" in result)
+    serial = opts.calls * opts.delay
+    print(f"calls:            {opts.calls} ({failures} failed)")
+    print(f"concurrency:      {opts.concurrency}")
+    print(f"wall time:        {elapsed:.2f} s (serial would be ~{serial:.1f} s)")
+    print(f"peak threads:     {peak_threads}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Exercise the LLM retry and circuit breaker layer against the local fake
+OpenAI server with injected failures, then print the client's metrics.
+
+Three phases run against fresh servers:
+  1. flaky:  a fraction of requests fail with 503; retries should hide them
+  2. outage: every request fails; once the breaker opens, the second
+     wave of calls should fail fast without reaching upstream
+  3. recovery: the server is healthy again; after the reset timeout the
+     half-open trial closes the circuit
+
+Run from the backend directory:
+    python benchmarks/bench_llm_resilience.py [--calls 40] [--fail-rate 0.3]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# Short backoff and reset windows so the benchmark finishes quickly
+os.environ.setdefault("LLM_BACKOFF_BASE", "0.05")
+os.environ.setdefault("LLM_BACKOFF_MAX", "0.5")
+os.environ.setdefault("LLM_BREAKER_RESET", "1")
+
+from fake_openai_server import FakeOpenAIServer  # noqa: E402
+from llm_client import AsyncLLMClient  # noqa: E402
+from resilience import CircuitOpenError  # noqa: E402
+
+MESSAGES = [{"role": "user", "content": "ping"}]
+
+
+async def run_phase(client, calls):
+    outcomes = {"ok": 0, "failed": 0, "short_circuited": 0}
+    latencies = []
+
+    async def one():
+        start = time.perf_counter()
+        try:
+            await client.chat(MESSAGES, model="gpt-4")
+            outcomes["ok"] += 1
+        except CircuitOpenError:
+            outcomes["short_circuited"] += 1
+        except Exception:
+            outcomes["failed"] += 1
+        latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(one() for _ in range(calls)))
+    return outcomes, max(latencies) if latencies else 0.0
+
+
+def report(name, outcomes, slowest, client):
+    print(f"\n== {name}")
+    print(f"outcomes:  {outcomes}")
+    print(f"slowest:   {slowest * 1000:.0f} ms")
+    print(f"metrics:   {client.metrics()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=40)
+    parser.add_argument("--fail-rate", type=float, default=0.3)
+    args = parser.parse_args()
+
+    flaky = FakeOpenAIServer(delay=0.05, fail_rate=args.fail_rate).start()
+    client = AsyncLLMClient(api_base=flaky.api_base, api_key="sk-fake")
+    outcomes, slowest = client.run(run_phase(client, args.calls))
+    report(f"flaky upstream ({args.fail_rate:.0%} injected 503s)", outcomes, slowest, client)
+    flaky.shutdown()
+
+    down = FakeOpenAIServer(delay=0.05, fail_rate=1.0).start()
+    client = AsyncLLMClient(api_base=down.api_base, api_key="sk-fake")
+    first_wave = max(1, args.calls // 4)
+    outcomes, slowest = client.run(run_phase(client, first_wave))
+    report(f"outage, first {first_wave} calls (every request fails)", outcomes, slowest, client)
+    seen = down.requests
+    outcomes, slowest = client.run(run_phase(client, args.calls - first_wave))
+    report(f"outage, next {args.calls - first_wave} calls", outcomes, slowest, client)
+    print(f"upstream saw {down.requests - seen} requests for those {args.calls - first_wave} calls")
+    down.shutdown()
+
+    healthy = FakeOpenAIServer(delay=0.05).start()
+    client.api_base = healthy.api_base
+    client.run(client.aclose())
+    time.sleep(client.breaker.reset_timeout)
+    outcomes, slowest = client.run(run_phase(client, 1))
+    outcomes_rest, _ = client.run(run_phase(client, args.calls))
+    report("recovery", {key: outcomes[key] + outcomes_rest[key] for key in outcomes}, slowest, client)
+    healthy.shutdown()
+
+
+if __name__ == "__main__":
+    main()
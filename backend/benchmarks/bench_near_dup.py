@@ -0,0 +1,113 @@
+"""
+Grow a near-duplicate index with synthetic resumes and time lookups at
+each size, compared with scanning every stored signature. Also checks
+that edited copies above the similarity threshold are found (recall)
+and unrelated resumes are not (false +).
+
+Run from the backend directory:
+    python benchmarks/bench_near_dup.py [--sizes 1000,5000,20000] [--queries 50]
+"""
+import argparse
+import glob
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+# Keep the benchmark's index out of the real cache folder
+CACHE_DIR = tempfile.mkdtemp(prefix="near-dup-bench-")
+os.environ["RESUME_CACHE_DIR"] = CACHE_DIR
+
+import numpy as np  # noqa: E402
+
+from ats_scorer import tokenize  # noqa: E402
+from near_dup import NearDupIndex, minhash_signature, similarity  # noqa: E402
+from parser import extract_text_from_pdf  # noqa: E402
+
+
+def sample_words():
+    pdfs = sorted(glob.glob(os.path.join(BACKEND_DIR, "data", "uploads", "*.pdf")))
+    words = [word for pdf in pdfs for word in tokenize(extract_text_from_pdf(pdf))]
+    if not words:
+        sys.exit("No sample PDFs found in data/uploads")
+    return words
+
+
+def synthetic_resume(rng, words, length=400):
+    """Shuffled runs of sample-resume words, as lines of about ten words."""
+    picked = []
+    while len(picked) < length:
+        start = rng.randrange(len(words))
+        picked.extend(words[start:start + rng.randint(3, 12)])
+    picked.extend(f"rare{rng.randrange(10 ** 9)}" for _ in range(10))
+    rng.shuffle(picked)
+    return "\n".join(" ".join(picked[i:i + 10]) for i in range(0, len(picked), 10))
+
+
+def edit(rng, text, lines=2):
+    """A lightly edited copy: a couple of lines replaced."""
+    rows = text.splitlines()
+    for _ in range(lines):
+        rows[rng.randrange(len(rows))] = f"updated line {rng.randrange(10 ** 6)} with new wording"
+    return "\n".join(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1000,5000,20000")
+    parser.add_argument("--queries", type=int, default=50)
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.sizes.split(",")]
+
+    rng = random.Random(0)
+    words = sample_words()
+    index = NearDupIndex(name="bench")
+    stored = []
+    signatures = []
+
+    try:
+        print(f"{'stored':>8s} {'LSH ms':>8s} {'scan ms':>8s} {'recall':>7s} {'false +':>8s}")
+        for size in sizes:
+            while len(stored) < size:
+                text = synthetic_resume(rng, words)
+                signature = minhash_signature(text)
+                index.add(f"doc-{len(stored)}", text, signature)
+                stored.append(text)
+                signatures.append(signature)
+            matrix = np.vstack(signatures)
+
+            sources = [rng.randrange(len(stored)) for _ in range(args.queries)]
+            probes = [edit(rng, stored[source], lines=rng.randint(1, 3)) for source in sources]
+            strangers = [synthetic_resume(rng, words) for _ in range(args.queries)]
+            probe_signatures = [minhash_signature(text) for text in probes + strangers]
+
+            start = time.perf_counter()
+            results = [index.query(signature=signature) for signature in probe_signatures]
+            lsh = (time.perf_counter() - start) / len(probe_signatures)
+
+            start = time.perf_counter()
+            for signature in probe_signatures:
+                (matrix == signature).mean(axis=1)
+            scan = (time.perf_counter() - start) / len(probe_signatures)
+
+            # Recall over the edited copies that really are above the threshold
+            eligible = [
+                position for position, source in enumerate(sources)
+                if similarity(signatures[source], probe_signatures[position]) >= index.threshold
+            ]
+            recall = sum(1 for position in eligible if results[position]) / max(len(eligible), 1)
+            false_positives = sum(1 for matches in results[args.queries:] if matches) / args.queries
+            print(f"{size:8d} {lsh * 1000:8.2f} {scan * 1000:8.2f} {recall:7.0%} {false_positives:8.0%}")
+
+        print(f"\nedited copies above the {index.threshold} threshold in the last round: {len(eligible)}/{args.queries}")
+    finally:
+        shutil.rmtree(CACHE_DIR, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Compare the PDF extraction engines on the sample resumes.
+
+Run from the backend directory:
+    python benchmarks/bench_pdf_engines.py [--repeat 5] [extra.pdf ...]
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from pdf_engines import ENGINES, iter_engine_pages, looks_garbled  # noqa: E402
+
+SAMPLE_GLOBS = [
+    os.path.join(BACKEND_DIR, "..", "data", "*.pdf"),
+    os.path.join(BACKEND_DIR, "..", "data", "uploads", "*.pdf"),
+    os.path.join(BACKEND_DIR, "data", "uploads", "*.pdf"),
+]
+
+
+def time_engine(name, pdf_path, repeat):
+    """Return (best seconds, characters, garbled pages) for one engine on one file."""
+    best = None
+    chars = garbled = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        pages = [text for _, text in iter_engine_pages(pdf_path, name)]
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+        chars = sum(len(text) for text in pages)
+        garbled = sum(1 for text in pages if looks_garbled(text))
+    return best, chars, garbled
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("pdfs", nargs="*", help="Extra PDFs to include")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per file; the best time is reported")
+    args = parser.parse_args()
+
+    pdfs = sorted({os.path.realpath(p) for pattern in SAMPLE_GLOBS for p in glob.glob(pattern)})
+    pdfs += [os.path.realpath(p) for p in args.pdfs]
+    if not pdfs:
+        print("No PDFs found.")
+        return
+
+    totals = {name: 0.0 for name in ENGINES}
+    print(f"{'file':48} {'engine':11} {'ms':>9} {'chars':>7} {'garbled':>8}")
+    for pdf_path in pdfs:
+        label = os.path.relpath(pdf_path, os.path.join(BACKEND_DIR, ".."))
+        for name in ENGINES:
+            try:
+                seconds, chars, garbled = time_engine(name, pdf_path, args.repeat)
+            except ImportError as e:
+                print(f"{label:48} {name:11} {'skipped (' + str(e) + ')'}")
+                continue
+            totals[name] += seconds
+            print(f"{label:48} {name:11} {seconds * 1000:9.1f} {chars:7d} {garbled:8d}")
+
+    print()
+    baseline = totals["pdfplumber"]
+    for name, seconds in totals.items():
+        speedup = f"{baseline / seconds:.1f}x" if seconds and baseline else "-"
+        print(f"{name:11} total {seconds * 1000:9.1f} ms  speedup vs pdfplumber: {speedup}")
+
+
+if __name__ == "__main__":
+    main()
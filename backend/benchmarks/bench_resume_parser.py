@@ -0,0 +1,118 @@
+"""
+Check the resume parser against its regression corpus, then time it on
+long resumes built from the corpus sections.
+
+Every benchmarks/resume_corpus/*.txt has a .json next to it with the
+Resume the LaTeX converter should get from it (name, contact, sections
+and their entries). A mismatch is reported and makes the run fail; after
+an intended change in parsing, rewrite the expected files with --update
+and review the diff.
+
+Run from the backend directory:
+    python benchmarks/bench_resume_parser.py [--lines 1000,10000,100000] [--repeat 5] [--update]
+"""
+import argparse
+import dataclasses
+import glob
+import json
+import os
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from resume_scanner import LATEX_ENTRY_RULES, scan_latex_resume  # noqa: E402
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "resume_corpus")
+
+
+def parse(text):
+    return scan_latex_resume(text)
+
+
+def check_corpus(update=False):
+    """Compare each corpus resume with its expected parse; return the number of mismatches."""
+    failures = 0
+    for path in sorted(glob.glob(os.path.join(CORPUS_DIR, "*.txt"))):
+        with open(path, encoding="utf-8") as f:
+            parsed = dataclasses.asdict(parse(f.read()))
+        expected_path = path[:-len(".txt")] + ".json"
+
+        if update:
+            with open(expected_path, "w", encoding="utf-8") as f:
+                json.dump(parsed, f, indent=2, ensure_ascii=False)
+                f.write("\n")
+            print(f"🔁 {os.path.basename(expected_path)} updated")
+            continue
+
+        with open(expected_path, encoding="utf-8") as f:
+            expected = json.load(f)
+        if parsed == expected:
+            print(f"✅ {os.path.basename(path)}")
+            continue
+        failures += 1
+        print(f"❌ {os.path.basename(path)}")
+        for key in ("name", "contact"):
+            if parsed[key] != expected[key]:
+                print(f"   {key}: expected {expected[key]!r}, got {parsed[key]!r}")
+        for title in sorted(set(parsed["sections"]) | set(expected["sections"])):
+            if parsed["sections"].get(title) != expected["sections"].get(title):
+                print(f"   section {title!r} differs")
+    return failures
+
+
+def long_resume(line_count):
+    """
+    One resume of about line_count lines: a header, then each template
+    section once, filled with that section's lines from the whole corpus
+    over and over, so the long sections hold many entries.
+    """
+    bodies = {title: [] for title in LATEX_ENTRY_RULES}
+    headings = {}
+    for path in sorted(glob.glob(os.path.join(CORPUS_DIR, "*.txt"))):
+        with open(path, encoding="utf-8") as f:
+            resume = scan_latex_resume(f.read(), entry_rules=None)
+        for title, section in resume.sections.items():
+            headings.setdefault(title, section.heading)
+            bodies[title].extend(section.lines)
+
+    per_section = max(line_count // len(headings), 1)
+    lines = ["Jane Doe", "jane@example.com | 519-555-0100 | github.com/janedoe"]
+    for title, heading in headings.items():
+        lines.append(heading)
+        lines.extend(bodies[title][i % len(bodies[title])] for i in range(per_section))
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lines", default="1000,10000,100000")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--update", action="store_true", help="rewrite the expected parses from the current parser")
+    args = parser.parse_args()
+
+    failures = check_corpus(update=args.update)
+    if args.update:
+        return
+
+    print()
+    print(f"{'lines':>8s} {'ms':>9s} {'µs/line':>8s} {'MB/s':>7s} {'entries':>8s}")
+    for line_count in (int(count) for count in args.lines.split(",")):
+        text = long_resume(line_count)
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            resume = parse(text)
+            timings.append(time.perf_counter() - start)
+        best = min(timings)
+        entries = sum(len(section.entries) for section in resume.sections.values())
+        megabytes = len(text.encode("utf-8")) / 1024 / 1024
+        print(f"{line_count:8d} {best * 1000:9.2f} {best / line_count * 1e6:8.2f} {megabytes / best:7.1f} {entries:8d}")
+
+    if failures:
+        sys.exit(f"{failures} corpus resume(s) parsed differently from their expected output")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Time resume_scanner.scan_resume against the per-line, per-pattern scan
+that match_content_to_template used before (four patterns compiled per
+call, each searched twice per line) on long resume texts built by
+repeating the sample resumes.
+
+Run from the backend directory:
+    python benchmarks/bench_resume_scanner.py [--lines 1000,10000,100000] [--repeat 5]
+"""
+import argparse
+import glob
+import os
+import re
+import statistics
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from parser import extract_text_from_pdf  # noqa: E402
+from resume_scanner import HTML_HEADINGS, scan_resume  # noqa: E402
+
+
+def per_pattern_scan(extracted_text):
+    """The contact and section scan match_content_to_template used to do."""
+    lines = [line.strip() for line in extracted_text.split("\n") if line.strip()]
+    candidate_name = "Candidate Name"
+    section_titles = HTML_HEADINGS.titles
+    current_section = None
+    section_data = {}
+
+    email_pattern = re.compile(r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}")
+    phone_pattern = re.compile(r"\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}")
+    linkedin_pattern = re.compile(r"(https?://)?(www\.)?linkedin\.com/in/[a-zA-Z0-9-_/]+", re.IGNORECASE)
+    github_pattern = re.compile(r"(https?://)?(www\.)?github\.com/[a-zA-Z0-9-_/]+", re.IGNORECASE)
+    details = {"email": None, "phone": None, "linkedin": None, "github": None}
+
+    for line in lines:
+        if candidate_name == "Candidate Name" and len(line.split()) > 1:
+            candidate_name = line.strip()
+            continue
+        if email_pattern.search(line):
+            details["email"] = email_pattern.search(line).group()
+        if phone_pattern.search(line):
+            details["phone"] = phone_pattern.search(line).group()
+        if linkedin_pattern.search(line):
+            details["linkedin"] = linkedin_pattern.search(line).group()
+        if github_pattern.search(line):
+            details["github"] = github_pattern.search(line).group()
+        normalized_line = line.lower().strip().rstrip(":")
+        if normalized_line in section_titles:
+            current_section = section_titles[normalized_line]
+            section_data[current_section] = []
+            continue
+        if current_section:
+            section_data[current_section].append(line)
+
+    return candidate_name, details, {title: "\n".join(lines) for title, lines in section_data.items()}
+
+
+def long_text(line_count):
+    pdfs = sorted(glob.glob(os.path.join(BACKEND_DIR, "data", "uploads", "*.pdf")))
+    lines = [line for pdf in pdfs for line in extract_text_from_pdf(pdf).splitlines()]
+    if not lines:
+        sys.exit("No sample PDFs found in data/uploads")
+    return "\n".join(lines[i % len(lines)] for i in range(line_count))
+
+
+def best_of(func, text, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(text)
+        timings.append(time.perf_counter() - start)
+    return min(timings), statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lines", default="1000,10000,100000")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'lines':>8s} {'per-pattern ms':>15s} {'scanner ms':>11s} {'speed-up':>9s}")
+    for line_count in (int(count) for count in args.lines.split(",")):
+        text = long_text(line_count)
+        old, _ = best_of(per_pattern_scan, text, args.repeat)
+        new, _ = best_of(scan_resume, text, args.repeat)
+        print(f"{line_count:8d} {old * 1000:15.2f} {new * 1000:11.2f} {old / new:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Build the resume search index over a synthetic corpus and time a mix of
+word, boolean, phrase and keyword queries. Also times saving and
+reloading the index from disk.
+
+Run from the backend directory:
+    python benchmarks/bench_search.py [--docs 100000] [--words 300] [--repeat 20]
+"""
+import argparse
+import glob
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from ats_scorer import tokenize  # noqa: E402
+from parser import extract_text_from_pdf  # noqa: E402
+from search_index import SearchIndex  # noqa: E402
+
+QUERIES = [
+    "python",
+    "python sql",
+    "python OR java",
+    "python -java",
+    '"data structures"',
+    '"project management" agile',
+    "kw:python",
+    "kw:python flask -react",
+    "zebra",
+]
+
+
+def sample_words():
+    pdfs = sorted(glob.glob(os.path.join(BACKEND_DIR, "data", "uploads", "*.pdf")))
+    words = [word for pdf in pdfs for word in tokenize(extract_text_from_pdf(pdf))]
+    if not words:
+        sys.exit("No sample PDFs found in data/uploads")
+    return words
+
+
+def synthetic_docs(count, length, seed=0):
+    """
+    Resume-like documents: runs of consecutive words from the sample
+    resumes (so phrases survive) plus a few rare made-up words.
+    """
+    words = sample_words()
+    rng = random.Random(seed)
+    for doc in range(count):
+        parts = []
+        while sum(len(part) for part in parts) < length:
+            start = rng.randrange(len(words))
+            parts.append(words[start:start + rng.randint(5, 40)])
+        parts.append([f"rare{rng.randint(0, count)}" for _ in range(3)])
+        keywords = rng.sample(["python", "java", "flask", "react", "sql", "aws"], 2)
+        yield f"resume-{doc}.pdf", " ".join(word for part in parts for word in part), keywords
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=100000)
+    parser.add_argument("--words", type=int, default=300, help="approximate words per document")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix="search-bench-")
+    try:
+        index = SearchIndex(directory, compact_every=args.docs + 1)
+        start = time.perf_counter()
+        for key, text, keywords in synthetic_docs(args.docs, args.words):
+            index.add(key, text, keywords)
+        build = time.perf_counter() - start
+
+        start = time.perf_counter()
+        index.compact()
+        compact = time.perf_counter() - start
+        size = os.path.getsize(os.path.join(directory, "index.snapshot"))
+
+        start = time.perf_counter()
+        SearchIndex(directory)
+        load = time.perf_counter() - start
+
+        print(f"documents:       {args.docs}")
+        print(f"terms:           {index.stats()['terms']}")
+        print(f"index build:     {build:8.1f} s  ({args.docs / build:,.0f} docs/s, journaled)")
+        print(f"snapshot write:  {compact:8.1f} s  ({size / 1024 / 1024:.1f} MB)")
+        print(f"snapshot load:   {load:8.1f} s")
+        print()
+        print(f"{'query':32s} {'matches':>8s} {'p50 ms':>8s} {'max ms':>8s}")
+        for query in QUERIES:
+            timings = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                total, _ = index.search(query)
+                timings.append((time.perf_counter() - start) * 1000)
+            print(f"{query:32s} {total:8d} {statistics.median(timings):8.2f} {max(timings):8.2f}")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
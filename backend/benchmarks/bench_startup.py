@@ -0,0 +1,69 @@
+"""
+Measure how long it takes to import app.py and api.py, and how much
+memory the process holds afterwards. Each import runs in a fresh
+interpreter so nothing is shared between runs.
+
+Run from the backend directory:
+    python benchmarks/bench_startup.py [--repeat 5] [--warm]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = """
+import json, resource, sys, time
+start = time.perf_counter()
+import {module}
+imported = time.perf_counter() - start
+warm = None
+if {warm} and hasattr({module}, "warm_up"):
+    start = time.perf_counter()
+    {module}.warm_up()
+    warm = time.perf_counter() - start
+# ru_maxrss is kilobytes on Linux and bytes on macOS
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+rss_mb = rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+print(json.dumps({{"import": imported, "warm": warm, "rss_mb": rss_mb}}))
+"""
+
+
+def run_once(module, warm):
+    result = subprocess.run(
+        [sys.executable, "-c", CHILD.format(module=module, warm=warm)],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"importing {module} failed:\n{result.stderr}")
+    # The apps print start-up messages; the measurement is the last line
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters per module")
+    parser.add_argument("--warm", action="store_true", help="Also time warm_up() after the import")
+    args = parser.parse_args()
+
+    print(f"{'module':8} {'import ms':>10} {'warm_up ms':>11} {'max RSS MB':>11}")
+    for module in ("app", "api"):
+        try:
+            runs = [run_once(module, args.warm) for _ in range(args.repeat)]
+        except RuntimeError as e:
+            print(f"{module:8} {str(e)}")
+            continue
+        imported = statistics.median(run["import"] for run in runs) * 1000
+        warm_runs = [run["warm"] for run in runs if run["warm"] is not None]
+        warm = f"{statistics.median(warm_runs) * 1000:11.1f}" if warm_runs else f"{'-':>11}"
+        rss = statistics.median(run["rss_mb"] for run in runs)
+        print(f"{module:8} {imported:10.1f} {warm} {rss:11.1f}")
+
+
+if __name__ == "__main__":
+    main()
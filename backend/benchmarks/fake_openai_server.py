@@ -0,0 +1,175 @@
+"""
+Local stand-in for the OpenAI chat completions endpoint.
+
+Answers POST /v1/chat/completions with a canned resume analysis after an
+optional delay, so the LLM client can be exercised without network
+access or an API key. It can also inject failures (a fixed number of
+leading errors, or a random fraction of requests) to exercise retries
+and the circuit breaker. Requests with "stream": true get the answer as
+server-sent event chunks, like the real API, optionally with one chunk
+cut short to exercise malformed stream handling. Point the backend at it with:
+
+    OPENAI_API_BASE=http://127.0.0.1:8765/v1
+
+Run from the backend directory:
+    python benchmarks/fake_openai_server.py [--port 8765] [--delay 0.5]
+        [--fail-rate 0.3] [--fail-first 2] [--fail-status 503] [--retry-after 1]
+        [--chunk-size 8] [--chunk-delay 0.01] [--bad-chunk-at 3]
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CANNED_ANALYSIS = {
+    "overall_score": 7,
+    "strengths": ["Clear structure", "Relevant technical skills"],
+    "improvements": ["Quantify impact in experience bullets"],
+    "actionable_changes": ["Add metrics to each bullet", "Move skills above projects"],
+    "optimized_resume": "Jane Doe\njane@example.com | 555-123-4567\nEducation\nUniversity of Waterloo, BASc Computer Engineering\nSkills\nPython, Flask, React",
+}
+
+
+class FakeOpenAIHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        number = self.server.record_request()
+
+        if self.path.rstrip("/") != "/v1/chat/completions":
+            self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+            return
+
+        self.server.track_in_flight(1)
+        try:
+            self._answer(request, number)
+        finally:
+            self.server.track_in_flight(-1)
+
+    def _answer(self, request, number):
+        time.sleep(self.server.delay)
+        if self.server.should_fail(number):
+            headers = {"Retry-After": str(self.server.retry_after)} if self.server.retry_after is not None else {}
+            self._send_json(self.server.fail_status, {"error": {"message": "Injected failure"}}, headers)
+            return
+
+        if request.get("stream"):
+            self._send_stream(json.dumps(CANNED_ANALYSIS))
+            return
+
+        self._send_json(200, {
+            "id": "chatcmpl-fake",
+            "object": "chat.completion",
+            "model": request.get("model", "gpt-4"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": json.dumps(CANNED_ANALYSIS)},
+                "finish_reason": "stop",
+            }],
+        })
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_stream(self, content):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        size = self.server.chunk_size
+        for start in range(0, len(content), size):
+            chunk = json.dumps({"choices": [{"index": 0, "delta": {"content": content[start:start + size]}}]})
+            if start // size + 1 == self.server.bad_chunk_at:
+                chunk = chunk[:len(chunk) // 2]
+            self._write_chunk(f"data: {chunk}\n\n")
+            time.sleep(self.server.chunk_delay)
+        self._write_chunk("data: [DONE]\n\n")
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _write_chunk(self, text):
+        data = text.encode("utf-8")
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+    def log_message(self, format, *args):
+        # Keep benchmark output readable
+        pass
+
+
+class FakeOpenAIServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, port=0, delay=0.0, fail_rate=0.0, fail_first=0, fail_status=503, retry_after=None,
+                 chunk_size=8, chunk_delay=0.01, bad_chunk_at=None):
+        super().__init__(("127.0.0.1", port), FakeOpenAIHandler)
+        self.delay = delay
+        self.chunk_size = chunk_size
+        self.chunk_delay = chunk_delay
+        self.bad_chunk_at = bad_chunk_at
+        self.fail_rate = fail_rate
+        self.fail_first = fail_first
+        self.fail_status = fail_status
+        self.retry_after = retry_after
+        self.requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._count_lock = threading.Lock()
+
+    @property
+    def api_base(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/v1"
+
+    def record_request(self):
+        """Count a request and return its 1-based number."""
+        with self._count_lock:
+            self.requests += 1
+            return self.requests
+
+    def track_in_flight(self, change):
+        """Count requests being answered right now, remembering the peak."""
+        with self._count_lock:
+            self.in_flight += change
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+    def should_fail(self, number):
+        return number <= self.fail_first or random.random() < self.fail_rate
+
+    def start(self):
+        """Serve on a background thread and return self."""
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--delay", type=float, default=0.5, help="Seconds to wait before answering")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Fraction of requests to fail at random")
+    parser.add_argument("--fail-first", type=int, default=0, help="Fail this many requests before answering normally")
+    parser.add_argument("--fail-status", type=int, default=503, help="HTTP status used for injected failures")
+    parser.add_argument("--retry-after", type=float, default=None, help="Retry-After header sent with failures")
+    parser.add_argument("--chunk-size", type=int, default=8, help="Characters per streamed chunk")
+    parser.add_argument("--chunk-delay", type=float, default=0.01, help="Seconds between streamed chunks")
+    parser.add_argument("--bad-chunk-at", type=int, default=None, help="Send this streamed chunk (1-based) as broken JSON")
+    args = parser.parse_args()
+
+    server = FakeOpenAIServer(args.port, args.delay, args.fail_rate, args.fail_first, args.fail_status, args.retry_after,
+                              args.chunk_size, args.chunk_delay, args.bad_chunk_at)
+    print(f"Fake OpenAI API listening on {server.api_base}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+import json
+
+
+class IncrementalObjectParser:
+    """
+    Parses a JSON object that arrives in arbitrary chunks and reports each
+    top-level field as soon as its value is complete.
+
+    feed() returns the (key, value) pairs finished by that chunk. Each
+    field is decoded on its own, so a malformed field is skipped without
+    losing the ones around it. Anything before the opening brace (stray
+    text or a Markdown fence) is ignored.
+    """
+
+    def __init__(self):
+        self.fields = {}
+        self.errors = []
+        self._buffer = []
+        self._member = []
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._started = False
+        self._finished = False
+
+    def feed(self, chunk):
+        completed = []
+        for ch in chunk:
+            self._buffer.append(ch)
+            if self._finished:
+                continue
+
+            if not self._started:
+                if ch == "{":
+                    self._started = True
+                    self._depth = 1
+                continue
+
+            if self._in_string:
+                self._member.append(ch)
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                continue
+
+            if ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+
+            if self._depth == 0:
+                # Closing brace of the top-level object
+                self._finished = True
+                completed.extend(self._complete_member())
+            elif self._depth == 1 and ch == ",":
+                completed.extend(self._complete_member())
+            else:
+                self._member.append(ch)
+        return completed
+
+    @property
+    def text(self):
+        """Everything fed so far."""
+        return "".join(self._buffer)
+
+    @property
+    def finished(self):
+        """True once the top-level object's closing brace has been seen."""
+        return self._finished
+
+    def _complete_member(self):
+        member = "".join(self._member).strip()
+        self._member = []
+        if not member:
+            return []
+        try:
+            parsed = json.loads("{" + member + "}")
+        except json.JSONDecodeError as e:
+            self.errors.append(f"{str(e)}: {member[:80]}")
+            return []
+        self.fields.update(parsed)
+        return list(parsed.items())
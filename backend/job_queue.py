@@ -0,0 +1,143 @@
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+# Pool sizing (override with environment variables)
+MAX_WORKERS = int(os.getenv("RESUME_WORKERS", "4"))
+MAX_PENDING = int(os.getenv("RESUME_QUEUE_SIZE", "32"))
+JOB_TTL_SECONDS = int(os.getenv("RESUME_JOB_TTL", "3600"))
+
+
+class QueueFullError(Exception):
+    """Raised when the queue already holds MAX_PENDING unfinished jobs."""
+
+
+class JobQueue:
+    """
+    Small in-process job queue backed by a bounded thread pool.
+
+    Each job is a plain dict holding its status ("queued", "running",
+    "done" or "failed"), the pipeline stage it is currently in, and the
+    result or error once it finishes. Finished jobs are kept for
+    JOB_TTL_SECONDS so clients can poll for them, then dropped.
+
+    Jobs also keep an append-only list of events (stage changes, partial
+    results published by the pipeline, and a final "done" or "failed")
+    that clients can follow with wait_for_events().
+    """
+
+    def __init__(self, max_workers=MAX_WORKERS, max_pending=MAX_PENDING, ttl=JOB_TTL_SECONDS):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="resume-job")
+        self._max_pending = max_pending
+        self._ttl = ttl
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+
+    def submit(self, func, *args, **kwargs):
+        """
+        Queue func(job, *args, **kwargs) and return the new job id.
+        func can call set_stage(job, ...) to report progress; its return
+        value becomes the job result.
+        """
+        with self._lock:
+            self._purge_expired()
+            pending = sum(1 for job in self._jobs.values() if job["status"] in ("queued", "running"))
+            if pending >= self._max_pending:
+                raise QueueFullError("Too many resumes are being processed. Please try again shortly.")
+
+            job_id = uuid.uuid4().hex
+            now = time.time()
+            job = {
+                "id": job_id,
+                "status": "queued",
+                "stage": "queued",
+                "created_at": now,
+                "updated_at": now,
+                "result": None,
+                "error": None,
+                "events": [],
+            }
+            self._jobs[job_id] = job
+
+        self._executor.submit(self._run, job, func, args, kwargs)
+        return job_id
+
+    def get(self, job_id):
+        """Return a snapshot of the job, or None if it is unknown or expired."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def set_stage(self, job, stage):
+        """Record the pipeline stage a running job has reached."""
+        with self._lock:
+            job["stage"] = stage
+            job["updated_at"] = time.time()
+            self._append_event(job, "stage", {"stage": stage})
+        print(f"⏳ Job {job['id'][:8]}: {stage}")
+
+    def publish(self, job, event, data):
+        """Append an event (e.g. a partial result) for clients following the job."""
+        with self._lock:
+            self._append_event(job, event, data)
+
+    def wait_for_events(self, job_id, after=0, timeout=15):
+        """
+        Return (events, finished) where events are the job's events after
+        index `after`, waiting up to timeout seconds for new ones. finished
+        is True once the job is done or failed. Returns (None, True) if the
+        job is unknown or expired.
+        """
+        deadline = time.time() + timeout
+        with self._lock:
+            while True:
+                job = self._jobs.get(job_id)
+                if job is None:
+                    return None, True
+                finished = job["status"] in ("done", "failed")
+                remaining = deadline - time.time()
+                if len(job["events"]) > after or finished or remaining <= 0:
+                    return job["events"][after:], finished
+                self._changed.wait(remaining)
+
+    def _run(self, job, func, args, kwargs):
+        with self._lock:
+            job["status"] = "running"
+            job["updated_at"] = time.time()
+        try:
+            result = func(job, *args, **kwargs)
+        except Exception as e:
+            print(f"❌ Job {job['id'][:8]} failed: {str(e)}")
+            import traceback
+            traceback.print_exc()
+            with self._lock:
+                job["status"] = "failed"
+                job["error"] = str(e)
+                job["updated_at"] = time.time()
+                self._append_event(job, "failed", {"error": str(e)})
+            return
+
+        with self._lock:
+            job["status"] = "done"
+            job["stage"] = "done"
+            job["result"] = result
+            job["updated_at"] = time.time()
+            self._append_event(job, "done", result)
+
+    def _append_event(self, job, event, data):
+        # Caller must hold self._lock
+        job["events"].append({"event": event, "data": data})
+        self._changed.notify_all()
+
+    def _purge_expired(self):
+        # Caller must hold self._lock
+        cutoff = time.time() - self._ttl
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job["status"] in ("done", "failed") and job["updated_at"] < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
@@ -1,7 +1,93 @@
+import contextlib
+import hashlib
 import os
 import re
+import shutil
 import subprocess
-from jinja2 import Template, StrictUndefined
+import tempfile
+import threading
+import time
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, StrictUndefined
+from cache import CACHE_FOLDER
+from resume_scanner import LATEX_ENTRY_RULES, scan_latex_resume
+
+# LaTeX templates, by file name (override the default with LATEX_TEMPLATE)
+TEMPLATE_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates')
+DEFAULT_TEMPLATE = os.getenv('LATEX_TEMPLATE', 'resume_template.tex')
+# Recompile a template when its file changes; checking costs one stat per
+# render, so production can turn it off with LATEX_TEMPLATE_AUTO_RELOAD=0
+TEMPLATE_AUTO_RELOAD = os.getenv('LATEX_TEMPLATE_AUTO_RELOAD', '1') == '1'
+# LATEX_DEBUG=1 keeps a copy of every rendered document in LATEX_DEBUG_DIR
+LATEX_DEBUG = os.getenv('LATEX_DEBUG') == '1'
+LATEX_DEBUG_DIR = os.getenv('LATEX_DEBUG_DIR', os.path.join(tempfile.gettempdir(), 'resume-latex-debug'))
+# Upper bound on pdflatex passes per build, in case references never settle
+LATEX_MAX_PASSES = int(os.getenv('LATEX_MAX_PASSES', '3'))
+# LATEX_PRECOMPILED_FORMAT=0 loads the preamble from source on every build
+LATEX_PRECOMPILED_FORMAT = os.getenv('LATEX_PRECOMPILED_FORMAT', '1') == '1'
+LATEX_FORMAT_FOLDER = os.path.join(CACHE_FOLDER, 'latex-formats')
+# How convert_resume_to_latex_pdf builds PDFs: 'pdflatex' (one process
+# started per build) or 'prespawn' (the pool in latex_workers, which starts
+# each build's pdflatex ahead of time; 'workers' is an older name for it)
+LATEX_ENGINE = os.getenv('LATEX_ENGINE', 'pdflatex')
+
+# Log messages asking for another pass (LaTeX kernel, hyperref/rerunfilecheck, natbib, ...)
+RERUN_PATTERN = re.compile(r'Rerun to get|Label\(s\) may have changed|Please rerun LaTeX|Rerun LaTeX')
+# What pdflatex prints when it cannot load a format: missing, corrupt, or
+# dumped by another TeX build
+FORMAT_ERROR_PATTERN = re.compile(
+    r"Fatal format file error|I can't find the format file"
+    r"|\.fmt (?:was written by|doesn't match|made by different executable version)"
+)
+
+_tex_installation = None
+_tex_installation_lock = threading.Lock()
+_format_lock = threading.Lock()
+
+class LatexBuildError(Exception):
+    """Raised when pdflatex finishes without a PDF; output holds what it printed and logged."""
+
+    def __init__(self, message, output=''):
+        super().__init__(message)
+        self.output = output
+
+def _template_environment():
+    """
+    The Jinja environment for the LaTeX templates. Templates are compiled
+    once and kept in memory; the compiled code is also cached on disk so
+    a restarted worker skips compiling.
+    """
+    bytecode_folder = os.path.join(CACHE_FOLDER, 'jinja')
+    os.makedirs(bytecode_folder, exist_ok=True)
+    return Environment(
+        loader=FileSystemLoader(TEMPLATE_FOLDER),
+        bytecode_cache=FileSystemBytecodeCache(bytecode_folder),
+        auto_reload=TEMPLATE_AUTO_RELOAD,
+        undefined=StrictUndefined,
+        trim_blocks=True,
+        lstrip_blocks=True,
+        block_start_string='{% ',
+        block_end_string=' %}',
+        variable_start_string='{{ ',
+        variable_end_string=' }}',
+        comment_start_string='{# ',
+        comment_end_string=' #}'
+    )
+
+TEMPLATE_ENV = _template_environment()
+
+def list_templates():
+    """Names of the available LaTeX templates."""
+    return TEMPLATE_ENV.list_templates(extensions=['tex'])
+
+def dump_debug_latex(latex_content, template_name):
+    """Save a rendered document under LATEX_DEBUG_DIR and return its path."""
+    os.makedirs(LATEX_DEBUG_DIR, exist_ok=True)
+    prefix = os.path.splitext(os.path.basename(template_name))[0] + '-'
+    fd, debug_path = tempfile.mkstemp(prefix=prefix, suffix='.tex', dir=LATEX_DEBUG_DIR)
+    with os.fdopen(fd, 'w') as f:
+        f.write(latex_content)
+    print(f"🔍 Rendered LaTeX saved to {debug_path}")
+    return debug_path
 
 def escape_latex(text):
     """Escape special LaTeX characters."""
@@ -22,411 +108,31 @@ def escape_latex(text):
     return text
 
 def parse_resume_sections(text):
-    """Parse resume text into structured sections."""
-    # Initialize default sections
-    sections = {
-        'name': '',
-        'contact': {
-            'email': '',
-            'phone': '',
-            'location': '',
-            'linkedin': '',
-            'github': ''
-        },
-        'education': '',
-        'experience': '',
-        'projects': '',
-        'skills': '',
-        'leadership': '',
-        'certifications': ''
-    }
-    
-    # Split text into lines and clean up
-    lines = [line.strip() for line in text.split('\n') if line.strip()]
-    
-    # Extract name (usually the first line)
-    if lines:
-        sections['name'] = lines[0]
-    
-    # Extract contact information
-    for line in lines:
-        # Email
-        email_match = re.search(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', line)
-        if email_match:
-            sections['contact']['email'] = email_match.group(0)
-        
-        # Phone
-        phone_match = re.search(r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b', line)
-        if phone_match:
-            sections['contact']['phone'] = phone_match.group(0)
-        
-        # LinkedIn
-        linkedin_match = re.search(r'linkedin\.com/in/[a-zA-Z0-9-]+', line)
-        if linkedin_match:
-            sections['contact']['linkedin'] = f"https://www.{linkedin_match.group(0)}"
-        
-        # GitHub
-        github_match = re.search(r'github\.com/[a-zA-Z0-9-]+', line)
-        if github_match:
-            sections['contact']['github'] = f"https://www.{github_match.group(0)}"
-        
-        # Location (common locations in resumes)
-        location_match = re.search(r'(Waterloo|Toronto|Ontario|Canada|UAE)', line)
-        if location_match:
-            sections['contact']['location'] = location_match.group(0)
-
-    # Build section content
-    current_section = None
-    section_content = []
-    
-    for line in lines:
-        # Check for section headers
-        if any(line.startswith(header) for header in ['EDUCATION', 'Education']):
-            if current_section:
-                sections[current_section.lower()] = '\n'.join(section_content)
-            current_section = 'education'
-            section_content = [line]
-        elif any(line.startswith(header) for header in ['EXPERIENCE', 'Experience']):
-            if current_section:
-                sections[current_section.lower()] = '\n'.join(section_content)
-            current_section = 'experience'
-            section_content = [line]
-        elif any(line.startswith(header) for header in ['PROJECTS', 'Projects']):
-            if current_section:
-                sections[current_section.lower()] = '\n'.join(section_content)
-            current_section = 'projects'
-            section_content = [line]
-        elif any(line.startswith(header) for header in ['SKILLS', 'Skills', 'TECHNICAL SKILLS', 'Technical Skills']):
-            if current_section:
-                sections[current_section.lower()] = '\n'.join(section_content)
-            current_section = 'skills'
-            section_content = [line]
-        elif any(line.startswith(header) for header in ['LEADERSHIP', 'Leadership']):
-            if current_section:
-                sections[current_section.lower()] = '\n'.join(section_content)
-            current_section = 'leadership'
-            section_content = [line]
-        elif any(line.startswith(header) for header in ['CERTIFICATIONS', 'Certifications']):
-            if current_section:
-                sections[current_section.lower()] = '\n'.join(section_content)
-            current_section = 'certifications'
-            section_content = [line]
-        elif current_section:
-            section_content.append(line)
-    
-    # Add the last section
-    if current_section:
-        sections[current_section.lower()] = '\n'.join(section_content)
-    
+    """Parse resume text into a Resume with its template sections split into entries."""
+    resume = scan_latex_resume(text)
+
     # Debug print
     print("\nParsed sections:")
-    for section, content in sections.items():
-        if section == 'contact':
-            print(f"Contact info: {content}")
-        else:
-            # Count lines by splitting and filtering empty lines
-            line_count = len([line for line in content.split('\n') if line.strip()]) if content else 0
-            print(f"{section.title()}: {line_count} lines")
-    
-    return sections
-
-def parse_education_section(section):
-    """Parse education section into structured format for Jake's template."""
-    if not section:
-        return []
-        
-    entries = []
-    lines = section.split('\n')[1:]  # Skip the "Education" header
-    current_entry = []
-    
-    for line in lines:
-        line = line.strip()
-        if line and (line.startswith('•') or line.startswith('-')):
-            if current_entry:
-                current_entry.append(line)
-        elif not line and current_entry:
-            # Process the completed entry
-            entry = process_education_entry(current_entry)
-            if entry:
-                entries.append(entry)
-            current_entry = []
-        elif line and (any(school in line.upper() for school in ['UNIVERSITY', 'COLLEGE', 'SCHOOL']) or
-                      any(degree in line.upper() for degree in ['BACHELOR', 'MASTER', 'PHD', 'DIPLOMA'])):
-            if current_entry:
-                entry = process_education_entry(current_entry)
-                if entry:
-                    entries.append(entry)
-            current_entry = [line]
-        elif line and current_entry:
-            current_entry.append(line)
-        elif line:
-            current_entry = [line]
-    
-    # Process any remaining entry
-    if current_entry:
-        entry = process_education_entry(current_entry)
-        if entry:
-            entries.append(entry)
-    
-    return entries
-
-def process_education_entry(lines):
-    """Helper function to process education entry lines."""
-    if not lines:
-        return None
-        
-    entry = {
-        'institution': '',
-        'degree': '',
-        'location': '',
-        'date': '',
-        'bullets': []
-    }
-    
-    # Process first line (usually contains institution and date)
-    first_line = lines[0]
-    
-    # Try different date formats
-    date_match = re.search(r'\((.*?)\)|(?:Sep|Sept|September|Jan|January|Feb|February|Mar|March|Apr|April|May|Jun|June|Jul|July|Aug|August|Oct|October|Nov|November|Dec|December)\s+\d{4}\s*-\s*(?:Present|[A-Za-z]+\s+\d{4})', first_line)
-    if date_match:
-        entry['date'] = date_match.group(0).strip('()')
-        first_line = re.sub(r'\(.*?\)', '', first_line).strip()  # Remove date in parentheses
-        first_line = re.sub(date_match.group(0), '', first_line).strip()  # Remove other date format
-    
-    # Split remaining text by common delimiters
-    parts = [p.strip() for p in re.split(r'[,|]', first_line) if p.strip()]
-    
-    # First part is usually the institution
-    if parts:
-        entry['institution'] = parts[0]
-    
-    # Look for location in the parts
-    for part in parts:
-        if any(loc in part.upper() for loc in ['WATERLOO', 'TORONTO', 'ONTARIO', 'UAE']):
-            entry['location'] = part.strip()
-            break
-    
-    # Process remaining lines for degree and bullets
-    for line in lines[1:]:
-        line = line.strip()
-        if line.startswith('•') or line.startswith('-'):
-            entry['bullets'].append(line.strip('• ').strip('- ').strip())
-        elif 'Recipient' in line or 'Scholar' in line or 'Honours' in line or 'Bachelor' in line:
-            entry['degree'] = line.strip()
-    
-    # If location is still empty and we found a location in the institution name
-    if not entry['location'] and any(loc in entry['institution'].upper() for loc in ['WATERLOO', 'TORONTO', 'ONTARIO', 'UAE']):
-        entry['location'] = 'Waterloo, ON' if 'WATERLOO' in entry['institution'].upper() else 'UAE'
-    
-    return entry
-
-def parse_experience_section(section):
-    """Parse experience section into structured format for Jake's template."""
-    if not section:
-        return []
-        
-    entries = []
-    lines = section.split('\n')[1:]  # Skip the "Experience" header
-    current_entry = []
-    
-    for line in lines:
-        line = line.strip()
-        if line and (line.startswith('•') or line.startswith('-')):
-            if current_entry:
-                current_entry.append(line)
-        elif not line and current_entry:
-            # Process the completed entry
-            entry = process_experience_entry(current_entry)
-            if entry:
-                entries.append(entry)
-            current_entry = []
-        elif line and any(title in line.upper() for title in ['MANAGER', 'DEVELOPER', 'ENGINEER', 'INTERN', 'CAPTAIN', 'LEADER', 'PRESIDENT']):
-            if current_entry:
-                entry = process_experience_entry(current_entry)
-                if entry:
-                    entries.append(entry)
-            current_entry = [line]
-        elif line and current_entry:
-            current_entry.append(line)
-        elif line:
-            current_entry = [line]
-    
-    # Process any remaining entry
-    if current_entry:
-        entry = process_experience_entry(current_entry)
-        if entry:
-            entries.append(entry)
-    
-    return entries
-
-def process_experience_entry(lines):
-    """Helper function to process experience entry lines."""
-    if not lines:
-        return None
-        
-    entry = {
-        'title': '',
-        'organization': '',
-        'location': '',
-        'date': '',
-        'bullets': []
-    }
-    
-    # Process first line (usually contains title, organization, and date)
-    first_line = lines[0]
-    
-    # Try different date formats and preserve the original date format
-    date_match = re.search(r'\((.*?)\)|(?:Sep|Sept|September|Jan|January|Feb|February|Mar|March|Apr|April|May|Jun|June|Jul|July|Aug|August|Oct|October|Nov|November|Dec|December)\s+\d{4}\s*-\s*(?:Present|[A-Za-z]+\s+\d{4})', first_line)
-    if date_match:
-        entry['date'] = date_match.group(0).strip('()')
-        first_line = re.sub(r'\(.*?\)', '', first_line).strip()  # Remove date in parentheses
-        first_line = re.sub(date_match.group(0), '', first_line).strip()  # Remove other date format
-    
-    # Split remaining text by common delimiters but preserve more context
-    parts = [p.strip() for p in re.split(r',(?![^(]*\))', first_line) if p.strip()]
-    
-    # First part is usually the title
-    if parts:
-        entry['title'] = parts[0]
-        
-    # Second part (if exists) is usually the organization
-    if len(parts) > 1:
-        # Check if the second part is a location
-        if any(loc in parts[1].upper() for loc in ['WATERLOO', 'TORONTO', 'ONTARIO', 'UAE']):
-            entry['location'] = parts[1]
-            # Join remaining parts as organization if any
-            if len(parts) > 2:
-                entry['organization'] = ', '.join(parts[2:])
-        else:
-            entry['organization'] = parts[1]
-            # Look for location in remaining parts
-            location_found = False
-            for i, part in enumerate(parts[2:], 2):
-                if any(loc in part.upper() for loc in ['WATERLOO', 'TORONTO', 'ONTARIO', 'UAE']):
-                    entry['location'] = part.strip()
-                    location_found = True
-                    # Join any remaining parts to organization
-                    if i + 1 < len(parts):
-                        entry['organization'] += ', ' + ', '.join(parts[i+1:])
-                    break
-            if not location_found and len(parts) > 2:
-                # If no location found, append remaining parts to organization
-                entry['organization'] += ', ' + ', '.join(parts[2:])
-    
-    # Process all non-empty lines as bullets, preserving more detail
-    entry['bullets'] = []
-    for line in lines[1:]:
-        line = line.strip()
-        if line:
-            # Remove bullet points but keep the content
-            bullet = line.lstrip('•').lstrip('-').strip()
-            if bullet and not any(section in bullet for section in ['Education', 'Experience', 'Projects', 'Skills', 'Leadership', 'Certifications']):
-                entry['bullets'].append(bullet)
-    
-    return entry
+    print(f"Contact info: {resume.contact.as_dict()}")
+    for key in LATEX_ENTRY_RULES:
+        section = resume.sections.get(key)
+        print(f"{key.title()}: {len(section.entries) if section else 0} entries")
 
-def parse_projects_section(section):
-    """Parse projects section into structured format for Jake's template."""
-    if not section:
-        return []
-        
-    entries = []
-    lines = section.split('\n')[1:]  # Skip the "Projects" header
-    current_entry = []
-    
-    for line in lines:
-        line = line.strip()
-        if line and (line.startswith('•') or line.startswith('-')):
-            if current_entry:
-                current_entry.append(line)
-        elif not line and current_entry:
-            # Process the completed entry
-            entry = process_project_entry(current_entry)
-            if entry:
-                entries.append(entry)
-            current_entry = []
-        elif line and ('|' in line or ':' in line):
-            if current_entry:
-                entry = process_project_entry(current_entry)
-                if entry:
-                    entries.append(entry)
-            current_entry = [line]
-        elif line and current_entry:
-            current_entry.append(line)
-        elif line:
-            current_entry = [line]
-    
-    # Process any remaining entry
-    if current_entry:
-        entry = process_project_entry(current_entry)
-        if entry:
-            entries.append(entry)
-    
-    return entries
-
-def process_project_entry(lines):
-    """Helper function to process project entry lines."""
-    if not lines:
-        return None
-        
-    entry = {
-        'name': '',
-        'technologies': '',
-        'date': '2024',  # Default to current year
-        'bullets': []
-    }
-    
-    # Process first line (usually contains project name and technologies)
-    first_line = lines[0]
-    
-    # Extract date if present
-    date_match = re.search(r'\((.*?)\)', first_line)
-    if date_match:
-        entry['date'] = date_match.group(1).strip()
-        first_line = re.sub(r'\(.*?\)', '', first_line).strip()
-    
-    # Try to split by | first, then by :
-    if '|' in first_line:
-        parts = [p.strip() for p in first_line.split('|')]
-        entry['name'] = parts[0]
-        if len(parts) > 1:
-            # Join all remaining parts as technologies
-            entry['technologies'] = ' | '.join(parts[1:])
-    elif ':' in first_line:
-        name, tech = first_line.split(':', 1)
-        entry['name'] = name.strip()
-        entry['technologies'] = tech.strip()
-    else:
-        entry['name'] = first_line
-    
-    # Process all non-empty lines as bullets, preserving more information
-    entry['bullets'] = []
-    for line in lines[1:]:
-        line = line.strip()
-        if line:
-            # Remove bullet points but keep the content
-            bullet = line.lstrip('•').lstrip('-').strip()
-            if bullet:
-                entry['bullets'].append(bullet)
-    
-    return entry
+    return resume
 
 def format_project_entry(project):
     """Format project entry according to Jake's template style."""
     latex = []
     
     # Project name and technologies on the same line, with date right-aligned
-    project_header = f"\\textbf{{{escape_latex(project['name'])}}}"
-    if project['technologies']:
-        project_header += f" | {escape_latex(project['technologies'])}"
-    latex.append(f"{project_header} \\hfill {escape_latex(project['date'])}")
+    project_header = f"\\textbf{{{escape_latex(project.title)}}}"
+    if project.details:
+        project_header += f" | {escape_latex(project.details)}"
+    latex.append(f"{project_header} \\hfill {escape_latex(project.date)}")
     
     # Add bullets
-    if project['bullets']:
-        latex.append("\\begin{itemize}[leftmargin=*]")
-        for bullet in project['bullets']:
-            latex.append(f"  \\item {escape_latex(bullet)}")
-        latex.append("\\end{itemize}")
+    if project.bullets:
+        latex.append(format_bullets(project.bullets))
     
     return "\n".join(latex)
 
@@ -435,10 +141,10 @@ def format_leadership_entry(entry):
     latex = []
     
     # Format the header using resumeSubheading command
-    title = escape_latex(entry['title'])
-    org = escape_latex(entry['organization']) if entry['organization'] else ''
-    loc = escape_latex(entry['location']) if entry['location'] else ''
-    date = escape_latex(entry['date']) if entry['date'] else ''
+    title = escape_latex(entry.title)
+    org = escape_latex(entry.organization) if entry.organization else ''
+    loc = escape_latex(entry.location) if entry.location else ''
+    date = escape_latex(entry.date) if entry.date else ''
     
     # Combine title and organization
     position = title
@@ -449,205 +155,42 @@ def format_leadership_entry(entry):
     latex.append(f"\\resumeSubheading{{{position}}}{{{loc}}}{{{''}}}{{{date}}}")
     
     # Add bullets if any
-    if entry['bullets']:
+    if entry.bullets:
         latex.append("\\resumeItemListStart")
-        for bullet in entry['bullets']:
-            latex.append(f"  \\resumeItem{{{escape_latex(bullet)}}}")
+        for bullet in entry.bullets:
+            latex.append(f"  \\resumeItem{{{escape_latex(bullet.text)}}}")
         latex.append("\\resumeItemListEnd")
     
     return "\n".join(latex)
 
 def format_skills(skills):
-    """Format skills section according to Jake's template style."""
+    """Format skill groups (one Entry per category) according to Jake's template style."""
     if not skills:
         return ""
     
     latex = []
-    for category, skill_list in skills.items():
-        if skill_list:
-            latex.append(f"\\textbf{{{escape_latex(category)}}}: {escape_latex(', '.join(skill_list))}")
+    for group in skills:
+        if group.bullets:
+            latex.append(f"\\textbf{{{escape_latex(group.title)}}}: {escape_latex(', '.join(bullet.text for bullet in group.bullets))}")
     
     return "\\\\\n".join(latex)
 
-def parse_skills_section(section):
-    """Parse skills section into structured format for Jake's template."""
-    technical_skills = {}
-    lines = section.split('\n')[1:]  # Skip the "Skills" header
-    
-    current_category = None
-    
-    for line in lines:
-        line = line.strip()
-        if not line:
-            continue
-            
-        if line.startswith('•'):
-            line = line[1:].strip()
-        
-        if ':' in line:
-            # Start new category
-            category, items = line.split(':', 1)
-            current_category = category.strip()
-            # Split by comma but preserve parenthetical descriptions
-            items = re.findall(r'([^,]+(?:\([^)]*\))?)', items)
-            items = [item.strip() for item in items if item.strip()]
-            if items:
-                technical_skills[current_category] = items
-        elif current_category and line:
-            # Add to current category
-            if current_category not in technical_skills:
-                technical_skills[current_category] = []
-            # Split by comma but preserve parenthetical descriptions
-            items = re.findall(r'([^,]+(?:\([^)]*\))?)', line)
-            technical_skills[current_category].extend([item.strip() for item in items if item.strip()])
-    
-    return technical_skills
-
-def parse_leadership_section(section):
-    """Parse leadership section into structured format for Jake's template."""
-    if not section:
-        return []
-    
-    entries = []
-    lines = section.split('\n')[1:]  # Skip the "Leadership" header
-    current_entry = []
-    
-    for line in lines:
-        line = line.strip()
-        if not line:
-            if current_entry:
-                entry = {
-                    'title': '',
-                    'organization': '',
-                    'location': '',
-                    'date': '',
-                    'bullets': []
-                }
-                
-                # Process header line (title, organization, date)
-                if current_entry[0]:
-                    # Split by comma but preserve parentheses and more context
-                    parts = re.split(r',(?![^(]*\))', current_entry[0])
-                    if len(parts) >= 1:
-                        entry['title'] = parts[0].strip()
-                    if len(parts) >= 2:
-                        entry['organization'] = parts[1].strip()
-                        
-                    # Extract date from parentheses or standard format
-                    date_match = re.search(r'\((.*?)\)|(?:Sep|Sept|September|Jan|January|Feb|February|Mar|March|Apr|April|May|Jun|June|Jul|July|Aug|August|Oct|October|Nov|November|Dec|December)\s+\d{4}\s*-\s*(?:Present|[A-Za-z]+\s+\d{4})', current_entry[0])
-                    if date_match:
-                        entry['date'] = date_match.group(0).strip('()')
-                        
-                    # Look for location in remaining parts
-                    location_found = False
-                    for i, part in enumerate(parts[2:], 2):
-                        if any(loc in part.upper() for loc in ['WATERLOO', 'TORONTO', 'ONTARIO', 'UAE']):
-                            entry['location'] = part.strip()
-                            location_found = True
-                            # Join any remaining parts to organization
-                            if i + 1 < len(parts):
-                                entry['organization'] += ', ' + ', '.join(parts[i+1:])
-                            break
-                    if not location_found and len(parts) > 2:
-                        # If no location found, append remaining parts to organization
-                        entry['organization'] += ', ' + ', '.join(parts[2:])
-                
-                # Process all non-empty lines as bullets, preserving more detail
-                entry['bullets'] = []
-                for line in current_entry[1:]:
-                    line = line.strip()
-                    if line:
-                        # Remove bullet points but keep the content
-                        bullet = line.lstrip('•').lstrip('-').strip()
-                        if bullet and not any(section in bullet for section in ['Education', 'Experience', 'Projects', 'Skills', 'Leadership', 'Certifications']):
-                            entry['bullets'].append(bullet)
-                
-                entries.append(entry)
-                current_entry = []
-        else:
-            current_entry.append(line)
-    
-    # Process any remaining entry
-    if current_entry:
-        entry = {
-            'title': '',
-            'organization': '',
-            'location': '',
-            'date': '',
-            'bullets': []
-        }
-        
-        if current_entry[0]:
-            parts = re.split(r',(?![^(]*\))', current_entry[0])
-            if len(parts) >= 1:
-                entry['title'] = parts[0].strip()
-            if len(parts) >= 2:
-                entry['organization'] = parts[1].strip()
-                
-            date_match = re.search(r'\((.*?)\)|(?:Sep|Sept|September|Jan|January|Feb|February|Mar|March|Apr|April|May|Jun|June|Jul|July|Aug|August|Oct|October|Nov|November|Dec|December)\s+\d{4}\s*-\s*(?:Present|[A-Za-z]+\s+\d{4})', current_entry[0])
-            if date_match:
-                entry['date'] = date_match.group(0).strip('()')
-                
-            location_found = False
-            for i, part in enumerate(parts[2:], 2):
-                if any(loc in part.upper() for loc in ['WATERLOO', 'TORONTO', 'ONTARIO', 'UAE']):
-                    entry['location'] = part.strip()
-                    location_found = True
-                    if i + 1 < len(parts):
-                        entry['organization'] += ', ' + ', '.join(parts[i+1:])
-                    break
-            if not location_found and len(parts) > 2:
-                entry['organization'] += ', ' + ', '.join(parts[2:])
-        
-        # Process all non-empty lines as bullets
-        for line in current_entry[1:]:
-            line = line.strip()
-            if line:
-                bullet = line.lstrip('•').lstrip('-').strip()
-                if bullet and not any(section in bullet for section in ['Education', 'Experience', 'Projects', 'Skills', 'Leadership', 'Certifications']):
-                    entry['bullets'].append(bullet)
-        
-        entries.append(entry)
-    
-    return entries
-
-def parse_certifications_section(section):
-    """Parse certifications section into LaTeX format."""
-    certs = []
-    lines = section.split('\n')[1:]  # Skip the "Certifications" header
-    
-    for line in lines:
-        line = line.strip()
-        if not line:
-            continue
-            
-        if line.startswith('•'):
-            line = line[1:].strip()
-            
-        if line:  # Add any non-empty certification
-            certs.append(line)
-    
-    return certs
-
 def format_education_entry(entry):
     """Format education entry according to Jake's template style."""
     latex = []
     
     # Institution and Location on the same line, with Location right-aligned
-    latex.append(f"\\textbf{{{escape_latex(entry['institution'])}}} \\hfill {escape_latex(entry['location'])}")
+    latex.append(f"\\textbf{{{escape_latex(entry.title)}}} \\hfill {escape_latex(entry.location)}")
     
     # Degree on the next line, with date right-aligned if available
-    if 'date' in entry and entry['date']:
-        latex.append(f"\\textit{{{escape_latex(entry['degree'])}}} \\hfill {escape_latex(entry['date'])}")
+    if entry.date:
+        latex.append(f"\\textit{{{escape_latex(entry.details)}}} \\hfill {escape_latex(entry.date)}")
     else:
-        latex.append(f"\\textit{{{escape_latex(entry['degree'])}}}")
+        latex.append(f"\\textit{{{escape_latex(entry.details)}}}")
     
     # Add bullets if any
-    if entry['bullets']:
-        latex.append("\\begin{itemize}[leftmargin=*]")
-        for bullet in entry['bullets']:
-            latex.append(f"  \\item {escape_latex(bullet)}")
-        latex.append("\\end{itemize}")
+    if entry.bullets:
+        latex.append(format_bullets(entry.bullets))
     
     return "\n".join(latex)
 
@@ -656,24 +199,21 @@ def format_experience_entry(entry):
     latex = []
     
     # Title and Organization on the same line
-    title_org = f"\\textbf{{{escape_latex(entry['title'])}}}"
-    if entry['organization']:
-        title_org += f", {escape_latex(entry['organization'])}"
+    title_org = f"\\textbf{{{escape_latex(entry.title)}}}"
+    if entry.organization:
+        title_org += f", {escape_latex(entry.organization)}"
     
     # Add location and date, right-aligned
-    if entry['location'] and entry['date']:
-        latex.append(f"{title_org} \\hfill {escape_latex(entry['location'])} | {escape_latex(entry['date'])}")
-    elif entry['date']:
-        latex.append(f"{title_org} \\hfill {escape_latex(entry['date'])}")
+    if entry.location and entry.date:
+        latex.append(f"{title_org} \\hfill {escape_latex(entry.location)} | {escape_latex(entry.date)}")
+    elif entry.date:
+        latex.append(f"{title_org} \\hfill {escape_latex(entry.date)}")
     else:
         latex.append(title_org)
     
     # Add bullets
-    if entry['bullets']:
-        latex.append("\\begin{itemize}[leftmargin=*]")
-        for bullet in entry['bullets']:
-            latex.append(f"  \\item {escape_latex(bullet)}")
-        latex.append("\\end{itemize}")
+    if entry.bullets:
+        latex.append(format_bullets(entry.bullets))
     
     return "\n".join(latex)
 
@@ -684,18 +224,16 @@ def format_certifications(certs):
         
     latex = []
     for cert in certs:
-        if 'name' in cert and cert['name']:
-            cert_line = f"\\textbf{{{escape_latex(cert['name'])}}}"
-            if 'issuer' in cert and cert['issuer']:
-                cert_line += f" - {escape_latex(cert['issuer'])}"
-            if 'date' in cert and cert['date']:
-                cert_line += f" \\hfill {escape_latex(cert['date'])}"
+        if cert.title:
+            cert_line = f"\\textbf{{{escape_latex(cert.title)}}}"
+            if cert.organization:
+                cert_line += f" - {escape_latex(cert.organization)}"
+            if cert.date:
+                cert_line += f" \\hfill {escape_latex(cert.date)}"
             latex.append(cert_line)
             
-            if 'description' in cert and cert['description']:
-                latex.append("\\begin{itemize}[leftmargin=*]")
-                latex.append(f"  \\item {escape_latex(cert['description'])}")
-                latex.append("\\end{itemize}")
+            if cert.bullets:
+                latex.append(format_bullets(cert.bullets))
     
     return "\n".join(latex)
 
@@ -706,49 +244,24 @@ def format_bullets(bullets):
     
     latex = ["\\begin{itemize}[leftmargin=*]"]
     for bullet in bullets:
-        latex.append(f"  \\item {escape_latex(bullet)}")
+        latex.append(f"  \\item {escape_latex(bullet.text)}")
     latex.append("\\end{itemize}")
     return "\n".join(latex)
 
-def convert_to_latex(resume_text):
-    """Convert resume text to LaTeX format using Jake's template."""
-    sections = parse_resume_sections(resume_text)
-    
-    # Read the template
-    template_path = os.path.join(os.path.dirname(__file__), 'templates', 'resume_template.tex')
-    with open(template_path, 'r') as f:
-        template_content = f.read()
-    
-    # Create Jinja2 template with strict undefined and proper configuration
-    template = Template(
-        template_content,
-        undefined=StrictUndefined,
-        trim_blocks=True,
-        lstrip_blocks=True,
-        block_start_string='{% ',
-        block_end_string=' %}',
-        variable_start_string='{{ ',
-        variable_end_string=' }}',
-        comment_start_string='{# ',
-        comment_end_string=' #}'
-    )
+def convert_to_latex(resume_text, template_name=None):
+    """Convert resume text to LaTeX format using Jake's template (or another named template)."""
+    template_name = template_name or DEFAULT_TEMPLATE
+    resume = parse_resume_sections(resume_text)
+    template = TEMPLATE_ENV.get_template(template_name)
     
     try:
-        # Parse sections
-        education = parse_education_section(sections['education'])
-        experience = parse_experience_section(sections['experience'])
-        projects = parse_projects_section(sections['projects'])
-        skills = parse_skills_section(sections['skills'])
-        leadership = parse_leadership_section(sections['leadership'])
-        certifications = parse_certifications_section(sections['certifications'])
-        
         # Format sections
-        formatted_education = [format_education_entry(entry) for entry in education]
-        formatted_experience = [format_experience_entry(entry) for entry in experience]
-        formatted_projects = [format_project_entry(project) for project in projects]
-        formatted_skills = format_skills(skills)
-        formatted_leadership = [format_leadership_entry(entry) for entry in leadership] if leadership else None
-        formatted_certifications = format_certifications(certifications) if certifications else None
+        formatted_education = [format_education_entry(entry) for entry in resume.entries('education')]
+        formatted_experience = [format_experience_entry(entry) for entry in resume.entries('experience')]
+        formatted_projects = [format_project_entry(project) for project in resume.entries('projects')]
+        formatted_skills = format_skills(resume.entries('skills'))
+        formatted_leadership = [format_leadership_entry(entry) for entry in resume.entries('leadership')] or None
+        formatted_certifications = format_certifications(resume.entries('certifications')) or None
         
         # Debug print
         print("Formatted sections:")
@@ -760,12 +273,12 @@ def convert_to_latex(resume_text):
         
         # Render template
         latex_content = template.render(
-            name=sections['name'],
-            email=sections['contact']['email'],
-            phone=sections['contact']['phone'],
-            location=sections['contact'].get('location', ''),
-            linkedin=sections['contact']['linkedin'],
-            github=sections['contact'].get('github', ''),
+            name=resume.name,
+            email=resume.contact.email,
+            phone=resume.contact.phone,
+            location=resume.contact.location,
+            linkedin=resume.contact.linkedin,
+            github=resume.contact.github,
             education=formatted_education,
             experience=formatted_experience,
             projects=formatted_projects,
@@ -774,10 +287,8 @@ def convert_to_latex(resume_text):
             certifications=formatted_certifications
         )
         
-        # Debug: Write the generated LaTeX content to a file
-        debug_path = os.path.join(os.path.dirname(__file__), 'debug_output.tex')
-        with open(debug_path, 'w') as f:
-            f.write(latex_content)
+        if LATEX_DEBUG:
+            dump_debug_latex(latex_content, template_name)
         
         return latex_content
         
@@ -785,68 +296,205 @@ def convert_to_latex(resume_text):
         print(f"Error in convert_to_latex: {str(e)}")
         raise
 
-def generate_pdf(latex_content, output_path):
-    """Generate PDF from LaTeX content using pdflatex."""
-    # Create a temporary directory for LaTeX files
-    temp_dir = os.path.dirname(output_path)
-    temp_tex_path = os.path.join(temp_dir, 'temp_resume.tex')
-    
+def get_tex_installation():
+    """
+    Return the TeX installation used for builds: the pdflatex path and its
+    version line. Probed on first use and kept for the life of the process.
+    """
+    global _tex_installation
+    if _tex_installation is None:
+        with _tex_installation_lock:
+            if _tex_installation is None:
+                pdflatex = shutil.which('pdflatex')
+                if pdflatex is None:
+                    raise RuntimeError('pdflatex was not found on PATH')
+                result = subprocess.run([pdflatex, '--version'], capture_output=True, text=True)
+                version = result.stdout.splitlines()[0] if result.stdout else 'unknown version'
+                print(f"🧾 Using {version} ({pdflatex})")
+                _tex_installation = {'pdflatex': pdflatex, 'version': version}
+    return _tex_installation
+
+def read_build_file(path):
+    """Contents of a .log or .aux file pdflatex left behind, or '' if there is none."""
     try:
-        # Write LaTeX content to temporary file
-        with open(temp_tex_path, 'w') as f:
-            f.write(latex_content)
-        
-        # Debug: Print the LaTeX packages installed
-        subprocess.run(['tlmgr', 'list', '--only-installed'], capture_output=True, text=True)
-        
-        # Run pdflatex with detailed error reporting
-        for i in range(2):
-            print(f"LaTeX compilation attempt {i+1}")
+        with open(path, encoding='latin-1') as f:
+            return f.read()
+    except FileNotFoundError:
+        return ''
+
+def needs_rerun(log, aux, previous_aux):
+    """
+    Whether another pdflatex pass is needed: LaTeX or a package asked for
+    one in the log, or the .aux changed since the previous pass (the same
+    checks latexmk makes). The first pass has no previous .aux, so only
+    the log counts there.
+    """
+    if RERUN_PATTERN.search(log):
+        return True
+    return previous_aux is not None and aux != previous_aux
+
+def format_load_failed(output):
+    """Whether pdflatex output shows it could not load its format (rather than an error in the document)."""
+    return bool(FORMAT_ERROR_PATTERN.search(output))
+
+def split_preamble(latex_content):
+    """Split a document into its preamble and the rest, from \\begin{document} on."""
+    preamble, marker, body = latex_content.partition('\\begin{document}')
+    if not marker:
+        return None, latex_content
+    return preamble, marker + body
+
+def get_preamble_format(preamble):
+    """
+    Return the name of a pdflatex format with preamble already loaded,
+    dumping it into LATEX_FORMAT_FOLDER the first time this preamble (and
+    TeX version) is seen. Returns None if the preamble cannot be dumped.
+    """
+    version = get_tex_installation()['version']
+    key = hashlib.sha256(f"{version}\n{preamble}".encode('utf-8')).hexdigest()[:16]
+    name = f"resume-{key}"
+    if os.path.exists(os.path.join(LATEX_FORMAT_FOLDER, name + '.fmt')):
+        return name
+
+    with _format_lock:
+        if os.path.exists(os.path.join(LATEX_FORMAT_FOLDER, name + '.fmt')):
+            return name
+        os.makedirs(LATEX_FORMAT_FOLDER, exist_ok=True)
+        with tempfile.TemporaryDirectory(prefix='.format-build-', dir=LATEX_FORMAT_FOLDER) as build_dir:
+            with open(os.path.join(build_dir, name + '.tex'), 'w') as f:
+                f.write(preamble + '\n\\dump\n')
+            start = time.perf_counter()
             result = subprocess.run([
-                'pdflatex',
+                get_tex_installation()['pdflatex'],
+                '-ini',
                 '-interaction=nonstopmode',
-                '-file-line-error',
-                '-output-directory=' + temp_dir,
-                temp_tex_path
-            ], capture_output=True, text=True)
-            
-            # Print any errors for debugging
-            if result.returncode != 0:
-                print(f"LaTeX Error Output (Attempt {i+1}):")
-                print(result.stderr)
-                print(f"LaTeX Standard Output (Attempt {i+1}):")
-                print(result.stdout)
-                
-                # Check if the PDF was actually created despite errors
-                pdf_path = os.path.join(temp_dir, 'temp_resume.pdf')
-                if not os.path.exists(pdf_path):
-                    raise Exception("PDF file was not created")
-            else:
-                print(f"LaTeX compilation successful on attempt {i+1}")
-        
-        # Move the generated PDF to the desired output path
-        temp_pdf = os.path.join(temp_dir, 'temp_resume.pdf')
-        if os.path.exists(temp_pdf):
-            os.rename(temp_pdf, output_path)
-        
-        # Clean up temporary files
-        for ext in ['.aux', '.log', '.out']:
-            temp_file = os.path.join(temp_dir, 'temp_resume' + ext)
-            if os.path.exists(temp_file):
-                os.remove(temp_file)
+                '-jobname=' + name,
+                '&pdflatex',
+                name + '.tex'
+            ], cwd=build_dir, capture_output=True, text=True)
+            fmt_path = os.path.join(build_dir, name + '.fmt')
+            if not os.path.exists(fmt_path):
+                print(f"⚠️ Could not dump the preamble format, building without it:\n{result.stdout[-2000:]}")
+                return None
+            os.replace(fmt_path, os.path.join(LATEX_FORMAT_FOLDER, name + '.fmt'))
+        print(f"🧱 Dumped preamble format {name} in {(time.perf_counter() - start) * 1000:.0f} ms")
+    return name
+
+def format_environment(fmt):
+    """Environment for a pdflatex that loads fmt from LATEX_FORMAT_FOLDER (None: inherit ours)."""
+    if not fmt:
+        return None
+    # A trailing separator keeps the installation's own format path after ours
+    return dict(os.environ, TEXFORMATS=os.path.abspath(LATEX_FORMAT_FOLDER) + os.pathsep)
+
+def document_format(latex_content):
+    """
+    The cached preamble format for a document and the source to compile
+    against it, or (None, latex_content) when precompiled formats are off
+    or the preamble cannot be dumped.
+    """
+    preamble, body = split_preamble(latex_content)
+    fmt = get_preamble_format(preamble) if LATEX_PRECOMPILED_FORMAT and preamble else None
+    return (fmt, body) if fmt else (None, latex_content)
+
+def run_pdflatex(build_dir, tex_path, fmt=None):
+    """
+    Run pdflatex on tex_path until references settle, at most
+    LATEX_MAX_PASSES times, and return the number of passes. With fmt,
+    the document is compiled against that format from LATEX_FORMAT_FOLDER.
+    """
+    pdflatex = get_tex_installation()['pdflatex']
+    jobname = os.path.splitext(os.path.basename(tex_path))[0]
+    pdf_path = os.path.join(build_dir, jobname + '.pdf')
+    command = [pdflatex, '-interaction=nonstopmode', '-file-line-error', '-output-directory=' + build_dir]
+    if fmt:
+        command.append('-fmt=' + fmt)
+    env = format_environment(fmt)
+
+    previous_aux = None
+    for attempt in range(1, LATEX_MAX_PASSES + 1):
+        result = subprocess.run(command + [tex_path], cwd=build_dir, env=env, capture_output=True, text=True)
         
-        # Remove the temporary tex file
-        if os.path.exists(temp_tex_path):
-            os.remove(temp_tex_path)
+        # Print any errors for debugging
+        if result.returncode != 0:
+            print(f"LaTeX Error Output (Pass {attempt}):")
+            print(result.stderr)
+            print(f"LaTeX Standard Output (Pass {attempt}):")
+            print(result.stdout)
+            
+            # Check if the PDF was actually created despite errors
+            if not os.path.exists(pdf_path):
+                log = read_build_file(os.path.join(build_dir, jobname + '.log'))
+                raise LatexBuildError("PDF file was not created", result.stdout + log)
         
-    except Exception as e:
-        print(f"Error generating PDF: {str(e)}")
-        print("Current directory contents:")
-        print(subprocess.run(['ls', '-la', temp_dir], capture_output=True, text=True).stdout)
-        raise
+        aux = read_build_file(os.path.join(build_dir, jobname + '.aux'))
+        log = read_build_file(os.path.join(build_dir, jobname + '.log'))
+        if not needs_rerun(log, aux, previous_aux):
+            break
+        previous_aux = aux
+    return attempt
 
-def convert_resume_to_latex_pdf(resume_text, output_path):
+def generate_pdf(latex_content, output_path):
+    """
+    Generate PDF from LaTeX content using pdflatex. Each build runs in its
+    own temporary directory next to output_path, so concurrent builds
+    never share file names; the finished PDF is moved into place with an
+    atomic rename and the directory is always removed afterwards.
+
+    With LATEX_PRECOMPILED_FORMAT on, the preamble is loaded from a cached
+    format and only the document body is compiled. If pdflatex cannot
+    load the format (missing, corrupt, or dumped by another TeX build) it
+    is dropped and the whole document is compiled as usual; any other
+    failure is an error in the document and is raised as it is.
+    """
+    output_dir = os.path.dirname(os.path.abspath(output_path))
+    os.makedirs(output_dir, exist_ok=True)
+    start = time.perf_counter()
+
+    with tempfile.TemporaryDirectory(prefix='.latex-build-', dir=output_dir) as build_dir:
+        tex_path = os.path.join(build_dir, 'resume.tex')
+        pdf_path = os.path.join(build_dir, 'resume.pdf')
+        try:
+            fmt, body = document_format(latex_content)
+            passes = None
+            if fmt:
+                with open(tex_path, 'w') as f:
+                    f.write(body)
+                try:
+                    passes = run_pdflatex(build_dir, tex_path, fmt)
+                except LatexBuildError as e:
+                    if not format_load_failed(e.output):
+                        raise
+                    print(f"⚠️ pdflatex could not load format {fmt}, dropping it and building the full document")
+                    with contextlib.suppress(FileNotFoundError):
+                        os.remove(os.path.join(LATEX_FORMAT_FOLDER, fmt + '.fmt'))
+                    fmt = None
+
+            if passes is None:
+                # Write LaTeX content to the build directory
+                with open(tex_path, 'w') as f:
+                    f.write(latex_content)
+                passes = run_pdflatex(build_dir, tex_path)
+            
+            # Same file system, so readers see either the old PDF or the new one
+            os.replace(pdf_path, output_path)
+            
+        except Exception as e:
+            print(f"Error generating PDF: {str(e)}")
+            print(f"Build directory contents: {sorted(os.listdir(build_dir))}")
+            raise
+
+    elapsed = time.perf_counter() - start
+    how = f"format {fmt}" if fmt else 'full preamble'
+    print(f"📄 LaTeX build took {elapsed * 1000:.0f} ms ({passes} pass{'es' if passes > 1 else ''}, {how})")
+    return output_path
+
+def convert_resume_to_latex_pdf(resume_text, output_path, template_name=None):
     """Convert resume text to LaTeX and generate PDF."""
-    latex_content = convert_to_latex(resume_text)
-    generate_pdf(latex_content, output_path)
-    return output_path 
\ No newline at end of file
+    latex_content = convert_to_latex(resume_text, template_name)
+    if LATEX_ENGINE in ('prespawn', 'workers'):
+        from latex_workers import get_worker_pool
+        get_worker_pool().build(latex_content, output_path)
+    else:
+        generate_pdf(latex_content, output_path)
+    return output_path 
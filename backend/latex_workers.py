@@ -0,0 +1,243 @@
+import atexit
+import os
+import queue
+import shutil
+import subprocess
+import tempfile
+import threading
+
+from cache import CACHE_FOLDER
+from latex_converter import (
+    LATEX_MAX_PASSES,
+    LatexBuildError,
+    document_format,
+    format_environment,
+    format_load_failed,
+    generate_pdf,
+    get_tex_installation,
+    needs_rerun,
+    read_build_file,
+)
+
+# Prespawn pool sizing: how many builds can run at once, each with a
+# pdflatex started ahead of time (override with environment variables)
+LATEX_WORKERS = int(os.getenv("LATEX_WORKERS", "2"))
+# A slot gets a fresh build directory after this many documents
+LATEX_WORKER_MAX_JOBS = int(os.getenv("LATEX_WORKER_MAX_JOBS", "100"))
+# How long a build waits for a free slot before giving up
+LATEX_WORKER_WAIT = float(os.getenv("LATEX_WORKER_WAIT", "10"))
+# A pdflatex pass that takes longer than this is killed
+LATEX_WORKER_TIMEOUT = float(os.getenv("LATEX_WORKER_TIMEOUT", "60"))
+
+# Absolute, since pdflatex runs inside the slot's build directory
+WORKER_FOLDER = os.path.abspath(os.path.join(CACHE_FOLDER, "latex-workers"))
+
+
+class WorkersBusyError(Exception):
+    """Raised when no prespawn slot frees up within LATEX_WORKER_WAIT seconds."""
+
+
+class LatexWorkerError(Exception):
+    """Raised when a prespawned pdflatex dies, hangs or cannot load its format, whatever the document."""
+
+
+def move_into_place(source, destination):
+    """Move a finished PDF to destination atomically, even across file systems."""
+    try:
+        os.replace(source, destination)
+    except OSError:
+        fd, staging = tempfile.mkstemp(suffix=".pdf", dir=os.path.dirname(os.path.abspath(destination)))
+        os.close(fd)
+        shutil.copyfile(source, staging)
+        os.replace(staging, destination)
+
+
+class LatexWorker:
+    """
+    One slot of the prespawn pool: a private build directory and a
+    pdflatex process started ahead of time. This is not a persistent
+    worker: TeX compiles a single document per process, so every build
+    still gets a new pdflatex, and what the pool saves is the wait for its
+    start-up and format load. The process is started with no input file;
+    it loads its format, runs the \\relax it is given as the first line,
+    then blocks on stdin at the `*` prompt until a job sends it
+    `\\input{...}`. After every job the slot starts the next process
+    straight away, so the following job finds one waiting.
+    """
+
+    def __init__(self, index):
+        self.index = index
+        self.directory = None
+        self.process = None
+        self.fmt = None
+        self.jobs = 0
+
+    def spawn(self, fmt):
+        """Start a waiting pdflatex for fmt in the build directory, as it is."""
+        command = [get_tex_installation()["pdflatex"], "-file-line-error", "-jobname=resume", "-output-directory=" + self.directory]
+        if fmt:
+            command.append("-fmt=" + fmt)
+        self.process = subprocess.Popen(
+            command,
+            cwd=self.directory,
+            env=format_environment(fmt),
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            encoding="utf-8",
+            errors="replace",
+        )
+        self.fmt = fmt
+        try:
+            self.process.stdin.write("\\relax\n")
+            self.process.stdin.flush()
+        except BrokenPipeError:
+            pass  # It already exited (a bad format, say); compile reports that
+
+    def reset(self, fmt):
+        """Stop the current process, clear (or after LATEX_WORKER_MAX_JOBS, replace) the directory and spawn again."""
+        self.stop()
+        if self.directory is None or self.jobs >= LATEX_WORKER_MAX_JOBS:
+            if self.directory is not None:
+                shutil.rmtree(self.directory, ignore_errors=True)
+            os.makedirs(WORKER_FOLDER, exist_ok=True)
+            self.directory = tempfile.mkdtemp(prefix=f"worker-{self.index}-", dir=WORKER_FOLDER)
+            self.jobs = 0
+        else:
+            for name in os.listdir(self.directory):
+                os.remove(os.path.join(self.directory, name))
+        self.spawn(fmt)
+
+    def healthy(self, fmt):
+        """Whether the waiting process is still alive and was started for fmt."""
+        return self.process is not None and self.process.poll() is None and self.fmt == fmt
+
+    def compile(self, tex_name):
+        """Hand tex_name to the waiting process and return its exit code and output."""
+        process, self.process = self.process, None
+        if process.poll() is not None:
+            raise LatexWorkerError(f"pdflatex exited (code {process.returncode}) before it was given the document")
+        try:
+            output, _ = process.communicate(f"\\nonstopmode\\input{{{tex_name}}}\n", timeout=LATEX_WORKER_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.communicate()
+            raise LatexWorkerError(f"pdflatex took longer than {LATEX_WORKER_TIMEOUT:.0f}s")
+        except OSError as e:
+            process.kill()
+            raise LatexWorkerError(f"lost the pdflatex process ({e})")
+        return process.returncode, output
+
+    def stop(self):
+        if self.process is not None:
+            self.process.kill()
+            self.process.communicate()
+            self.process = None
+
+    def close(self):
+        self.stop()
+        if self.directory is not None:
+            shutil.rmtree(self.directory, ignore_errors=True)
+            self.directory = None
+
+
+class LatexWorkerPool:
+    """
+    The prespawn pool (LATEX_ENGINE=prespawn): a fixed set of
+    LatexWorker slots, each holding the pdflatex for its next build. A
+    build borrows an idle slot, waiting at most LATEX_WORKER_WAIT seconds
+    for one before raising WorkersBusyError, so a burst of requests cannot
+    queue up unbounded pdflatex work. A slot whose process died or was
+    started for another format is restarted before use. A build the
+    prespawned process itself fails (LatexWorkerError: it died, hung or
+    could not load its format) falls back to generate_pdf; an error in the
+    document is raised as LatexBuildError straight away, as generate_pdf
+    would raise it.
+    """
+
+    def __init__(self, size=LATEX_WORKERS):
+        self._idle = queue.Queue()
+        self._workers = [LatexWorker(index) for index in range(size)]
+        for worker in self._workers:
+            self._idle.put(worker)
+
+    def build(self, latex_content, output_path):
+        fmt, source = document_format(latex_content)
+        try:
+            worker = self._idle.get(timeout=LATEX_WORKER_WAIT)
+        except queue.Empty:
+            raise WorkersBusyError("All LaTeX builds are busy. Please try again shortly.")
+
+        try:
+            if not worker.healthy(fmt):
+                worker.reset(fmt)
+            try:
+                self._compile(worker, fmt, source, output_path)
+            except LatexWorkerError as e:
+                print(f"⚠️ Prespawned pdflatex {worker.index} failed ({e}), building in a fresh pdflatex instead")
+                generate_pdf(latex_content, output_path)
+            worker.jobs += 1
+        finally:
+            try:
+                # Leave a clean directory and a warm process for the next job
+                worker.reset(fmt)
+            finally:
+                self._idle.put(worker)
+        return output_path
+
+    def _compile(self, worker, fmt, source, output_path):
+        with open(os.path.join(worker.directory, "body.tex"), "w") as f:
+            f.write(source)
+        pdf_path = os.path.join(worker.directory, "resume.pdf")
+
+        previous_aux = None
+        for attempt in range(1, LATEX_MAX_PASSES + 1):
+            if attempt > 1:
+                # The last process exited with the document; later passes need a new one
+                worker.spawn(fmt)
+            returncode, output = worker.compile("body.tex")
+            if returncode != 0:
+                print(f"LaTeX Output (Worker {worker.index}, Pass {attempt}):")
+                print(output)
+                if not os.path.exists(pdf_path):
+                    log = read_build_file(os.path.join(worker.directory, "resume.log"))
+                    # Killed by a signal, or stopped before reading the document
+                    if returncode < 0 or not log or format_load_failed(output + log):
+                        raise LatexWorkerError(f"pdflatex exited with code {returncode} without a PDF")
+                    raise LatexBuildError("PDF file was not created", output + log)
+
+            aux = read_build_file(os.path.join(worker.directory, "resume.aux"))
+            log = read_build_file(os.path.join(worker.directory, "resume.log"))
+            if not needs_rerun(log, aux, previous_aux):
+                break
+            previous_aux = aux
+
+        move_into_place(pdf_path, output_path)
+        print(f"📄 Prespawned pdflatex {worker.index} built {os.path.basename(output_path)} ({attempt} pass{'es' if attempt > 1 else ''})")
+
+    def close(self):
+        for worker in self._workers:
+            worker.close()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_worker_pool():
+    """Return the shared prespawn pool, creating it on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = LatexWorkerPool()
+            atexit.register(shutdown_worker_pool)
+    return _pool
+
+
+def shutdown_worker_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
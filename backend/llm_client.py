@@ -0,0 +1,269 @@
+import asyncio
+import json
+import os
+import threading
+
+import httpx
+
+from resilience import (
+    MAX_RETRIES,
+    RETRYABLE_STATUSES,
+    CircuitBreaker,
+    CircuitOpenError,
+    RetryBudget,
+    backoff_delay,
+)
+
+# Connection settings (override with environment variables). OPENAI_API_BASE
+# can point at a local stand-in server, e.g. benchmarks/fake_openai_server.py
+API_BASE = os.getenv("OPENAI_API_BASE", "https://api.openai.com/v1")
+MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "16"))
+REQUEST_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "120"))
+CONNECT_TIMEOUT = float(os.getenv("LLM_CONNECT_TIMEOUT", "10"))
+
+
+class LLMError(Exception):
+    """Raised when the chat completions endpoint answers with an error status."""
+
+    def __init__(self, status_code, message, retry_after=None):
+        super().__init__(f"LLM request failed with status {status_code}: {message}")
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class AsyncLLMClient:
+    """
+    Chat completions client that shares one pooled httpx.AsyncClient.
+
+    The HTTP client and the concurrency semaphore live on a dedicated
+    event-loop thread, so every caller (sync code, worker threads, or other
+    event loops) shares the same connection pool and the same limit of
+    max_concurrency requests in flight. That thread also owns the retry
+    budget and circuit breaker, so their state needs no locking.
+    """
+
+    def __init__(self, api_base=API_BASE, api_key=None, max_concurrency=MAX_CONCURRENCY, timeout=REQUEST_TIMEOUT,
+                 max_retries=MAX_RETRIES):
+        self.api_base = api_base.rstrip("/")
+        self.api_key = api_key
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.breaker = CircuitBreaker()
+        self.retry_budget = RetryBudget()
+        self.counters = {
+            "calls": 0,
+            "successes": 0,
+            "failures": 0,
+            "retries": 0,
+            "retries_denied": 0,
+            "short_circuited": 0,
+        }
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="llm-client", daemon=True)
+        self._thread.start()
+        self._http = None
+        self._semaphore = None
+
+    def run(self, coro):
+        """Run a coroutine on the client's loop and block until it finishes (for sync callers)."""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    async def chat(self, messages, model, temperature=0, timeout=None):
+        """Send a chat completion request and return the message content."""
+        payload = {"model": model, "temperature": temperature, "messages": messages}
+        data = await self._on_loop(self._with_resilience(lambda: self._send("/chat/completions", payload, timeout)))
+        return data["choices"][0]["message"]["content"]
+
+    async def stream_chat(self, messages, model, temperature=0, timeout=None):
+        """
+        Async generator over the message content of a streamed chat
+        completion, yielding text deltas as they arrive. Retries only apply
+        until the response starts; timeout bounds each read.
+        """
+        payload = {"model": model, "temperature": temperature, "messages": messages, "stream": True}
+        caller_loop = asyncio.get_running_loop()
+        if caller_loop is self._loop:
+            async for delta in self._stream(payload, timeout):
+                yield delta
+            return
+
+        # Relay deltas produced on the client loop to the caller's loop
+        queue = asyncio.Queue()
+
+        async def pump():
+            try:
+                async for delta in self._stream(payload, timeout):
+                    caller_loop.call_soon_threadsafe(queue.put_nowait, (delta, None))
+            except BaseException as e:
+                caller_loop.call_soon_threadsafe(queue.put_nowait, (None, e))
+                return
+            caller_loop.call_soon_threadsafe(queue.put_nowait, (None, None))
+
+        future = asyncio.run_coroutine_threadsafe(pump(), self._loop)
+        try:
+            while True:
+                delta, error = await queue.get()
+                if error is not None:
+                    raise error
+                if delta is None:
+                    return
+                yield delta
+        finally:
+            future.cancel()
+
+    async def aclose(self):
+        await self._on_loop(self._close())
+
+    def metrics(self):
+        """Retry and circuit breaker counters for this process."""
+        return dict(
+            self.counters,
+            circuit_state=self.breaker.state,
+            circuit_opens=self.breaker.open_count,
+            circuit_open_seconds=round(self.breaker.total_open_seconds(), 3),
+        )
+
+    async def _on_loop(self, coro):
+        # httpx clients are bound to the loop that created them, so hop onto ours
+        if asyncio.get_running_loop() is self._loop:
+            return await coro
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, self._loop))
+
+    def _client(self):
+        if self._http is None:
+            api_key = self.api_key or os.getenv("OPENAI_API_KEY")
+            self._http = httpx.AsyncClient(
+                base_url=self.api_base,
+                headers={"Authorization": f"Bearer {api_key}"} if api_key else {},
+                timeout=httpx.Timeout(self.timeout, connect=CONNECT_TIMEOUT),
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrency,
+                    max_keepalive_connections=self.max_concurrency,
+                ),
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._http
+
+    async def _with_resilience(self, attempt_request):
+        """
+        Await attempt_request() with jittered exponential backoff on 429/5xx
+        and transport errors, limited by the retry budget and guarded by the
+        breaker.
+        """
+        self.counters["calls"] += 1
+        self.retry_budget.record_call()
+        attempt = 0
+        while True:
+            if not self.breaker.allow():
+                self.counters["short_circuited"] += 1
+                raise CircuitOpenError("LLM upstream is unavailable (circuit open); failing fast.")
+
+            try:
+                result = await attempt_request()
+            except (LLMError, httpx.TransportError) as e:
+                retryable = isinstance(e, httpx.TransportError) or e.status_code in RETRYABLE_STATUSES
+                # Client errors (bad request, auth) say nothing about upstream health
+                if retryable:
+                    self.breaker.record_failure()
+                else:
+                    self.breaker.record_success()
+
+                if not retryable or attempt >= self.max_retries:
+                    self.counters["failures"] += 1
+                    raise
+                if not self.retry_budget.try_spend():
+                    self.counters["retries_denied"] += 1
+                    self.counters["failures"] += 1
+                    raise
+
+                delay = backoff_delay(attempt, retry_after=getattr(e, "retry_after", None))
+                attempt += 1
+                self.counters["retries"] += 1
+                print(f"🔁 LLM call failed ({str(e)[:80]}); retry {attempt}/{self.max_retries} in {delay:.1f}s")
+                await asyncio.sleep(delay)
+                continue
+            except BaseException:
+                # A malformed body or a cancelled call says nothing about
+                # upstream health, but must not hold the half-open trial forever
+                self.breaker.release_trial()
+                raise
+
+            self.breaker.record_success()
+            self.counters["successes"] += 1
+            return result
+
+    async def _send(self, path, payload, timeout):
+        client = self._client()
+        async with self._semaphore:
+            response = await client.post(path, json=payload, timeout=timeout if timeout is not None else httpx.USE_CLIENT_DEFAULT)
+        if response.status_code >= 400:
+            raise LLMError(response.status_code, response.text[:500], _retry_after(response))
+        return response.json()
+
+    async def _open_stream(self, path, payload, timeout):
+        # The semaphore stays held until _stream finishes reading the response
+        client = self._client()
+        await self._semaphore.acquire()
+        try:
+            request = client.build_request(
+                "POST", path, json=payload,
+                timeout=timeout if timeout is not None else httpx.USE_CLIENT_DEFAULT,
+            )
+            response = await client.send(request, stream=True)
+            if response.status_code >= 400:
+                await response.aread()
+                await response.aclose()
+                raise LLMError(response.status_code, response.text[:500], _retry_after(response))
+        except BaseException:
+            self._semaphore.release()
+            raise
+        return response
+
+    async def _stream(self, payload, timeout):
+        response = await self._with_resilience(lambda: self._open_stream("/chat/completions", payload, timeout))
+        try:
+            # Server-sent events: "data: {chunk json}" lines, ending with "data: [DONE]"
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    break
+                try:
+                    choices = json.loads(data).get("choices") or [{}]
+                except json.JSONDecodeError:
+                    # A cut-off or garbled event: the rest of the answer can't be trusted
+                    raise LLMError(response.status_code, f"malformed stream chunk: {data[:80]}")
+                delta = choices[0].get("delta", {}).get("content")
+                if delta:
+                    yield delta
+        finally:
+            await response.aclose()
+            self._semaphore.release()
+
+    async def _close(self):
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+
+def _retry_after(response):
+    try:
+        return float(response.headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        return None
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_llm_client():
+    """Return the process-wide AsyncLLMClient, creating it on first use."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = AsyncLLMClient()
+    return _client
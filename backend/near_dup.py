@@ -0,0 +1,263 @@
+import difflib
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+import numpy as np
+
+from ats_scorer import tokenize
+from cache import CACHE_FOLDER
+
+# What to do about near-duplicate uploads (override with environment variables):
+#   off    - don't compute signatures at all
+#   report - report the most similar earlier resume and what changed
+#   reuse  - also reuse the earlier resume's cached analysis instead of calling the LLM
+# Either way, an upload is only compared with earlier uploads of the same owner
+NEAR_DUP_MODE = os.getenv("NEAR_DUP_MODE", "report")
+# Minimum estimated Jaccard similarity of word shingles to count as a near-duplicate
+NEAR_DUP_THRESHOLD = float(os.getenv("NEAR_DUP_THRESHOLD", "0.9"))
+# Remembered resumes are forgotten after NEAR_DUP_TTL seconds, oldest first
+# once there are more than NEAR_DUP_MAX_ENTRIES
+NEAR_DUP_TTL = int(os.getenv("NEAR_DUP_TTL", str(30 * 24 * 3600)))
+NEAR_DUP_MAX_ENTRIES = int(os.getenv("NEAR_DUP_MAX_ENTRIES", "10000"))
+
+SHINGLE_SIZE = 3
+# 16 bands of 8 rows: pairs around 0.7 similarity or more almost always share a band
+NUM_BANDS = 16
+ROWS_PER_BAND = 8
+NUM_PERM = NUM_BANDS * ROWS_PER_BAND
+
+# Universal hashing modulo a Mersenne prime; with values below 2**31 the
+# products fit in 64 bits
+_PRIME = (1 << 31) - 1
+_rng = np.random.default_rng(20240611)
+_PERM_A = _rng.integers(1, _PRIME, NUM_PERM, dtype=np.uint64)
+_PERM_B = _rng.integers(0, _PRIME, NUM_PERM, dtype=np.uint64)
+_SHINGLE_MULTIPLIERS = [np.uint64(m) for m in _rng.integers(1, _PRIME, SHINGLE_SIZE, dtype=np.uint64)]
+
+
+def shingle_hashes(text):
+    """Stable 31-bit hashes of the overlapping SHINGLE_SIZE-word runs of text."""
+    tokens = tokenize(text)
+    if not tokens:
+        return np.empty(0, dtype=np.uint64)
+    token_hashes = np.fromiter((zlib.crc32(token.encode("utf-8")) for token in tokens), dtype=np.uint64, count=len(tokens))
+    width = min(SHINGLE_SIZE, len(tokens))
+    count = len(tokens) - width + 1
+    hashes = np.zeros(count, dtype=np.uint64)
+    for offset in range(width):
+        hashes = (hashes + (token_hashes[offset:offset + count] % _PRIME) * _SHINGLE_MULTIPLIERS[offset] % _PRIME) % _PRIME
+    return np.unique(hashes)
+
+
+def minhash_signature(text):
+    """
+    MinHash signature of text's word shingles: NUM_PERM uint32 minima, one
+    per hash permutation. The share of equal positions in two signatures
+    estimates the Jaccard similarity of the two shingle sets.
+    """
+    hashes = shingle_hashes(text)
+    if not len(hashes):
+        return np.full(NUM_PERM, _PRIME, dtype=np.uint32)
+    permuted = (hashes[:, None] * _PERM_A[None, :] + _PERM_B[None, :]) % _PRIME
+    return permuted.min(axis=0).astype(np.uint32)
+
+
+def similarity(signature, other):
+    """Estimated Jaccard similarity of two MinHash signatures."""
+    return float(np.mean(signature == other))
+
+
+def band_buckets(signature):
+    """One bucket id (a signed 64-bit int, for SQLite) per LSH band."""
+    rows = signature.reshape(NUM_BANDS, ROWS_PER_BAND)
+    return [
+        int.from_bytes(hashlib.blake2b(row.tobytes(), digest_size=8).digest(), "little", signed=True)
+        for row in rows
+    ]
+
+
+def owner_key(client_id):
+    """
+    The owner id stored for a client-supplied id: a hash, so the id itself
+    is never written to disk. Ids shorter than 16 characters are too easy
+    to guess and count as no owner ("").
+    """
+    client_id = (client_id or "").strip()
+    if len(client_id) < 16:
+        return ""
+    return hashlib.sha256(f"near-dup-owner:{client_id}".encode("utf-8")).hexdigest()
+
+
+def diff_summary(old_text, new_text, max_lines=40):
+    """Counts of added and removed lines plus the start of a unified diff."""
+    old_lines = [" ".join(line.split()) for line in old_text.splitlines() if line.strip()]
+    new_lines = [" ".join(line.split()) for line in new_text.splitlines() if line.strip()]
+    diff = list(difflib.unified_diff(old_lines, new_lines, "previous", "current", n=0, lineterm=""))
+    changes = [line for line in diff if line[:1] in "+-" and line[:3] not in ("+++", "---")]
+    return {
+        "added_lines": sum(1 for line in changes if line.startswith("+")),
+        "removed_lines": sum(1 for line in changes if line.startswith("-")),
+        "diff": diff[:max_lines],
+    }
+
+
+class NearDupIndex:
+    """
+    MinHash/LSH index of previously seen resumes, stored in SQLite next to
+    the other caches.
+
+    Resumes are kept per owner (an opaque id for whoever uploaded them)
+    and are only ever matched against the same owner's other resumes, so
+    one person's text is never shown to someone else. Each resume is
+    stored once per owner and normalized-text digest with its signature
+    and compressed text (for diffs), and is listed in one bucket per LSH
+    band. A lookup reads NUM_BANDS indexed buckets and compares signatures
+    only against the candidates found there, so its cost depends on how
+    many similar resumes exist, not on how many are stored. Like
+    DiskCache, entries expire after ttl seconds and the oldest are dropped
+    beyond max_entries.
+    """
+
+    def __init__(self, name="near_dup", threshold=NEAR_DUP_THRESHOLD, ttl=NEAR_DUP_TTL, max_entries=NEAR_DUP_MAX_ENTRIES):
+        os.makedirs(CACHE_FOLDER, exist_ok=True)
+        self.path = os.path.join(CACHE_FOLDER, f"{name}.sqlite3")
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(documents)")]
+        if columns and "owner" not in columns:
+            # Resumes remembered before matching was scoped to an owner cannot
+            # be attributed to anyone, so they are dropped rather than kept
+            print("🧹 Dropping near-duplicate entries stored without an owner")
+            self._conn.execute("DROP TABLE documents")
+            self._conn.execute("DROP TABLE IF EXISTS buckets")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS documents (
+                owner TEXT NOT NULL,
+                digest TEXT NOT NULL,
+                signature BLOB NOT NULL,
+                text BLOB NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (owner, digest)
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS documents_created ON documents (created_at)")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS buckets (
+                band INTEGER NOT NULL,
+                bucket INTEGER NOT NULL,
+                owner TEXT NOT NULL,
+                digest TEXT NOT NULL,
+                PRIMARY KEY (band, bucket, owner, digest)
+            ) WITHOUT ROWID
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS buckets_document ON buckets (owner, digest)")
+        self._conn.commit()
+
+    def add(self, digest, text, signature=None, owner=""):
+        """Remember one owner's resume under its text digest (a no-op if already known)."""
+        signature = minhash_signature(text) if signature is None else signature
+        with self._lock:
+            inserted = self._conn.execute(
+                "INSERT OR IGNORE INTO documents (owner, digest, signature, text, created_at) VALUES (?, ?, ?, ?, ?)",
+                (owner, digest, signature.tobytes(), zlib.compress(text.encode("utf-8")), time.time()),
+            ).rowcount
+            if inserted:
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO buckets (band, bucket, owner, digest) VALUES (?, ?, ?, ?)",
+                    [(band, bucket, owner, digest) for band, bucket in enumerate(band_buckets(signature))],
+                )
+                self._evict()
+            self._conn.commit()
+
+    def query(self, text=None, signature=None, exclude=None, threshold=None, limit=5, owner=""):
+        """
+        The owner's earlier resumes at least threshold similar to text (or
+        to a precomputed signature), most similar first, as dicts with
+        their digest, similarity and created_at. exclude skips one digest,
+        normally the query's own.
+        """
+        signature = minhash_signature(text) if signature is None else signature
+        threshold = self.threshold if threshold is None else threshold
+        with self._lock:
+            candidates = set()
+            for band, bucket in enumerate(band_buckets(signature)):
+                candidates.update(
+                    row[0] for row in self._conn.execute(
+                        "SELECT digest FROM buckets WHERE band = ? AND bucket = ? AND owner = ?", (band, bucket, owner)
+                    )
+                )
+            candidates.discard(exclude)
+            if not candidates:
+                return []
+            placeholders = ",".join("?" * len(candidates))
+            rows = self._conn.execute(
+                f"SELECT digest, signature, created_at FROM documents WHERE owner = ? AND digest IN ({placeholders})"
+                " AND created_at >= ?",
+                [owner, *candidates, self._oldest_kept()],
+            ).fetchall()
+
+        matches = []
+        for digest, stored, created_at in rows:
+            score = similarity(signature, np.frombuffer(stored, dtype=np.uint32))
+            if score >= threshold:
+                matches.append({"digest": digest, "similarity": round(score, 3), "created_at": created_at})
+        matches.sort(key=lambda match: -match["similarity"])
+        return matches[:limit]
+
+    def get_text(self, digest, owner=""):
+        """The stored text of one of the owner's remembered resumes, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT text FROM documents WHERE owner = ? AND digest = ? AND created_at >= ?",
+                (owner, digest, self._oldest_kept()),
+            ).fetchone()
+        return zlib.decompress(row[0]).decode("utf-8") if row else None
+
+    def stats(self):
+        with self._lock:
+            documents = self._conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+        return {"mode": NEAR_DUP_MODE, "threshold": self.threshold, "documents": documents}
+
+    def _oldest_kept(self):
+        return time.time() - self.ttl if self.ttl is not None else 0
+
+    def _evict(self):
+        # Caller must hold self._lock
+        doomed = []
+        if self.ttl is not None:
+            doomed += self._conn.execute(
+                "SELECT owner, digest FROM documents WHERE created_at < ?", (self._oldest_kept(),)
+            ).fetchall()
+        if self.max_entries is not None:
+            doomed += self._conn.execute(
+                "SELECT owner, digest FROM documents ORDER BY created_at DESC LIMIT -1 OFFSET ?", (self.max_entries,)
+            ).fetchall()
+        if doomed:
+            self._conn.executemany("DELETE FROM buckets WHERE owner = ? AND digest = ?", doomed)
+            self._conn.executemany("DELETE FROM documents WHERE owner = ? AND digest = ?", doomed)
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_near_dup_index():
+    """Return the process-wide NearDupIndex, opening it on first use."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = NearDupIndex()
+    return _index
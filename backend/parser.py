@@ -1,53 +1,161 @@
+import asyncio
+import hashlib
 import json
-import openai
-import pdfplumber
-import spacy
 import os
+import threading
+from collections import Counter
+import httpx
 from dotenv import load_dotenv
+from cache import DiskCache
+from llm_client import LLMError, get_llm_client
+from resilience import CircuitOpenError
+from incremental_json import IncrementalObjectParser
+from near_dup import NEAR_DUP_MODE, get_near_dup_index, diff_summary
+from prompt_builder import PAGE_BREAK, CHUNK_NOTE, prepare_resume_text, chunk_prompt_text, merge_analyses, truncation_note
+from pdf_engines import DEFAULT_ENGINE, PDF_PROCESSES, iter_engine_pages, extract_pages_parallel, extract_many
 
 # Load environment variables from key.env file in root directory
 load_dotenv('../key.env')
-openai.api_key = os.getenv("OPENAI_API_KEY")
 
+# spaCy is slow to import, so it is loaded on first use (or up front by
+# warm_up()) instead of at import time
+_nlp = None
+_load_lock = threading.Lock()
 
+def get_nlp():
+    """Return the English NLP model, loading it on first use."""
+    global _nlp
+    if _nlp is None:
+        with _load_lock:
+            if _nlp is None:
+                import spacy
+                _nlp = spacy.load("en_core_web_sm")
+    return _nlp
 
-# Load the English NLP model
-nlp = spacy.load("en_core_web_sm")
+def warm_up(nlp=True, llm=True):
+    """
+    Load the heavy dependencies now rather than on the first request.
+    Call this from worker start-up hooks for processes that will need them.
+    """
+    if nlp:
+        get_nlp()
+    if llm:
+        get_llm_client()
+
+# Extracted PDF text keyed by the SHA-256 of the file contents
+TEXT_CACHE = DiskCache(
+    "pdf_text",
+    max_entries=int(os.getenv("PDF_TEXT_CACHE_ENTRIES", "5000")),
+    max_bytes=int(os.getenv("PDF_TEXT_CACHE_BYTES", str(200 * 1024 * 1024))),
+)
+# Bump when the layout of extracted text changes so old cache entries are not reused
+TEXT_FORMAT_VERSION = 2
+
+# Pages are joined with a form feed line so the prompt builder can tell where
+# each page starts (whitespace normalization drops it from cache keys)
+PAGE_SEPARATOR = f"\n{PAGE_BREAK}\n"
+
+def _clean_pages(texts):
+    for text in texts:
+        if text:
+            # Ensure proper UTF-8 encoding
+            yield text.encode("utf-8", "ignore").decode("utf-8", "ignore")
+
+# Stream the text of a PDF one page at a time
+def iter_pdf_pages(pdf_path, engine=None):
+    """
+    Yield the text of each non-empty page in order. Every page is laid out
+    exactly once and released before the next page is read, so memory
+    stays bounded to a single page. engine picks the extraction backend
+    (see pdf_engines.ENGINES); it defaults to PDF_ENGINE.
+    """
+    yield from _clean_pages(text for _, text in iter_engine_pages(pdf_path, engine))
 
 # Function to extract plain text from a PDF
-def extract_text_from_pdf(pdf_path):
-    with pdfplumber.open(pdf_path) as pdf:
-        text = "\n".join(page.extract_text() for page in pdf.pages if page.extract_text())
+def extract_text_from_pdf(pdf_path, on_page=None, engine=None):
+    """
+    Return the text of the whole PDF. on_page, if given, is called with the
+    1-based page count after each page so callers can report progress.
+    When PDF_PROCESSES is set, long documents are split across the shared
+    process pool instead of being streamed in this process.
+    """
+    if PDF_PROCESSES > 0:
+        page_texts = _clean_pages(extract_pages_parallel(pdf_path, engine))
+    else:
+        page_texts = iter_pdf_pages(pdf_path, engine)
+
+    pages = []
+    for page_text in page_texts:
+        pages.append(page_text)
+        if on_page:
+            on_page(len(pages))
+    return PAGE_SEPARATOR.join(pages)
+
+
+def file_sha256(path):
+    """Return the hex SHA-256 digest of a file's bytes."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def extract_text_cached(pdf_path, on_page=None, engine=None):
+    """
+    Same as extract_text_from_pdf, but re-uploads of an identical file are
+    served from TEXT_CACHE instead of being parsed again.
+    """
+    # Engines lay text out differently, so each gets its own entry
+    key = f"{file_sha256(pdf_path)}:{engine or DEFAULT_ENGINE}:v{TEXT_FORMAT_VERSION}"
+    text = TEXT_CACHE.get(key)
+    if text is None:
+        text = extract_text_from_pdf(pdf_path, on_page=on_page, engine=engine)
+        TEXT_CACHE.set(key, text)
+    return text
 
-    # Ensure proper UTF-8 encoding
-    return text.encode("utf-8", "ignore").decode("utf-8", "ignore")
+def extract_texts_cached(pdf_paths, engine=None):
+    """
+    Batch version of extract_text_cached: returns one text per path, in
+    order. Files not in TEXT_CACHE are extracted together, concurrently on
+    the process pool when PDF_PROCESSES is set.
+    """
+    keys = [f"{file_sha256(pdf_path)}:{engine or DEFAULT_ENGINE}:v{TEXT_FORMAT_VERSION}" for pdf_path in pdf_paths]
+    texts = [TEXT_CACHE.get(key) for key in keys]
+    missing = [position for position, text in enumerate(texts) if text is None]
+    extracted = extract_many([pdf_paths[position] for position in missing], engine)
+    for position, pages in zip(missing, extracted):
+        texts[position] = PAGE_SEPARATOR.join(_clean_pages(pages))
+        TEXT_CACHE.set(keys[position], texts[position])
+    return texts
+
+# Keyword extraction only needs part-of-speech tags (tok2vec, tagger and
+# attribute_ruler), so the dependency parser, NER and lemmatizer are skipped
+KEYWORD_DISABLED_PIPES = ["parser", "ner", "lemmatizer"]
+KEYWORD_POS = {"NOUN", "PROPN"}
 
 # Function to extract key skills and keywords using spaCy
 def extract_keywords(text):
-    doc = nlp(text)
-    keywords = set()
-
-    for token in doc:
-        if token.pos_ in ["NOUN", "PROPN"]:
-            keywords.add(token.text.lower())
+    return [keyword for keyword, _ in extract_keywords_many([text])[0]]
 
-    return list(keywords)
+def extract_keywords_many(texts, batch_size=64, n_process=1):
+    """
+    Extract keywords from many documents with nlp.pipe. Returns one list per
+    input text, in the same order, of (keyword, count) pairs sorted by
+    count (ties keep first-seen order). n_process > 1 spreads batches over
+    worker processes.
+    """
+    nlp = get_nlp()
+    disabled = [name for name in KEYWORD_DISABLED_PIPES if name in nlp.pipe_names]
 
-def analyze_resume(text, job_category):
-    """Sends resume text to AI and returns an optimized version."""
-    
-    if not text.strip():
-        return {"error": "Resume text is empty or could not be extracted."}
+    results = []
+    for doc in nlp.pipe(texts, batch_size=batch_size, n_process=n_process, disable=disabled):
+        counts = Counter(token.text.lower() for token in doc if token.pos_ in KEYWORD_POS)
+        results.append(counts.most_common())
+    return results
 
-    try:
-        response = openai.ChatCompletion.create(
-            model="gpt-4",
-            # Lower temperature → less "creativity" in rewording/omitting
-            temperature=0,
-            messages=[
-                {
-                    "role": "system",
-                    "content": """
+# Prompt templates for analyze_resume. Any edit here changes PROMPT_VERSION,
+# which invalidates previously cached responses.
+SYSTEM_PROMPT = """
         You are an AI resume expert. 
         Your job is to analyze resumes and optimize them strictly in JSON format.
         Do NOT remove or omit any important sections or bullet points from the original resume 
@@ -55,23 +163,21 @@ def analyze_resume(text, job_category):
         If you must shorten text for a one-page layout, do so minimally 
         (but do not remove entire sections or bullet points).
         """
-                },
-                {
-                    "role": "user",
-                    "content": f"""
+
+USER_PROMPT_TEMPLATE = """
         Here is a resume:
         {text}
 
         Optimize this resume for a '{job_category}' position.
 
-        **Return the response ONLY as a valid JSON object** with these fields:
-        - "optimized_resume" (string): The fully rewritten resume in a professional format, 
-        retaining ALL bullet points and sections from the original (including Technical Skills, Leadership Experience, etc.).
-        Keep it to roughly one page if possible by condensing wording, but do NOT remove sections.
+        **Return the response ONLY as a valid JSON object** with these fields, in this order:
         - "overall_score" (integer): A rating from 1 to 10.
         - "strengths" (list): Key strengths of the resume.
         - "improvements" (list): Areas that need improvement.
         - "actionable_changes" (list): Specific action points to improve the resume.
+        - "optimized_resume" (string): The fully rewritten resume in a professional format, 
+        retaining ALL bullet points and sections from the original (including Technical Skills, Leadership Experience, etc.).
+        Keep it to roughly one page if possible by condensing wording, but do NOT remove sections.
 
         **IMPORTANT:**
         - DO NOT return text explanations, only JSON.
@@ -79,22 +185,307 @@ def analyze_resume(text, job_category):
         - The "optimized_resume" should be a string, formatted as a real resume 
         with headings for 'Technical Skills', 'Leadership Experience', etc. 
         """
-                }
-            ]
+
+MODEL_NAME = "gpt-4"
+PROMPT_VERSION = hashlib.sha256((SYSTEM_PROMPT + USER_PROMPT_TEMPLATE + CHUNK_NOTE).encode("utf-8")).hexdigest()[:12]
+
+# Successful analyze_resume responses, keyed by analysis_cache_key()
+ANALYSIS_CACHE = DiskCache(
+    "analysis",
+    max_entries=int(os.getenv("ANALYSIS_CACHE_ENTRIES", "2000")),
+    max_bytes=int(os.getenv("ANALYSIS_CACHE_BYTES", str(100 * 1024 * 1024))),
+    ttl=int(os.getenv("ANALYSIS_CACHE_TTL", str(7 * 24 * 3600))),
+)
+
+def normalize_resume_text(text):
+    """Collapse whitespace so cosmetic extraction differences map to the same cache key."""
+    lines = (" ".join(line.split()) for line in text.splitlines())
+    return "\n".join(line for line in lines if line)
+
+def text_digest(text):
+    """SHA-256 of the normalized resume text."""
+    return hashlib.sha256(normalize_resume_text(text).encode("utf-8")).hexdigest()
+
+def analysis_cache_key(digest, job_category):
+    """Cache key for one (resume, job category, model, prompt version) analysis."""
+    parts = [digest, " ".join(job_category.split()).lower(), MODEL_NAME, PROMPT_VERSION]
+    return hashlib.sha256(json.dumps(parts).encode("utf-8")).hexdigest()
+
+def lookup_analysis(text, job_category, owner=None):
+    """
+    Return (digest, feedback) where feedback is a cached analysis of this
+    resume for job_category, or None. With NEAR_DUP_MODE=reuse, the cached
+    analysis of a near-duplicate earlier resume of the same owner is reused
+    (and cached under this resume too), tagged with a "near_duplicate"
+    entry. Without an owner nothing is reused.
+    """
+    digest = text_digest(text)
+    cache_key = analysis_cache_key(digest, job_category)
+    cached = ANALYSIS_CACHE.get(cache_key)
+    if cached is not None:
+        print("⚡ Using cached AI analysis")
+        return digest, cached
+
+    if NEAR_DUP_MODE == "reuse" and owner:
+        for match in get_near_dup_index().query(normalize_resume_text(text), exclude=digest, owner=owner):
+            prior = ANALYSIS_CACHE.get(analysis_cache_key(match["digest"], job_category))
+            if prior is not None:
+                print(f"⚡ Reusing the AI analysis of a near-duplicate resume (similarity {match['similarity']})")
+                feedback_json = dict(prior, near_duplicate=match)
+                ANALYSIS_CACHE.set(cache_key, feedback_json)
+                return digest, feedback_json
+    return digest, None
+
+def store_analysis(digest, text, job_category, feedback_json, owner=None):
+    """Cache a successful analysis and remember the owner's resume for near-duplicate lookups."""
+    ANALYSIS_CACHE.set(analysis_cache_key(digest, job_category), feedback_json)
+    if NEAR_DUP_MODE != "off" and owner:
+        get_near_dup_index().add(digest, normalize_resume_text(text), owner=owner)
+
+def find_near_duplicate(text, owner=None):
+    """
+    The owner's most similar earlier resume (see near_dup) with its
+    similarity and a summary of what changed, or None if there is none,
+    there is no owner or NEAR_DUP_MODE is off.
+    """
+    if NEAR_DUP_MODE == "off" or not owner or not text.strip():
+        return None
+    index = get_near_dup_index()
+    normalized = normalize_resume_text(text)
+    matches = index.query(normalized, exclude=text_digest(text), limit=1, owner=owner)
+    if not matches:
+        return None
+    previous = index.get_text(matches[0]["digest"], owner=owner) or ""
+    return dict(matches[0], **diff_summary(previous, normalized))
+
+def build_messages(text, job_category):
+    """Chat messages for one analyze_resume request."""
+    return [
+        {
+            "role": "system",
+            "content": SYSTEM_PROMPT
+        },
+        {
+            "role": "user",
+            "content": USER_PROMPT_TEMPLATE.format(text=text, job_category=job_category)
+        }
+    ]
+
+def analyze_resume(text, job_category):
+    """
+    Sends resume text to AI and returns an optimized version. job_category
+    may also be a list of categories; the analyses then run concurrently
+    and come back as a dict keyed by category.
+    """
+    if isinstance(job_category, (list, tuple)):
+        return get_llm_client().run(analyze_resume_many_async(text, job_category))
+    return get_llm_client().run(analyze_resume_async(text, job_category))
+
+def unique_categories(job_categories):
+    """Drop blank and repeated categories (ignoring case and spacing), keeping order."""
+    categories = []
+    seen = set()
+    for category in job_categories:
+        category = " ".join(category.split())
+        if category and category.lower() not in seen:
+            seen.add(category.lower())
+            categories.append(category)
+    return categories
+
+async def analyze_resume_many_async(text, job_categories, timeout=None):
+    """Analyze one resume for several job categories at once; returns {category: feedback}."""
+    categories = unique_categories(job_categories)
+    results = await asyncio.gather(*[analyze_resume_async(text, category, timeout) for category in categories])
+    return dict(zip(categories, results))
+
+def prepare_prompt(text):
+    """Fit resume text to the prompt token budget (see prompt_builder)."""
+    prepared = prepare_resume_text(text)
+    if prepared["tokens"] < prepared["original_tokens"] or len(prepared["chunks"]) > 1:
+        print(f"🧮 Prompt text: {prepared['original_tokens']} → {prepared['tokens']} tokens"
+              f" in {len(prepared['chunks'])} chunk(s){' (trimmed)' if prepared['trimmed'] else ''}")
+    return prepared
+
+async def _request_analysis(text, job_category, timeout=None):
+    # One chat request; returns the parsed answer or an error dict
+    try:
+        raw_response = await get_llm_client().chat(
+            build_messages(text, job_category),
+            model=MODEL_NAME,
+            # Lower temperature → less "creativity" in rewording/omitting
+            temperature=0,
+            timeout=timeout
         )
+        return json.loads(raw_response)
+
+    except json.JSONDecodeError:
+        return {"error": "AI response formatting issue."}
+    except CircuitOpenError:
+        return {"error": "AI service is temporarily unavailable. Please try again shortly."}
+    except (LLMError, httpx.HTTPError) as e:
+        return _request_failed(e)
+
+def _add_truncation_note(feedback_json, prepared):
+    # Tell the caller when part of the resume never reached the model
+    note = truncation_note(prepared)
+    if note is not None:
+        feedback_json["truncated"] = note
+    return note is not None
+
+def _request_failed(e):
+    # The error dict for a request that failed once retries ran out
+    print(f"❌ AI request failed: {str(e)[:200]}")
+    return {"error": "AI service request failed. Please try again."}
+
+async def _analyze_chunks(chunks, job_category, timeout=None):
+    # Analyze each chunk concurrently and merge the answers into one
+    results = await asyncio.gather(*[
+        _request_analysis(chunk_prompt_text(chunk, part, len(chunks)), job_category, timeout)
+        for part, chunk in enumerate(chunks, start=1)
+    ])
+    return merge_analyses(results, [len(chunk) for chunk in chunks])
+
+async def analyze_resume_async(text, job_category, timeout=None, owner=None):
+    """
+    Async version of analyze_resume. Requests go through the shared pooled
+    LLM client, so many analyses can be in flight at once without a thread
+    each; timeout (seconds) overrides LLM_TIMEOUT for this request.
+    Resumes over the prompt token budget are analyzed in section chunks
+    whose answers are merged; if even MAX_CHUNKS chunks cannot hold the
+    resume, the answer says what was left out under "truncated". owner scopes near-duplicate reuse (see
+    lookup_analysis).
+    """
+    if not text.strip():
+        return {"error": "Resume text is empty or could not be extracted."}
+
+    # temperature=0 makes the answer effectively deterministic, so reuse it
+    digest, cached = lookup_analysis(text, job_category, owner)
+    if cached is not None:
+        return cached
+
+    prepared = prepare_prompt(text)
+    if len(prepared["chunks"]) == 1:
+        feedback_json = await _request_analysis(prepared["chunks"][0], job_category, timeout)
+    else:
+        feedback_json = await _analyze_chunks(prepared["chunks"], job_category, timeout)
 
-        raw_response = response["choices"][0]["message"]["content"]
-        feedback_json = json.loads(raw_response)
+    # Only cache real answers; errors should be retried next time
+    if "error" not in feedback_json:
+        _add_truncation_note(feedback_json, prepared)
+        store_analysis(digest, text, job_category, feedback_json, owner)
 
+    return feedback_json
+
+async def analyze_resume_stream(text, job_category, timeout=None, owner=None):
+    """
+    Streaming version of analyze_resume_async. Yields ("field", name, value)
+    as each top-level field of the answer completes (the prompt asks for the
+    short feedback fields before the long rewrite), then ("result", feedback)
+    with the same dict analyze_resume would return (its error dict too, if
+    the request fails partway through). If the full answer is not valid
+    JSON, the fields that did parse are kept as long as they include the
+    optimized resume. Chunked analyses cannot be streamed, so their fields
+    are all yielded once the merged answer is ready.
+    """
+    if not text.strip():
+        yield ("result", {"error": "Resume text is empty or could not be extracted."})
+        return
+
+    digest, cached = lookup_analysis(text, job_category, owner)
+    if cached is not None:
+        for name, value in cached.items():
+            yield ("field", name, value)
+        yield ("result", cached)
+        return
+
+    prepared = prepare_prompt(text)
+    if len(prepared["chunks"]) > 1:
+        feedback_json = await _analyze_chunks(prepared["chunks"], job_category, timeout)
+        if "error" not in feedback_json:
+            _add_truncation_note(feedback_json, prepared)
+            store_analysis(digest, text, job_category, feedback_json, owner)
+            for name, value in feedback_json.items():
+                yield ("field", name, value)
+        yield ("result", feedback_json)
+        return
+
+    incremental = IncrementalObjectParser()
+    try:
+        async for delta in get_llm_client().stream_chat(
+            build_messages(prepared["chunks"][0], job_category),
+            model=MODEL_NAME,
+            temperature=0,
+            timeout=timeout
+        ):
+            for name, value in incremental.feed(delta):
+                yield ("field", name, value)
+    except CircuitOpenError:
+        yield ("result", {"error": "AI service is temporarily unavailable. Please try again shortly."})
+        return
+    except (LLMError, httpx.HTTPError) as e:
+        # Fields already yielded stay with the caller; the answer as a whole failed
+        yield ("result", _request_failed(e))
+        return
+
+    try:
+        feedback_json = json.loads(incremental.text)
     except json.JSONDecodeError:
-        feedback_json = {"error": "AI response formatting issue."}
+        if "optimized_resume" in incremental.fields:
+            print(f"⚠️ Salvaged {len(incremental.fields)} fields from a malformed AI response")
+            feedback_json = dict(incremental.fields)
+        else:
+            feedback_json = {"error": "AI response formatting issue."}
+
+    if "error" not in feedback_json:
+        if _add_truncation_note(feedback_json, prepared):
+            yield ("field", "truncated", feedback_json["truncated"])
+        store_analysis(digest, text, job_category, feedback_json, owner)
+
+    yield ("result", feedback_json)
+
+def analyze_resume_streaming(text, job_category, on_field=None, owner=None):
+    """
+    Blocking wrapper around analyze_resume_stream for worker threads.
+    on_field(name, value) is called as each field arrives; the final
+    feedback dict is returned.
+    """
+    return get_llm_client().run(_consume_stream(text, job_category, on_field, owner))
 
+def analyze_resume_streaming_many(text, job_categories, on_field=None, owner=None):
+    """
+    analyze_resume_streaming for several job categories at once. The
+    streams run concurrently; on_field(category, name, value) is called as
+    fields arrive and {category: feedback} is returned.
+    """
+    categories = unique_categories(job_categories)
+
+    async def consume_all():
+        results = await asyncio.gather(*[
+            _consume_stream(text, category, (lambda name, value, category=category: on_field(category, name, value)) if on_field else None, owner)
+            for category in categories
+        ])
+        return dict(zip(categories, results))
+
+    return get_llm_client().run(consume_all())
+
+async def _consume_stream(text, job_category, on_field, owner=None):
+    feedback_json = None
+    async for event in analyze_resume_stream(text, job_category, owner=owner):
+        if event[0] == "field":
+            if on_field:
+                on_field(event[1], event[2])
+        else:
+            feedback_json = event[1]
     return feedback_json
 
 # Run the program
 if __name__ == "__main__":
     test_resume = "data/sample_resume.pdf"
-    resume_text = extract_text_from_pdf(test_resume)
+    pages = []
+    for page_text in iter_pdf_pages(test_resume):
+        pages.append(page_text)
+        print(f"📖 Page {len(pages)}: {len(page_text)} characters")
+    resume_text = PAGE_SEPARATOR.join(pages)
     ai_feedback = analyze_resume(resume_text, "Project Management")
     print("\n✅ AI Feedback:\n", ai_feedback)
 
@@ -0,0 +1,227 @@
+import atexit
+import multiprocessing
+import os
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+# Engine used when a caller does not ask for one. pdfplumber keeps the
+# layout the rest of the pipeline was tuned on; "pymupdf" or "pdfium" are
+# much faster and can be opted into with PDF_ENGINE
+DEFAULT_ENGINE = os.getenv("PDF_ENGINE", "pdfplumber")
+
+# Optional process pool for CPU-bound extraction; 0 disables it (override with PDF_PROCESSES)
+PDF_PROCESSES = int(os.getenv("PDF_PROCESSES", "0"))
+# Documents with fewer pages than this are extracted in-process even when the pool is on
+PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "8"))
+
+# pdfminer emits "(cid:123)" for glyphs it cannot map to unicode
+CID_PATTERN = re.compile(r"\(cid:\d+\)")
+
+
+def pdfplumber_pages(pdf_path, pages=None):
+    """
+    Yield the text of every page using pdfplumber (slow, but the most
+    faithful layout). pages optionally restricts this to the given 0-based
+    page indices; the other engines take the same argument.
+    """
+    import pdfplumber
+
+    with pdfplumber.open(pdf_path, pages=[index + 1 for index in pages] if pages is not None else None) as pdf:
+        for page in pdf.pages:
+            text = page.extract_text() or ""
+            # Release the page's cached layout objects before moving on
+            page.close()
+            yield text
+
+
+def pymupdf_pages(pdf_path, pages=None):
+    """Yield the text of every page using PyMuPDF."""
+    import pymupdf
+
+    with pymupdf.open(pdf_path) as doc:
+        for index in (pages if pages is not None else range(len(doc))):
+            yield doc[index].get_text("text").rstrip()
+
+
+def pdfium_pages(pdf_path, pages=None):
+    """Yield the text of every page using pypdfium2."""
+    import pypdfium2 as pdfium
+
+    pdf = pdfium.PdfDocument(pdf_path)
+    try:
+        for index in (pages if pages is not None else range(len(pdf))):
+            page = pdf[index]
+            textpage = page.get_textpage()
+            text = textpage.get_text_bounded()
+            textpage.close()
+            page.close()
+            yield text.replace("\r\n", "\n").replace("\r", "\n").rstrip()
+    finally:
+        pdf.close()
+
+
+ENGINES = {
+    "pdfplumber": pdfplumber_pages,
+    "pymupdf": pymupdf_pages,
+    "pdfium": pdfium_pages,
+}
+
+
+def looks_garbled(text):
+    """
+    Heuristic check for text a fast engine failed to decode: empty pages,
+    unmapped glyphs, replacement characters or mostly non-printable output.
+    """
+    stripped = text.strip()
+    if not stripped:
+        return True
+
+    if stripped.count("�") + len(CID_PATTERN.findall(stripped)) * 4 > len(stripped) * 0.05:
+        return True
+
+    readable = sum(1 for ch in stripped if ch.isalnum() or ch.isspace() or ch in ".,;:()-/&@+#%'\"|•")
+    return readable < len(stripped) * 0.7
+
+
+def iter_engine_pages(pdf_path, engine=None, pages=None):
+    """
+    Yield (page_number, text) for every page (or just the 0-based indices
+    in pages) using the requested engine. Pages a fast engine returns empty
+    or garbled are re-extracted with pdfplumber; if the fast engine is
+    missing or cannot open the file, the whole document falls back to
+    pdfplumber.
+    """
+    engine = engine or DEFAULT_ENGINE
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown PDF engine '{engine}'. Choose one of: {', '.join(ENGINES)}")
+
+    indices = list(pages) if pages is not None else None
+
+    if engine == "pdfplumber":
+        for position, text in enumerate(pdfplumber_pages(pdf_path, indices)):
+            yield (indices[position] if indices is not None else position) + 1, text
+        return
+
+    try:
+        texts = ENGINES[engine](pdf_path, indices)
+        first = next(texts, None)
+    except Exception as e:
+        print(f"⚠️ {engine} could not read {pdf_path} ({str(e)}), falling back to pdfplumber")
+        yield from iter_engine_pages(pdf_path, "pdfplumber", indices)
+        return
+
+    if first is None:
+        return
+
+    fallback = None
+    try:
+        for position, text in enumerate(_chain(first, texts)):
+            index = indices[position] if indices is not None else position
+            if looks_garbled(text):
+                # Only open pdfplumber if some page actually needs it
+                if fallback is None:
+                    import pdfplumber
+                    fallback = pdfplumber.open(pdf_path)
+                page = fallback.pages[index]
+                text = page.extract_text() or ""
+                page.close()
+            yield index + 1, text
+    finally:
+        if fallback is not None:
+            fallback.close()
+
+
+def _chain(first, rest):
+    yield first
+    yield from rest
+
+
+def page_count(pdf_path):
+    """Return the number of pages without laying any of them out."""
+    try:
+        import pypdfium2 as pdfium
+    except ImportError:
+        import pdfplumber
+        with pdfplumber.open(pdf_path) as pdf:
+            return len(pdf.pages)
+
+    pdf = pdfium.PdfDocument(pdf_path)
+    try:
+        return len(pdf)
+    finally:
+        pdf.close()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_process_pool():
+    """
+    Return the shared extraction process pool, starting it on first use.
+    The pool lives for the whole process so workers are reused across
+    requests. Returns None when PDF_PROCESSES is 0.
+    """
+    global _pool
+    if PDF_PROCESSES <= 0:
+        return None
+
+    with _pool_lock:
+        if _pool is None:
+            # spawn, because forking a threaded web worker can deadlock the child
+            context = multiprocessing.get_context(os.getenv("PDF_POOL_START_METHOD", "spawn"))
+            _pool = ProcessPoolExecutor(max_workers=PDF_PROCESSES, mp_context=context)
+            atexit.register(shutdown_process_pool)
+    return _pool
+
+
+def shutdown_process_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def _extract_page_range(pdf_path, engine, start, stop):
+    # Runs in a pool worker; must stay a module-level function so it pickles
+    return [text for _, text in iter_engine_pages(pdf_path, engine, range(start, stop))]
+
+
+def _extract_document(pdf_path, engine):
+    # Runs in a pool worker
+    return [text for _, text in iter_engine_pages(pdf_path, engine)]
+
+
+def extract_pages_parallel(pdf_path, engine=None):
+    """
+    Return the text of every page, in order. Documents with at least
+    PARALLEL_MIN_PAGES pages are split into contiguous page ranges that are
+    extracted on the shared process pool; smaller documents, or any call
+    made while the pool is disabled, are extracted in-process.
+    """
+    pool = get_process_pool()
+    count = page_count(pdf_path) if pool else 0
+    if pool is None or count < PARALLEL_MIN_PAGES:
+        return [text for _, text in iter_engine_pages(pdf_path, engine)]
+
+    chunk = max(1, -(-count // PDF_PROCESSES))
+    starts = list(range(0, count, chunk))
+    stops = [min(start + chunk, count) for start in starts]
+    pages = []
+    # map() yields results in submission order, so page order is preserved
+    for texts in pool.map(_extract_page_range, [pdf_path] * len(starts), [engine] * len(starts), starts, stops):
+        pages.extend(texts)
+    return pages
+
+
+def extract_many(pdf_paths, engine=None):
+    """
+    Return a list with the page texts of each PDF, in the order given.
+    Documents are spread across the process pool when it is enabled.
+    """
+    pool = get_process_pool()
+    if pool is None:
+        return [_extract_document(pdf_path, engine) for pdf_path in pdf_paths]
+    return list(pool.map(_extract_document, pdf_paths, [engine] * len(pdf_paths)))
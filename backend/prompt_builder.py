@@ -0,0 +1,292 @@
+import math
+import os
+import re
+from collections import Counter
+
+# Token budget for the resume text in one prompt (override with environment
+# variables). The answer repeats the resume in rewritten form, so the text
+# should take well under half of the model's context window.
+PROMPT_TOKEN_BUDGET = int(os.getenv("LLM_PROMPT_TOKEN_BUDGET", "3000"))
+# Oversized resumes are analyzed in up to this many section chunks; 1 means
+# trim to the budget instead of chunking
+MAX_CHUNKS = int(os.getenv("LLM_MAX_CHUNKS", "4"))
+TOKENIZER_ENCODING = os.getenv("LLM_TOKENIZER", "cl100k_base")
+# Without tiktoken (or its encoding file) tokens are estimated from words
+# and punctuation, which can come in under the real count; the budget is
+# then cut to this fraction of PROMPT_TOKEN_BUDGET to leave room for that
+TOKEN_ESTIMATE_MARGIN = float(os.getenv("LLM_TOKEN_ESTIMATE_MARGIN", "0.85"))
+
+# Extracted text separates pages with a form feed on its own line
+PAGE_BREAK = "\f"
+
+# Framing for one chunk of a resume that was split for analysis
+CHUNK_NOTE = (
+    "(This is part {part} of {parts} of a longer resume. Analyze and rewrite only this part; "
+    "the parts are combined afterwards.)"
+)
+
+# Lines a header/footer check looks at, from the top and the bottom of each page
+EDGE_LINES = 3
+PAGE_NUMBER_PATTERN = re.compile(r"^[-–—\s]*(page\s*)?\d{1,3}(\s*(of|/)\s*\d{1,3})?[-–—\s]*$", re.IGNORECASE)
+# Fallback estimate when tiktoken is missing: words and punctuation, long words split every 4 characters
+TOKEN_ESTIMATE_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+SECTION_TITLES = {
+    "summary", "professional summary", "profile", "objective",
+    "experience", "work experience", "professional experience", "employment history",
+    "education", "skills", "technical skills", "core competencies",
+    "projects", "leadership experience", "volunteer experience",
+    "certifications", "publications", "awards", "honors", "languages", "interests",
+}
+
+LIST_FIELDS = ("strengths", "improvements", "actionable_changes")
+
+_encoding = None
+
+
+def _get_encoding():
+    global _encoding
+    if _encoding is None:
+        try:
+            import tiktoken
+            _encoding = tiktoken.get_encoding(TOKENIZER_ENCODING)
+        except Exception as e:
+            # Not installed, or the encoding file could not be downloaded
+            print(f"⚠️ tiktoken unavailable ({str(e)[:80]}); estimating prompt tokens"
+                  f" with {TOKEN_ESTIMATE_MARGIN:.0%} of the token budget")
+            _encoding = False
+    return _encoding
+
+
+def exact_token_counts():
+    """Whether count_tokens uses the model's tokenizer (tiktoken) rather than an estimate."""
+    return bool(_get_encoding())
+
+
+def count_tokens(text):
+    """Number of tokens in text: exact with tiktoken, otherwise an estimate (see TOKEN_ESTIMATE_MARGIN)."""
+    encoding = _get_encoding()
+    if encoding:
+        return len(encoding.encode(text, disallowed_special=()))
+    return sum(max(1, math.ceil(len(piece) / 4)) for piece in TOKEN_ESTIMATE_PATTERN.findall(text))
+
+
+def _page_lines(page):
+    lines = (" ".join(line.split()) for line in page.splitlines())
+    return [line for line in lines if line]
+
+
+def strip_repeated_lines(pages):
+    """
+    Remove running headers, footers and page numbers from a list of page
+    texts. A line counts as a header or footer when it sits within
+    EDGE_LINES of the top or bottom of at least half the pages (and at
+    least two); it is kept on the first page it appears on. Returns a list
+    of line lists, one per page.
+    """
+    page_lines = [_page_lines(page) for page in pages]
+    if len(page_lines) < 2:
+        return page_lines
+
+    edge_counts = Counter()
+    for lines in page_lines:
+        edge_counts.update(set(lines[:EDGE_LINES] + lines[-EDGE_LINES:]))
+    threshold = max(2, math.ceil(len(page_lines) / 2))
+    repeated = {line for line, count in edge_counts.items() if count >= threshold}
+
+    seen = set()
+    cleaned = []
+    for lines in page_lines:
+        kept = []
+        for position, line in enumerate(lines):
+            at_edge = position < EDGE_LINES or position >= len(lines) - EDGE_LINES
+            if at_edge and PAGE_NUMBER_PATTERN.match(line):
+                continue
+            if at_edge and line in repeated:
+                if line in seen:
+                    continue
+                seen.add(line)
+            kept.append(line)
+        cleaned.append(kept)
+    return cleaned
+
+
+def is_section_heading(line):
+    """Heuristic: a known section title, or a short all-caps line."""
+    title = line.strip().rstrip(":").strip()
+    if not title or len(title) > 40 or title.endswith("."):
+        return False
+    if title.lower() in SECTION_TITLES:
+        return True
+    return title.isupper() and sum(ch.isalpha() for ch in title) >= 3
+
+
+def split_sections(text):
+    """Split text into sections at heading lines; any preamble comes first."""
+    sections = []
+    current = []
+    for line in text.splitlines():
+        if is_section_heading(line) and current:
+            sections.append("\n".join(current))
+            current = []
+        current.append(line)
+    if current:
+        sections.append("\n".join(current))
+    return sections
+
+
+def trim_to_budget(text, budget):
+    """Keep whole lines from the start of text while they fit in budget tokens."""
+    kept = []
+    used = 0
+    for line in text.splitlines():
+        tokens = count_tokens(line) + 1
+        if used + tokens > budget:
+            break
+        kept.append(line)
+        used += tokens
+    return "\n".join(kept)
+
+
+def _fitting_pieces(text, budget, separator="\n"):
+    # Break text into pieces of at most budget tokens: by line, then by word
+    if count_tokens(text) + 1 <= budget:
+        return [text]
+    if separator == "\n" and "\n" not in text:
+        separator = " "
+    if separator not in text:
+        return [trim_to_budget(text, budget)]
+    pieces = []
+    for part in text.split(separator):
+        pieces.extend(_fitting_pieces(part, budget, " "))
+    return pieces
+
+
+def chunk_sections(sections, budget):
+    """
+    Greedily pack consecutive sections into chunks of at most budget
+    tokens. A section that is too big on its own is split between lines.
+    """
+    chunks = []
+    current = []
+    used = 0
+    for section in sections:
+        for piece in _fitting_pieces(section, budget):
+            tokens = count_tokens(piece) + 1
+            if current and used + tokens > budget:
+                chunks.append("\n".join(current))
+                current = []
+                used = 0
+            current.append(piece)
+            used += tokens
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
+
+
+def prepare_resume_text(text, budget=None, max_chunks=None):
+    """
+    Clean extracted resume text for the prompt and fit it to the token
+    budget. Returns a dict with the cleaned "text", the "chunks" to send
+    (one chunk unless the text is over budget), the token counts before and
+    after cleaning, whether anything had to be "trimmed", and how many
+    "dropped_tokens" of the cleaned text the chunks leave out (text past
+    max_chunks chunks, or past the budget when max_chunks is 1).
+    "token_counts" says whether the counts are "exact" or an "estimate";
+    estimated counts are held to TOKEN_ESTIMATE_MARGIN of the budget.
+    """
+    budget = budget or PROMPT_TOKEN_BUDGET
+    exact = exact_token_counts()
+    if not exact:
+        budget = max(int(budget * TOKEN_ESTIMATE_MARGIN), 1)
+    max_chunks = max_chunks or MAX_CHUNKS
+
+    page_lines = strip_repeated_lines(text.split(PAGE_BREAK))
+    cleaned = "\n".join(line for lines in page_lines for line in lines)
+    tokens = count_tokens(cleaned)
+    prepared = {
+        "text": cleaned,
+        "chunks": [cleaned],
+        "original_tokens": count_tokens(text),
+        "tokens": tokens,
+        "trimmed": False,
+        "dropped_tokens": 0,
+        "token_counts": "exact" if exact else "estimate",
+    }
+    if tokens <= budget:
+        return prepared
+
+    if max_chunks <= 1:
+        chunks = [trim_to_budget(cleaned, budget)]
+        prepared["trimmed"] = True
+    else:
+        chunks = chunk_sections(split_sections(cleaned), budget)
+        if len(chunks) > max_chunks:
+            chunks = chunks[:max_chunks]
+            prepared["trimmed"] = True
+
+    prepared["chunks"] = chunks
+    prepared["tokens"] = sum(count_tokens(chunk) for chunk in chunks)
+    if prepared["trimmed"]:
+        prepared["dropped_tokens"] = max(tokens - prepared["tokens"], 0)
+    return prepared
+
+
+def truncation_note(prepared):
+    """
+    What an analysis of prepared text should report about the text it
+    never saw, or None if every chunk was sent.
+    """
+    if not prepared["trimmed"]:
+        return None
+    return {
+        "analyzed_tokens": prepared["tokens"],
+        "dropped_tokens": prepared["dropped_tokens"],
+        "message": "The resume was too long to analyze in full; only its beginning was analyzed.",
+    }
+
+
+def chunk_prompt_text(chunk, part, parts):
+    """Resume text for one chunk, framed so the model knows it is partial."""
+    return CHUNK_NOTE.format(part=part, parts=parts) + "\n" + chunk
+
+
+def merge_analyses(results, weights):
+    """
+    Combine per-chunk analyses into one answer with the usual schema: the
+    score is averaged weighted by chunk size, feedback lists are
+    concatenated without duplicates, and the rewritten chunks are joined in
+    order. If any chunk failed, or any chunk came back without its
+    rewritten part (the merged resume would silently lose those sections),
+    an error is returned instead.
+    """
+    for result in results:
+        if "error" in result:
+            return result
+
+    merged = {}
+    scored = [(result["overall_score"], weight) for result, weight in zip(results, weights)
+              if isinstance(result.get("overall_score"), (int, float))]
+    if scored:
+        merged["overall_score"] = round(sum(score * weight for score, weight in scored) / sum(weight for _, weight in scored))
+
+    for field in LIST_FIELDS:
+        items = []
+        seen = set()
+        for result in results:
+            for item in result.get(field) or []:
+                key = " ".join(str(item).split()).lower()
+                if key not in seen:
+                    seen.add(key)
+                    items.append(item)
+        merged[field] = items
+
+    rewritten = []
+    for part, result in enumerate(results, start=1):
+        optimized = result.get("optimized_resume")
+        if not isinstance(optimized, str) or not optimized.strip():
+            print(f"⚠️ Part {part} of {len(results)} came back without its rewritten resume")
+            return {"error": "AI response formatting issue."}
+        rewritten.append(optimized.strip())
+    merged["optimized_resume"] = "\n\n".join(rewritten)
+    return merged
@@ -0,0 +1,203 @@
+import math
+import os
+
+import numpy as np
+
+from ats_scorer import tokenize
+
+# Common words that say nothing about fit for a role
+STOP_WORDS = frozenset("""
+a about above after all also an and any are as at be been being both but by can could did do does doing
+during each for from had has have having he her here his how i if in into is it its just me more most my
+no nor not of on once only or other our out over own per same she should so some such than that the their
+them then there these they this those through to too under until up very was we were what when where
+which while who whom why will with within would you your
+""".split())
+
+# How terms are pulled out of text: "tokens" is a fast word tokenizer,
+# "keywords" uses parser.extract_keywords (spaCy nouns, much slower)
+ANALYZERS = ("tokens", "keywords")
+DEFAULT_ANALYZER = os.getenv("RANKING_ANALYZER", "tokens")
+
+
+def analyze(text):
+    """Terms of text for ranking: keyword tokens minus stop words and bare numbers."""
+    return [token for token in tokenize(text) if token not in STOP_WORDS and not token.isdigit()]
+
+
+def analyze_many(texts, analyzer=None):
+    """Term lists for many texts with the chosen analyzer (see ANALYZERS)."""
+    analyzer = analyzer or DEFAULT_ANALYZER
+    if analyzer == "tokens":
+        return [analyze(text) for text in texts]
+    if analyzer == "keywords":
+        from parser import extract_keywords_many
+        return [[keyword for keyword, count in pairs for _ in range(count)] for pairs in extract_keywords_many(texts)]
+    raise ValueError(f"Unknown analyzer '{analyzer}'. Choose one of: {', '.join(ANALYZERS)}")
+
+
+class RankingIndex:
+    """
+    TF-IDF vectors for a batch of resumes in compressed sparse row form,
+    kept as plain NumPy arrays: row r's nonzero columns are
+    indices[indptr[r]:indptr[r + 1]] with weights in data. A column-major
+    copy (col_indptr, col_rows, col_data) lets a query touch only the
+    postings of its own terms. Term frequencies are sublinear
+    (1 + log tf), idf is smoothed, and rows are L2-normalized, so a dot
+    product with a normalized query is the cosine similarity.
+    """
+
+    def __init__(self, doc_ids, terms, idf, indptr, indices, data):
+        self.doc_ids = list(doc_ids)
+        self.terms = terms
+        self.vocabulary = {term: column for column, term in enumerate(terms)}
+        self.idf = idf
+        self.indptr = indptr
+        self.indices = indices
+        self.data = data
+
+        rows = np.repeat(np.arange(len(self.doc_ids), dtype=np.int32), np.diff(indptr))
+        order = np.argsort(indices, kind="stable")
+        self.col_indptr = np.zeros(len(terms) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(indices, minlength=len(terms)), out=self.col_indptr[1:])
+        self.col_rows = rows[order]
+        self.col_data = data[order]
+
+    @classmethod
+    def build(cls, doc_ids, doc_terms):
+        """Build the index from one list of terms per document."""
+        vocabulary = {}
+        term_ids = []
+        lengths = []
+        for terms in doc_terms:
+            row = [vocabulary.setdefault(term, len(vocabulary)) for term in terms]
+            term_ids.extend(row)
+            lengths.append(len(row))
+
+        doc_count = len(lengths)
+        vocab_size = max(len(vocabulary), 1)
+        term_ids = np.asarray(term_ids, dtype=np.int64)
+        doc_of_term = np.repeat(np.arange(doc_count, dtype=np.int64), lengths)
+
+        # Count (document, term) pairs; np.unique also sorts them row by row
+        pairs, counts = np.unique(doc_of_term * vocab_size + term_ids, return_counts=True)
+        rows = pairs // vocab_size
+        indices = (pairs % vocab_size).astype(np.int32)
+
+        indptr = np.zeros(doc_count + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=doc_count), out=indptr[1:])
+
+        document_frequency = np.bincount(indices, minlength=len(vocabulary))
+        idf = (np.log((1 + doc_count) / (1 + document_frequency)) + 1).astype(np.float32)
+
+        data = ((1 + np.log(counts)) * idf[indices]).astype(np.float32)
+        norms = np.sqrt(np.bincount(rows, weights=data.astype(np.float64) ** 2, minlength=doc_count))
+        data /= np.maximum(norms, 1e-12)[rows].astype(np.float32)
+
+        terms = [None] * len(vocabulary)
+        for term, column in vocabulary.items():
+            terms[column] = term
+        return cls(doc_ids, terms, idf, indptr, indices, data)
+
+    def query_vector(self, terms):
+        """Dense, normalized TF-IDF vector for a query; terms unseen in the corpus are ignored."""
+        vector = np.zeros(len(self.terms), dtype=np.float32)
+        counts = {}
+        for term in terms:
+            column = self.vocabulary.get(term)
+            if column is not None:
+                counts[column] = counts.get(column, 0) + 1
+        for column, count in counts.items():
+            vector[column] = (1 + math.log(count)) * self.idf[column]
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def scores(self, query):
+        """
+        Cosine similarity of every document with a query vector: one
+        scatter-add over the postings of the query's terms.
+        """
+        columns = np.flatnonzero(query)
+        starts = self.col_indptr[columns]
+        lengths = self.col_indptr[columns + 1] - starts
+        # Positions of every posting of every query term, without a Python loop
+        offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+        positions = offsets + np.arange(lengths.sum())
+        weights = self.col_data[positions] * np.repeat(query[columns], lengths)
+        return np.bincount(self.col_rows[positions], weights=weights, minlength=len(self.doc_ids))
+
+    def top_k(self, terms, k=10, explain=5):
+        """
+        The k best-matching documents for a query as dicts with the
+        document id, its score, and the explain terms that contributed most.
+        """
+        query = self.query_vector(terms)
+        scores = self.scores(query)
+        k = min(k, len(scores))
+        if k <= 0:
+            return []
+
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best], kind="stable")]
+
+        results = []
+        for row in best:
+            start, stop = self.indptr[row], self.indptr[row + 1]
+            columns = self.indices[start:stop]
+            contributions = self.data[start:stop] * query[columns]
+            top = np.argsort(-contributions)[:explain]
+            results.append({
+                "id": self.doc_ids[row],
+                "score": round(float(scores[row]), 4),
+                "terms": [
+                    {"term": self.terms[columns[i]], "weight": round(float(contributions[i]), 4)}
+                    for i in top if contributions[i] > 0
+                ],
+            })
+        return results
+
+
+def rank_texts(job_description, texts_by_id, k=10, analyzer=None, explain=5):
+    """Rank resume texts ({id: text}) against a job description; see RankingIndex.top_k."""
+    doc_ids = list(texts_by_id)
+    term_lists = analyze_many([job_description] + [texts_by_id[doc_id] for doc_id in doc_ids], analyzer)
+    index = RankingIndex.build(doc_ids, term_lists[1:])
+    return index.top_k(term_lists[0], k=k, explain=explain)
+
+
+def rank_pdfs(job_description, pdf_paths, k=10, analyzer=None, explain=5):
+    """Rank resume PDFs against a job description; ids are the file names."""
+    from parser import extract_text_cached
+
+    texts = {os.path.basename(path): extract_text_cached(path) for path in pdf_paths}
+    return rank_texts(job_description, texts, k=k, analyzer=analyzer, explain=explain)
+
+
+if __name__ == "__main__":
+    import argparse
+    import glob
+    import time
+
+    arg_parser = argparse.ArgumentParser(description="Rank resume PDFs against a job description.")
+    arg_parser.add_argument("job_description", help="text file with the job posting")
+    arg_parser.add_argument("resumes", nargs="+", help="resume PDFs or directories of PDFs")
+    arg_parser.add_argument("--top", type=int, default=10)
+    arg_parser.add_argument("--explain", type=int, default=5, help="terms to show per resume")
+    arg_parser.add_argument("--analyzer", choices=ANALYZERS, default=DEFAULT_ANALYZER)
+    args = arg_parser.parse_args()
+
+    with open(args.job_description, encoding="utf-8") as f:
+        posting = f.read()
+
+    paths = []
+    for resume in args.resumes:
+        paths.extend(sorted(glob.glob(os.path.join(resume, "*.pdf"))) if os.path.isdir(resume) else [resume])
+
+    start = time.perf_counter()
+    ranked = rank_pdfs(posting, paths, k=args.top, analyzer=args.analyzer, explain=args.explain)
+    elapsed = time.perf_counter() - start
+
+    for position, result in enumerate(ranked, start=1):
+        terms = ", ".join(f"{term['term']} ({term['weight']:.3f})" for term in result["terms"])
+        print(f"{position:3d}. {result['score']:.4f}  {result['id']}  [{terms}]")
+    print(f"⚡ Ranked {len(paths)} resumes in {elapsed * 1000:.1f} ms")
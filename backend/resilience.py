@@ -0,0 +1,117 @@
+import os
+import random
+import time
+
+# Retry and circuit breaker settings (override with environment variables)
+MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
+BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", "0.5"))
+BACKOFF_MAX = float(os.getenv("LLM_BACKOFF_MAX", "8"))
+RETRY_BUDGET_RATIO = float(os.getenv("LLM_RETRY_BUDGET_RATIO", "0.2"))
+RETRY_BUDGET_MIN = float(os.getenv("LLM_RETRY_BUDGET_MIN", "5"))
+RETRY_BUDGET_MAX = float(os.getenv("LLM_RETRY_BUDGET_MAX", "20"))
+BREAKER_FAILURES = int(os.getenv("LLM_BREAKER_FAILURES", "5"))
+BREAKER_RESET_SECONDS = float(os.getenv("LLM_BREAKER_RESET", "30"))
+
+# HTTP statuses worth retrying: rate limits and upstream trouble
+RETRYABLE_STATUSES = {408, 409, 429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling upstream while the circuit breaker is open."""
+
+
+def backoff_delay(attempt, base=BACKOFF_BASE, cap=BACKOFF_MAX, retry_after=None):
+    """
+    Full-jitter exponential backoff for the given 0-based retry attempt.
+    A server-supplied Retry-After value is used as a floor.
+    """
+    delay = random.uniform(0, min(cap, base * (2 ** attempt)))
+    if retry_after is not None:
+        delay = max(delay, min(retry_after, cap))
+    return delay
+
+
+class RetryBudget:
+    """
+    Caps retries at a fraction of recent calls so that a degraded upstream
+    does not get hit with several times its normal load. The budget starts
+    with minimum tokens, every call earns ratio more (up to maximum), and
+    every retry spends one.
+    """
+
+    def __init__(self, ratio=RETRY_BUDGET_RATIO, minimum=RETRY_BUDGET_MIN, maximum=RETRY_BUDGET_MAX):
+        self.ratio = ratio
+        self.maximum = max(minimum, maximum, 1.0)
+        self.tokens = minimum
+
+    def record_call(self):
+        self.tokens = min(self.maximum, self.tokens + self.ratio)
+
+    def try_spend(self):
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return True
+        return False
+
+
+class CircuitBreaker:
+    """
+    Classic closed / open / half-open breaker. After failure_threshold
+    consecutive failures the circuit opens and calls fail fast for
+    reset_timeout seconds; then a single trial call is let through and
+    its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, failure_threshold=BREAKER_FAILURES, reset_timeout=BREAKER_RESET_SECONDS):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = None
+        self.open_count = 0
+        self.open_seconds = 0.0
+        self._trial_in_flight = False
+
+    def allow(self):
+        """Return True if a call may go upstream now."""
+        if self.state == "closed":
+            return True
+        if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_timeout:
+            self._close_open_period()
+            self.state = "half_open"
+        if self.state == "half_open" and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return True
+        return False
+
+    def record_success(self):
+        if self.state == "open":
+            self._close_open_period()
+        self.state = "closed"
+        self.failures = 0
+        self._trial_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        self._trial_in_flight = False
+        if self.state == "half_open" or (self.state == "closed" and self.failures >= self.failure_threshold):
+            self.state = "open"
+            self.opened_at = time.monotonic()
+            self.open_count += 1
+
+    def release_trial(self):
+        """
+        End a call that neither succeeded nor failed upstream (cancelled, or
+        an unexpected error); a half-open breaker lets the next call try.
+        """
+        self._trial_in_flight = False
+
+    def total_open_seconds(self):
+        """Seconds spent open so far, including the current open period."""
+        if self.state == "open":
+            return self.open_seconds + time.monotonic() - self.opened_at
+        return self.open_seconds
+
+    def _close_open_period(self):
+        self.open_seconds += time.monotonic() - self.opened_at
+        self.opened_at = None
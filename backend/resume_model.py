@@ -0,0 +1,78 @@
+from dataclasses import dataclass, field
+
+CONTACT_FIELDS = ("email", "phone", "linkedin", "github", "location")
+
+
+@dataclass(slots=True)
+class Bullet:
+    text: str
+
+
+@dataclass(slots=True)
+class Entry:
+    """
+    One item of a section: a job, a degree, a project, a skill group or a
+    certification. details holds what sits under the title (the degree,
+    a project's technologies).
+    """
+    title: str = ""
+    organization: str = ""
+    location: str = ""
+    date: str = ""
+    details: str = ""
+    bullets: list = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class Section:
+    """A resume section: its heading line, its lines, and the entries parsed from them."""
+    title: str
+    heading: str = ""
+    lines: list = field(default_factory=list)
+    entries: list = field(default_factory=list)
+
+    @property
+    def text(self):
+        return "\n".join(self.lines)
+
+
+@dataclass(slots=True)
+class Contact:
+    email: str = ""
+    phone: str = ""
+    linkedin: str = ""
+    github: str = ""
+    location: str = ""
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in CONTACT_FIELDS}
+
+    def as_html(self):
+        """The PDF header's contact line: phone, then email, LinkedIn and GitHub as links ("" if none)."""
+        parts = []
+        if self.phone:
+            parts.append(self.phone)
+        if self.email:
+            parts.append(f"<a href='mailto:{self.email}'>{self.email}</a>")
+        if self.linkedin:
+            parts.append(f"<a href='{self.linkedin}' target='_blank'>LinkedIn</a>")
+        if self.github:
+            parts.append(f"<a href='{self.github}' target='_blank'>GitHub</a>")
+        return " | ".join(parts)
+
+
+@dataclass(slots=True)
+class Resume:
+    """
+    A resume parsed once from text and handed as-is to the HTML and LaTeX
+    renderers. sections maps section titles to Sections, in the order
+    they first appear.
+    """
+    name: str = ""
+    contact: Contact = field(default_factory=Contact)
+    sections: dict = field(default_factory=dict)
+
+    def entries(self, title):
+        """The parsed entries of a section, or [] if the resume has no such section."""
+        section = self.sections.get(title)
+        return section.entries if section else []
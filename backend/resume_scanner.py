@@ -0,0 +1,431 @@
+import re
+
+from resume_model import CONTACT_FIELDS, Bullet, Contact, Entry, Resume, Section
+
+# Contact details, as one alternation so each line is scanned once.
+# finditer reports the leftmost match, so a URL is consumed before the
+# digits inside it can pass for a phone number; at the same position the
+# earlier alternative wins (an all-digit email local part is an email).
+# Everything but phone numbers starts at a word boundary, which is tested
+# once for all of them; profile links keep only the profile's path (the
+# linkedin/github group), even when the link is to a repository.
+CONTACT_PATTERN = re.compile(
+    r"\b(?:(?i:(?:https?://)?(?:www\.)?"
+    r"(?:(?P<linkedin>linkedin\.com/in/[A-Za-z0-9_-]+)|(?P<github>github\.com/[A-Za-z0-9_-]+))[A-Za-z0-9_/-]*)"
+    r"|(?P<email>[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b)"
+    r"|(?P<location>(?:Waterloo|Toronto|Ontario|Canada|UAE)\b))"
+    r"|(?P<phone>(?<!\d)\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}(?!\d))"
+)
+
+# Entry headers: a date in parentheses, or a month-year range
+DATE_PATTERN = re.compile(
+    r"\((.*?)\)|(?:Sep|Sept|September|Jan|January|Feb|February|Mar|March|Apr|April|May|Jun|June|Jul|July"
+    r"|Aug|August|Oct|October|Nov|November|Dec|December)\s+\d{4}\s*-\s*(?:Present|[A-Za-z]+\s+\d{4})"
+)
+PARENTHESES_PATTERN = re.compile(r"\((.*?)\)")
+# Commas outside parentheses separate the parts of an entry header
+HEADER_SPLIT_PATTERN = re.compile(r",(?![^(]*\))")
+EDUCATION_SPLIT_PATTERN = re.compile(r"[,|]")
+# A skill, keeping a parenthesized note that follows it
+SKILL_PATTERN = re.compile(r"([^,]+(?:\([^)]*\))?)")
+BULLET_MARKS = ("•", "-")
+
+
+def _trie_pattern(node):
+    """Regular expression source matching the keywords below a trie node."""
+    branches = [re.escape(char) + _trie_pattern(child) for char, child in node.items() if char]
+    if not branches:
+        return ""
+    pattern = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+    # A keyword ends here: the rest is optional (greedy, so longer keywords win)
+    return f"(?:{pattern})?" if "" in node else pattern
+
+
+class KeywordTrie:
+    """
+    A set of keywords compiled through a character trie into one regular
+    expression. Keywords sharing a prefix share a branch, so each text
+    position is tried against the trie once, in C, instead of against
+    every keyword in turn. keywords is a list, or a {keyword: value} dict
+    whose values are returned in place of the keywords.
+    """
+
+    def __init__(self, keywords, ignore_case=False):
+        if not isinstance(keywords, dict):
+            keywords = {keyword: keyword for keyword in keywords}
+        self.ignore_case = ignore_case
+        self.values = {(keyword.lower() if ignore_case else keyword): value for keyword, value in keywords.items() if keyword}
+
+        root = {}
+        for keyword in self.values:
+            node = root
+            for char in keyword:
+                node = node.setdefault(char, {})
+            node[""] = True
+        self.pattern = re.compile(_trie_pattern(root) or "(?!)", re.IGNORECASE if ignore_case else 0)
+
+    def _value(self, found):
+        if found is None:
+            return None
+        keyword = found.group()
+        return self.values[keyword.lower() if self.ignore_case else keyword]
+
+    def search(self, text):
+        """The value of the first keyword found anywhere in text, or None."""
+        return self._value(self.pattern.search(text))
+
+    def match(self, text):
+        """The value of the longest keyword text starts with, or None."""
+        return self._value(self.pattern.match(text))
+
+
+class HeadingTable:
+    """
+    Recognized section headings, {heading: section title}. By default a
+    line is a heading when, lowercased and without trailing colons, it is
+    one of the headings; with prefix=True it only has to start with one
+    (the longest that fits), so "Skills: Python, SQL" opens Skills. With
+    ignore_case=False the headings are matched exactly as written.
+    """
+
+    def __init__(self, titles, prefix=False, ignore_case=True):
+        self.ignore_case = ignore_case
+        self.titles = {(heading.lower() if ignore_case else heading): title for heading, title in titles.items()}
+        self.prefix = prefix
+        self._trie = KeywordTrie(self.titles, ignore_case=ignore_case)
+
+    def match(self, line):
+        """The section title line opens, or None."""
+        if not self.prefix:
+            return self.titles.get((line.lower() if self.ignore_case else line).rstrip(":"))
+        return self._trie.match(line)
+
+
+# Headings of the optimized resume text the HTML renderer lays out
+HTML_HEADINGS = HeadingTable({
+    "summary": "Summary",
+    "skills": "Skills",
+    "technical skills": "Technical Skills",
+    "technical experience": "Technical Skills",   # If GPT sometimes calls it “Technical Experience”
+    "experience": "Experience",
+    "leadership": "Leadership Experience",
+    "leadership roles": "Leadership Experience",
+    "leadership experience": "Leadership Experience",
+    "volunteer": "Volunteer Experience",
+    "volunteer work": "Volunteer Experience",
+    "volunteer experience": "Volunteer Experience",
+    "projects": "Projects",
+    "education": "Education",
+    "certifications": "Certifications",
+    "activities": "Activities",
+    "awards": "Awards",
+})
+
+# Sections of the LaTeX template, keyed as LATEX_ENTRY_RULES. A line
+# opens one when it starts with a heading in capitals or title case
+# ("skills" in lower case is not a heading)
+LATEX_HEADINGS = HeadingTable({
+    "EDUCATION": "education",
+    "Education": "education",
+    "EXPERIENCE": "experience",
+    "Experience": "experience",
+    "PROJECTS": "projects",
+    "Projects": "projects",
+    "SKILLS": "skills",
+    "Skills": "skills",
+    "TECHNICAL SKILLS": "skills",
+    "Technical Skills": "skills",
+    "LEADERSHIP": "leadership",
+    "Leadership": "leadership",
+    "CERTIFICATIONS": "certifications",
+    "Certifications": "certifications",
+}, prefix=True, ignore_case=False)
+
+# Keywords that start an entry or fill in its fields (case-insensitive
+# unless noted)
+JOB_TITLES = KeywordTrie(["MANAGER", "DEVELOPER", "ENGINEER", "INTERN", "CAPTAIN", "LEADER", "PRESIDENT"], ignore_case=True)
+SCHOOLS_AND_DEGREES = KeywordTrie(["UNIVERSITY", "COLLEGE", "SCHOOL", "BACHELOR", "MASTER", "PHD", "DIPLOMA"], ignore_case=True)
+LOCATIONS = KeywordTrie(["WATERLOO", "TORONTO", "ONTARIO", "UAE"], ignore_case=True)
+# Case-sensitive: a degree or award line under an education entry
+DEGREE_MARKERS = KeywordTrie(["Recipient", "Scholar", "Honours", "Bachelor"])
+# Case-sensitive: bullets that are really stray section names
+SECTION_NAMES = KeywordTrie(["Education", "Experience", "Projects", "Skills", "Leadership", "Certifications"])
+
+
+def _take_date(entry, header):
+    """Move an entry header's date into entry.date and return the rest of the header."""
+    date_match = DATE_PATTERN.search(header)
+    if date_match:
+        entry.date = date_match.group(0).strip("()")
+        header = PARENTHESES_PATTERN.sub("", header).strip()  # Remove date in parentheses
+        header = header.replace(date_match.group(0), "").strip()  # Remove other date format
+    return header
+
+
+def _unbullet(line):
+    return line[1:].strip() if line.startswith("•") else line
+
+
+def _entry_bullets(lines):
+    """Bullets of an entry: every line without its bullet mark, skipping stray section names."""
+    bullets = []
+    for line in lines:
+        bullet = line.lstrip("•").lstrip("-").strip()
+        if bullet and SECTION_NAMES.search(bullet) is None:
+            bullets.append(Bullet(bullet))
+    return bullets
+
+
+def build_education(lines):
+    """Institution (title), degree (details), location and date of an education entry."""
+    entry = Entry()
+    parts = [part.strip() for part in EDUCATION_SPLIT_PATTERN.split(_take_date(entry, lines[0])) if part.strip()]
+    if parts:
+        entry.title = parts[0]
+    for part in parts:
+        if LOCATIONS.search(part):
+            entry.location = part
+            break
+
+    for line in lines[1:]:
+        if line.startswith(BULLET_MARKS):
+            entry.bullets.append(Bullet(line.strip("• ").strip("- ").strip()))
+        elif DEGREE_MARKERS.search(line):
+            entry.details = line
+
+    if not entry.location and LOCATIONS.search(entry.title):
+        entry.location = "Waterloo, ON" if "WATERLOO" in entry.title.upper() else "UAE"
+    return entry
+
+
+def build_experience(lines):
+    """
+    Title, organization, location and date of a job. The header's parts
+    are title, organization, then anything else; the first later part
+    naming a known location is the location and the parts after it join
+    the organization (all of them do if there is no location).
+    """
+    entry = Entry()
+    parts = [part.strip() for part in HEADER_SPLIT_PATTERN.split(_take_date(entry, lines[0])) if part.strip()]
+    if parts:
+        entry.title = parts[0]
+    if len(parts) > 1:
+        if LOCATIONS.search(parts[1]):
+            entry.location = parts[1]
+            entry.organization = ", ".join(parts[2:])
+        else:
+            rest = parts[2:]
+            for position in range(2, len(parts)):
+                if LOCATIONS.search(parts[position]):
+                    entry.location = parts[position]
+                    rest = parts[position + 1:]
+                    break
+            entry.organization = ", ".join([parts[1]] + rest)
+    entry.bullets = _entry_bullets(lines[1:])
+    return entry
+
+
+def build_project(lines):
+    """Name (title), technologies (details) and date of a project; the date defaults to 2024."""
+    entry = Entry(date="2024")
+    header = lines[0]
+    date_match = PARENTHESES_PATTERN.search(header)
+    if date_match:
+        entry.date = date_match.group(1).strip()
+        header = PARENTHESES_PATTERN.sub("", header).strip()
+
+    if "|" in header:
+        parts = [part.strip() for part in header.split("|")]
+        entry.title = parts[0]
+        entry.details = " | ".join(parts[1:])
+    elif ":" in header:
+        name, technologies = header.split(":", 1)
+        entry.title = name.strip()
+        entry.details = technologies.strip()
+    else:
+        entry.title = header
+
+    for line in lines[1:]:
+        bullet = line.lstrip("•").lstrip("-").strip()
+        if bullet:
+            entry.bullets.append(Bullet(bullet))
+    return entry
+
+
+def build_leadership(lines):
+    """Like build_experience, but the date stays in the header and a second part is always the organization."""
+    entry = Entry()
+    parts = HEADER_SPLIT_PATTERN.split(lines[0])
+    entry.title = parts[0].strip()
+    if len(parts) >= 2:
+        entry.organization = parts[1].strip()
+    date_match = DATE_PATTERN.search(lines[0])
+    if date_match:
+        entry.date = date_match.group(0).strip("()")
+
+    for position in range(2, len(parts)):
+        if LOCATIONS.search(parts[position]):
+            entry.location = parts[position].strip()
+            if position + 1 < len(parts):
+                entry.organization += ", " + ", ".join(parts[position + 1:])
+            break
+    else:
+        if len(parts) > 2:
+            entry.organization += ", " + ", ".join(parts[2:])
+    entry.bullets = _entry_bullets(lines[1:])
+    return entry
+
+
+def build_skill_group(lines):
+    """A "Category: skill, skill" line and its continuation lines, with the skills as bullets."""
+    category, items = _unbullet(lines[0]).split(":", 1)
+    skills = SKILL_PATTERN.findall(items)
+    for line in lines[1:]:
+        skills.extend(SKILL_PATTERN.findall(_unbullet(line)))
+    bullets = [Bullet(skill.strip()) for skill in skills if skill.strip()]
+    return Entry(title=category.strip(), bullets=bullets) if bullets else None
+
+
+def merge_skill_groups(entries):
+    """One entry per skill category; a repeated category adds to the first."""
+    groups = {}
+    for entry in entries:
+        if entry.title in groups:
+            groups[entry.title].bullets.extend(entry.bullets)
+        else:
+            groups[entry.title] = entry
+    return list(groups.values())
+
+
+def build_certification(lines):
+    line = _unbullet(lines[0])
+    return Entry(title=line) if line else None
+
+
+class EntryRule:
+    """
+    How the lines of one kind of section group into entries. A line
+    starting with one of bullet_marks belongs to the entry being read
+    (and is dropped before the first one); a line for which opens(line)
+    is true starts a new entry; any other line continues the current
+    entry, or starts one if orphans is true. build turns an entry's lines
+    into an Entry (or None), and merge, if set, tidies a finished
+    section's entries.
+    """
+
+    __slots__ = ("build", "opens", "bullet_marks", "orphans", "merge")
+
+    def __init__(self, build, opens=None, bullet_marks=(), orphans=True, merge=None):
+        self.build = build
+        self.opens = opens
+        self.bullet_marks = bullet_marks
+        self.orphans = orphans
+        self.merge = merge
+
+
+# How each section of the LaTeX template is split into entries
+LATEX_ENTRY_RULES = {
+    "education": EntryRule(build_education, opens=SCHOOLS_AND_DEGREES.search, bullet_marks=BULLET_MARKS),
+    "experience": EntryRule(build_experience, opens=JOB_TITLES.search, bullet_marks=BULLET_MARKS),
+    "projects": EntryRule(build_project, opens=lambda line: "|" in line or ":" in line, bullet_marks=BULLET_MARKS),
+    "skills": EntryRule(build_skill_group, opens=lambda line: ":" in line, orphans=False, merge=merge_skill_groups),
+    # The whole section is one entry: a header line, then its bullets
+    "leadership": EntryRule(build_leadership),
+    "certifications": EntryRule(build_certification, opens=lambda line: True),
+}
+
+
+def _finish_section(section, rule, group):
+    if group is not None:
+        entry = rule.build(group)
+        if entry is not None:
+            section.entries.append(entry)
+    if rule.merge is not None:
+        section.entries = rule.merge(section.entries)
+
+
+def scan_resume(text, headings=HTML_HEADINGS, entry_rules=None, first_line_name=False, keep_last=()):
+    """
+    Split resume text into a Resume: the candidate's name, contact
+    details and sections, in one pass over its lines. With entry_rules
+    ({section title: EntryRule}), those sections' entries are parsed in
+    the same pass.
+
+    The name is the first line of more than one word, or with
+    first_line_name the first line, whatever it holds. Each contact field
+    keeps its first match in the text, except the fields in keep_last,
+    which keep the first match on the last line that has one. A section
+    runs from its heading to the next recognized heading; lines before
+    the first heading belong to no section, and a repeated heading starts
+    its section over.
+    """
+    name = ""
+    contact = Contact()
+    keep_last = frozenset(keep_last)
+    wanted = set(CONTACT_FIELDS)
+    sections = {}
+    current = None
+    rule = None
+    group = None  # lines of the entry being read
+
+    for line in text.split("\n"):
+        line = line.strip()
+        if not line:
+            continue
+
+        if wanted:
+            found = set()
+            for match in CONTACT_PATTERN.finditer(line):
+                kind = match.lastgroup
+                if kind in wanted and kind not in found:
+                    value = match.group(kind)
+                    if kind in ("linkedin", "github"):
+                        value = "https://www." + value
+                    setattr(contact, kind, value)
+                    found.add(kind)
+            wanted -= found - keep_last
+
+        if not name:
+            if first_line_name:
+                name = line
+            elif len(line.split()) > 1:
+                name = line
+                continue
+
+        title = headings.match(line)
+        if title is not None:
+            if rule is not None:
+                _finish_section(current, rule, group)
+            current = sections[title] = Section(title, line)
+            rule = entry_rules.get(title) if entry_rules else None
+            group = None
+        elif current is not None:
+            current.lines.append(line)
+            if rule is None:
+                continue
+            if rule.bullet_marks and line.startswith(rule.bullet_marks):
+                if group is not None:
+                    group.append(line)
+            elif rule.opens is not None and rule.opens(line):
+                if group is not None:
+                    entry = rule.build(group)
+                    if entry is not None:
+                        current.entries.append(entry)
+                group = [line]
+            elif group is not None:
+                group.append(line)
+            elif rule.orphans:
+                group = [line]
+
+    if rule is not None:
+        _finish_section(current, rule, group)
+    return Resume(name, contact, sections)
+
+
+def scan_latex_resume(text, entry_rules=LATEX_ENTRY_RULES):
+    """
+    scan_resume as the LaTeX converter has always read resumes: the name
+    is the first line, headings are LATEX_HEADINGS and every contact field
+    keeps its match on the last line that has one.
+    """
+    return scan_resume(text, LATEX_HEADINGS, entry_rules, first_line_name=True, keep_last=CONTACT_FIELDS)
@@ -0,0 +1,616 @@
+import contextlib
+import hashlib
+import marshal
+import os
+import re
+import struct
+import threading
+import time
+import zlib
+from array import array
+
+import numpy as np
+
+from ats_scorer import tokenize
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process locking, keep to one process
+    fcntl = None
+
+# Where the index lives on disk (override with environment variables)
+SEARCH_INDEX_DIR = os.getenv("SEARCH_INDEX_DIR", "data/search_index")
+# Fold the journal into a fresh snapshot after this many journaled updates
+COMPACT_EVERY = int(os.getenv("SEARCH_INDEX_COMPACT_EVERY", "1000"))
+
+SNAPSHOT_FILE = "index.snapshot"
+JOURNAL_FILE = "index.journal"
+LOCK_FILE = "index.lock"
+# The text of each indexed document, one file per key, so results stay
+# readable after the upload itself is deleted
+TEXT_FOLDER = "texts"
+# Journal records are a 4-byte length followed by zlib-compressed marshal data
+RECORD_HEADER = struct.Struct("<I")
+
+# Keyword terms from extract_keywords are indexed under this prefix (no positions)
+KEYWORD_PREFIX = "kw:"
+# Occurrences are stored as (document, position) packed into one integer
+POSITION_BITS = 24
+MAX_POSITION = (1 << POSITION_BITS) - 1
+
+QUERY_PATTERN = re.compile(r'(-?)"([^"]*)"|(\S+)')
+
+
+class SearchIndex:
+    """
+    Positional inverted index over resume text.
+
+    Every term maps to two arrays: the ids of the documents it occurs in,
+    and one (doc id << POSITION_BITS | position) key per occurrence. Ids
+    are handed out in order, so both arrays stay sorted as new documents
+    are appended to them; indexing an upload never rebuilds anything, and
+    replacing or deleting a document just marks its old id as deleted.
+
+    On disk the index is a compressed snapshot plus an append-only journal
+    of the updates since; loading reads the snapshot and replays the
+    journal, and compact() folds the journal into a new snapshot, dropping
+    deleted documents. A copy of each document's text is kept next to the
+    index (see text()). With no directory the index lives in memory only.
+
+    Every document has an owner (see near_dup.owner_key), and search()
+    can be limited to one owner's documents.
+
+    Several processes (e.g. web workers) can share one directory: updates
+    and compaction hold an exclusive flock on index.lock, reads a shared
+    one, and each first replays whatever the other processes journaled
+    (or reloads a snapshot another process compacted) since it last looked.
+    """
+
+    def __init__(self, directory=None, compact_every=COMPACT_EVERY):
+        self.directory = directory
+        self.compact_every = compact_every
+        self._lock = threading.RLock()
+        self._reset()
+        self._lock_file = None
+        self._texts = {}  # In-memory index only
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            self._lock_file = open(os.path.join(directory, LOCK_FILE), "a+b")
+            with self._synced(exclusive=True):
+                pass
+
+    def _reset(self):
+        self.docs = []
+        self.deleted = set()
+        self.by_key = {}
+        # {(owner, sha256): doc id} and {owner: doc ids}
+        self.by_sha256 = {}
+        self.by_owner = {}
+        self.postings = {}
+        self._journaled = 0
+        self._journal_offset = 0
+        self._snapshot_stamp = None
+        self._alive_mask = None
+
+    # ---- updates -------------------------------------------------------
+
+    def add(self, key, text, keywords=(), sha256=None, owner="", name=None):
+        """
+        Index (or re-index) the document stored under key and keep a copy
+        of its text. keywords are extra terms such as extract_keywords
+        output; they are searchable as "kw:<keyword>". name is what to
+        show for the document, e.g. the uploaded file's name.
+        """
+        with self._synced(exclusive=True):
+            record = {
+                "key": key,
+                "sha256": sha256,
+                "owner": owner,
+                "name": name or key,
+                "indexed_at": time.time(),
+                "chars": len(text),
+            }
+            keywords = [keyword.lower() for keyword in keywords]
+            self._write_text(key, text)
+            self._journal(("add", record, text, keywords))
+            self._apply_add(record, text, keywords)
+            self._maybe_compact()
+
+    def remove(self, key):
+        """Drop the document stored under key from search results, with its text."""
+        with self._synced(exclusive=True):
+            if key not in self.by_key:
+                return
+            self._journal(("remove", key))
+            self._apply_remove(key)
+            self._write_text(key, None)
+            self._maybe_compact()
+
+    def get(self, key):
+        """The stored record for key ({"key", "sha256", "owner", "name", "indexed_at", "chars"}), or None."""
+        with self._synced():
+            doc_id = self.by_key.get(key)
+            return dict(self.docs[doc_id]) if doc_id is not None else None
+
+    def text(self, key):
+        """The text indexed under key, or None if key is not indexed."""
+        with self._synced():
+            if key not in self.by_key:
+                return None
+            if not self.directory:
+                return self._texts.get(key)
+            try:
+                with open(self._text_path(key), encoding="utf-8") as f:
+                    return f.read()
+            except FileNotFoundError:
+                return None
+
+    def owned(self, owner, limit=None):
+        """Records of owner's documents, newest first (at most limit of them)."""
+        with self._synced():
+            doc_ids = np.flatnonzero(self._owner_mask(owner) & self._alive())
+            newest = doc_ids[::-1][:limit]
+            return [dict(self.docs[doc_id]) for doc_id in newest]
+
+    def find_sha256(self, sha256, owner=""):
+        """The record of a document of owner's with these file contents, or None."""
+        with self._synced():
+            doc_id = self.by_sha256.get((owner, sha256))
+            return dict(self.docs[doc_id]) if doc_id is not None else None
+
+    def _text_path(self, key):
+        # Keys are caller-chosen, so name the file after a hash of the key
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, TEXT_FOLDER, digest[:2], digest + ".txt")
+
+    def _write_text(self, key, text):
+        # Only the process making the update touches the file; the others
+        # see it through text() once they have replayed the update
+        if not self.directory:
+            if text is None:
+                self._texts.pop(key, None)
+            else:
+                self._texts[key] = text
+            return
+        path = self._text_path(key)
+        if text is None:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(path)
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+
+    def _apply_add(self, record, text, keywords):
+        if record["key"] in self.by_key:
+            self._apply_remove(record["key"])
+
+        doc_id = len(self.docs)
+        self.docs.append(record)
+        self._index_record(doc_id, record)
+
+        base = doc_id << POSITION_BITS
+        occurrences = {}
+        for position, token in enumerate(tokenize(text)):
+            occurrences.setdefault(token, []).append(base | min(position, MAX_POSITION))
+        for keyword in keywords:
+            occurrences.setdefault(KEYWORD_PREFIX + keyword, [])
+
+        for term, keys in occurrences.items():
+            entry = self.postings.get(term)
+            if entry is None:
+                entry = self.postings[term] = (array("I"), array("Q"))
+            entry[0].append(doc_id)
+            entry[1].extend(keys)
+
+    def _index_record(self, doc_id, record):
+        owner = record.get("owner", "")
+        self.by_key[record["key"]] = doc_id
+        if record["sha256"]:
+            self.by_sha256[(owner, record["sha256"])] = doc_id
+        self.by_owner.setdefault(owner, array("I")).append(doc_id)
+
+    def _apply_remove(self, key):
+        doc_id = self.by_key.pop(key)
+        self.deleted.add(doc_id)
+        sha256_key = (self.docs[doc_id].get("owner", ""), self.docs[doc_id]["sha256"])
+        if sha256_key[1] and self.by_sha256.get(sha256_key) == doc_id:
+            del self.by_sha256[sha256_key]
+        self._alive_mask = None
+
+    # ---- queries -------------------------------------------------------
+
+    def search(self, query, limit=20, owner=None):
+        """
+        Run a query and return (total matches, records of the first limit
+        matches, newest first). With owner, only that owner's documents
+        can match.
+
+        Words must all appear (AND); "OR" between groups of words matches
+        either group; a leading "-" or NOT excludes a word or phrase;
+        "double quoted words" must appear next to each other in order; and
+        kw:term matches an indexed keyword. Matching ignores case.
+        """
+        clauses = parse_query(query)
+        with self._synced():
+            if not clauses:
+                return 0, []
+            # Document sets are boolean masks over doc ids, so AND, OR and
+            # NOT are single vectorized operations
+            matches = np.zeros(len(self.docs), dtype=bool)
+            for clause in clauses:
+                matches |= self._match_clause(clause)
+            matches &= self._alive()
+            if owner is not None:
+                matches &= self._owner_mask(owner)
+
+            doc_ids = np.flatnonzero(matches)
+            newest = doc_ids[::-1][:limit]
+            return len(doc_ids), [dict(self.docs[doc_id]) for doc_id in newest]
+
+    def _alive(self):
+        if self._alive_mask is None or len(self._alive_mask) != len(self.docs):
+            alive = np.ones(len(self.docs), dtype=bool)
+            alive[sorted(self.deleted)] = False
+            self._alive_mask = alive
+        return self._alive_mask
+
+    def _owner_mask(self, owner):
+        mask = np.zeros(len(self.docs), dtype=bool)
+        doc_ids = self.by_owner.get(owner)
+        if doc_ids is not None:
+            mask[np.frombuffer(doc_ids, dtype=np.uint32)] = True
+        return mask
+
+    def _match_clause(self, clause):
+        required, excluded = clause
+        mask = np.ones(len(self.docs), dtype=bool)
+        for item in required:
+            mask &= self._match_item(item)
+        for item in excluded:
+            mask &= ~self._match_item(item)
+        return mask
+
+    def _match_item(self, item):
+        # item is a tuple of terms: one for a word, several for a phrase
+        mask = self._doc_mask(item[0])
+        if len(item) == 1:
+            return mask
+        for term in item[1:]:
+            mask &= self._doc_mask(term)
+        if not mask.any():
+            return mask
+
+        # Start from the rarest word's occurrences in the candidate
+        # documents, then keep the phrase starts that every other word lines
+        # up with. Occurrence keys are sorted, so each check is a binary search.
+        anchor = min(range(len(item)), key=lambda i: len(self.postings[item[i]][1]))
+        keys = self._occurrence_keys(item[anchor])
+        keys = keys[mask[keys >> POSITION_BITS]]
+        starts = keys - anchor
+        for offset, term in enumerate(item):
+            if offset == anchor or not len(starts):
+                continue
+            keys = self._occurrence_keys(term)
+            wanted = starts + offset
+            found = np.minimum(np.searchsorted(keys, wanted), len(keys) - 1)
+            starts = starts[keys[found] == wanted]
+
+        phrase_mask = np.zeros(len(self.docs), dtype=bool)
+        phrase_mask[(starts >> POSITION_BITS).astype(np.intp)] = True
+        return phrase_mask
+
+    def _doc_mask(self, term):
+        mask = np.zeros(len(self.docs), dtype=bool)
+        entry = self.postings.get(term)
+        if entry is not None:
+            mask[np.frombuffer(entry[0], dtype=np.uint32)] = True
+        return mask
+
+    def _occurrence_keys(self, term):
+        # Keys stay far below 2**63, so read them as signed without copying
+        return np.frombuffer(self.postings[term][1], dtype=np.int64)
+
+    # ---- persistence ---------------------------------------------------
+
+    def compact(self):
+        """Write a fresh snapshot without the deleted documents and empty the journal."""
+        if not self.directory:
+            return
+        with self._synced(exclusive=True):
+            self._compact()
+
+    def stats(self):
+        with self._synced():
+            return {
+                "documents": len(self.docs) - len(self.deleted),
+                "deleted": len(self.deleted),
+                "terms": len(self.postings),
+                "journaled_updates": self._journaled,
+            }
+
+    @contextlib.contextmanager
+    def _synced(self, exclusive=False):
+        # Hold the thread lock and the directory's file lock, with every
+        # update other processes made since we last looked applied
+        with self._lock:
+            if self._lock_file is None:
+                yield
+                return
+            if fcntl is not None:
+                fcntl.flock(self._lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                self._refresh(repair=exclusive)
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+
+    def _drop_deleted(self):
+        # Renumber the live documents 0..n-1 and drop the deleted ones from
+        # every posting list; ids keep their order, so the arrays stay sorted
+        alive = self._alive()
+        new_ids = np.cumsum(alive, dtype=np.int64) - 1
+        postings = {}
+        for term, (doc_ids, keys) in self.postings.items():
+            doc_ids = np.frombuffer(doc_ids, dtype=np.uint32)
+            doc_ids = doc_ids[alive[doc_ids]]
+            if not len(doc_ids):
+                continue
+            keys = np.frombuffer(keys, dtype=np.int64)
+            key_docs = keys >> POSITION_BITS
+            kept = alive[key_docs]
+            keys = (new_ids[key_docs[kept]] << POSITION_BITS) | (keys[kept] & MAX_POSITION)
+            entry = postings[term] = (array("I"), array("Q"))
+            entry[0].frombytes(new_ids[doc_ids].astype(np.uint32).tobytes())
+            entry[1].frombytes(keys.astype(np.uint64).tobytes())
+        self.postings = postings
+        self.docs = [doc for doc_id, doc in enumerate(self.docs) if alive[doc_id]]
+        self.deleted = set()
+        self._reindex_records()
+        self._alive_mask = None
+
+    def _reindex_records(self):
+        # Rebuild the key, sha256 and owner maps from the live documents
+        self.by_key = {}
+        self.by_sha256 = {}
+        self.by_owner = {}
+        for doc_id, doc in enumerate(self.docs):
+            if doc_id not in self.deleted:
+                self._index_record(doc_id, doc)
+
+    def _compact(self):
+        # Caller must hold the exclusive file lock
+        if self.deleted:
+            self._drop_deleted()
+        state = {
+            "docs": self.docs,
+            "deleted": sorted(self.deleted),
+            "postings": {
+                term: (entry[0].tobytes(), entry[1].tobytes())
+                for term, entry in self.postings.items()
+            },
+        }
+        snapshot_path = os.path.join(self.directory, SNAPSHOT_FILE)
+        tmp_path = snapshot_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(zlib.compress(marshal.dumps(state), 1))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, snapshot_path)
+        # Everything journaled so far is in the snapshot now
+        open(os.path.join(self.directory, JOURNAL_FILE), "wb").close()
+        self._snapshot_stamp = self._stamp(snapshot_path)
+        self._journal_offset = 0
+        self._journaled = 0
+
+    def _journal(self, record):
+        if not self.directory:
+            return
+        payload = zlib.compress(marshal.dumps(record))
+        with open(os.path.join(self.directory, JOURNAL_FILE), "ab") as f:
+            f.write(RECORD_HEADER.pack(len(payload)) + payload)
+            self._journal_offset = f.tell()
+        self._journaled += 1
+
+    def _maybe_compact(self):
+        if self.directory and self._journaled >= self.compact_every:
+            self._compact()
+
+    @staticmethod
+    def _stamp(path):
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    def _refresh(self, repair=False):
+        # Catch up with the files: reload everything if the snapshot was
+        # replaced (another process compacted), else replay new journal records
+        snapshot_path = os.path.join(self.directory, SNAPSHOT_FILE)
+        stamp = self._stamp(snapshot_path)
+        if stamp != self._snapshot_stamp:
+            self._reset()
+            if stamp is not None:
+                self._read_snapshot(snapshot_path)
+            self._snapshot_stamp = stamp
+        self._replay_journal(repair)
+
+    def _read_snapshot(self, snapshot_path):
+        with open(snapshot_path, "rb") as f:
+            state = marshal.loads(zlib.decompress(f.read()))
+        self.docs = state["docs"]
+        self.deleted = set(state["deleted"])
+        self._reindex_records()
+        for term, (doc_ids, keys) in state["postings"].items():
+            entry = (array("I"), array("Q"))
+            entry[0].frombytes(doc_ids)
+            entry[1].frombytes(keys)
+            self.postings[term] = entry
+
+    def _replay_journal(self, repair):
+        journal_path = os.path.join(self.directory, JOURNAL_FILE)
+        if not os.path.exists(journal_path) or os.path.getsize(journal_path) <= self._journal_offset:
+            return
+        with open(journal_path, "rb") as f:
+            f.seek(self._journal_offset)
+            data = f.read()
+        offset = 0
+        while offset < len(data):
+            start = offset + RECORD_HEADER.size
+            length = RECORD_HEADER.unpack_from(data, offset)[0] if start <= len(data) else None
+            if length is None or start + length > len(data):
+                # Torn write from a crash; the update never completed. Cut it
+                # off (once we may write) so later records are not appended
+                # after the garbage.
+                if repair:
+                    print(f"⚠️ Ignoring a truncated record at the end of {journal_path}")
+                    with open(journal_path, "r+b") as f:
+                        f.truncate(self._journal_offset + offset)
+                break
+            record = marshal.loads(zlib.decompress(data[start:start + length]))
+            if record[0] == "add":
+                self._apply_add(*record[1:])
+            else:
+                self._apply_remove(record[1])
+            self._journaled += 1
+            offset = start + length
+        self._journal_offset += offset
+
+
+def parse_query(query):
+    """
+    Parse a search query into OR-ed clauses of (required, excluded) items,
+    where every item is a tuple of terms (one word, or the words of a
+    phrase).
+    """
+    clauses = []
+    required, excluded = [], []
+    negate_next = False
+    for match in QUERY_PATTERN.finditer(query):
+        negated, phrase, word = match.groups()
+        if word is not None:
+            if word == "OR":
+                if required or excluded:
+                    clauses.append((required, excluded))
+                required, excluded = [], []
+                continue
+            if word == "NOT":
+                negate_next = True
+                continue
+            negated = word.startswith("-") and len(word) > 1
+            if negated:
+                word = word[1:]
+            if word.lower().startswith(KEYWORD_PREFIX):
+                terms = (KEYWORD_PREFIX + word[len(KEYWORD_PREFIX):].lower(),)
+            else:
+                terms = tuple(tokenize(word))
+        else:
+            terms = tuple(tokenize(phrase))
+
+        negated = bool(negated) or negate_next
+        negate_next = False
+        if terms:
+            (excluded if negated else required).append(terms)
+    if required or excluded:
+        clauses.append((required, excluded))
+    return clauses
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_search_index():
+    """Return the process-wide index stored in SEARCH_INDEX_DIR, loading it on first use."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = SearchIndex(SEARCH_INDEX_DIR)
+    return _index
+
+
+# Also index extract_keywords output for uploads (SEARCH_INDEX_KEYWORDS=1).
+# Off by default: it loads spaCy in the web worker and runs it on every
+# upload; `python search_index.py reindex --keywords` adds them offline instead.
+INDEX_KEYWORDS = os.getenv("SEARCH_INDEX_KEYWORDS", "0") == "1"
+
+
+def resume_key(owner, sha256):
+    """The index key of an upload: one document per owner and file contents."""
+    return f"{owner}:{sha256}"
+
+
+def index_resume(key, text, sha256=None, keywords=None, with_keywords=None, owner="", name=None):
+    """
+    Add one resume to the shared index, unless owner already has a file
+    with the same sha256 indexed. Unless keywords are given, they are
+    taken from extract_keywords when with_keywords (default
+    INDEX_KEYWORDS) is on; if the NLP model is unavailable the text is
+    still indexed, just without keyword terms. Returns whether the resume
+    was indexed.
+    """
+    index = get_search_index()
+    if sha256 and index.find_sha256(sha256, owner) is not None:
+        return False
+    with_keywords = INDEX_KEYWORDS if with_keywords is None else with_keywords
+    if keywords is None and with_keywords:
+        try:
+            from parser import extract_keywords
+            keywords = extract_keywords(text)
+        except Exception as e:
+            print(f"⚠️ Indexing {key} without keywords ({str(e)[:80]})")
+    index.add(key, text, keywords or (), sha256, owner, name)
+    return True
+
+
+if __name__ == "__main__":
+    import argparse
+    import glob
+
+    arg_parser = argparse.ArgumentParser(description="Maintain and query the resume search index.")
+    commands = arg_parser.add_subparsers(dest="command", required=True)
+    reindex_parser = commands.add_parser("reindex", help="index PDFs that are new or changed")
+    reindex_parser.add_argument("folders", nargs="*", default=["data/uploads", "../data/uploads"])
+    reindex_parser.add_argument("--keywords", action="store_true", help="also index extract_keywords terms")
+    query_parser = commands.add_parser("query", help="run a search query")
+    query_parser.add_argument("query")
+    query_parser.add_argument("--limit", type=int, default=20)
+    query_parser.add_argument("--owner", help="only this owner key's documents (default: everyone's)")
+    commands.add_parser("stats", help="show index size")
+    commands.add_parser("compact", help="fold the journal into a new snapshot")
+    args = arg_parser.parse_args()
+
+    index = get_search_index()
+    if args.command == "reindex":
+        from parser import extract_text_cached, file_sha256
+
+        added = 0
+        for folder in args.folders:
+            for pdf_path in sorted(glob.glob(os.path.join(folder, "*.pdf"))):
+                key = os.path.basename(pdf_path)
+                sha256 = file_sha256(pdf_path)
+                existing = index.get(key)
+                if existing and existing["sha256"] == sha256:
+                    if not args.keywords:
+                        continue
+                    # Same file, indexed again to pick up its keywords
+                    index.remove(key)
+                if index_resume(key, extract_text_cached(pdf_path), sha256, with_keywords=args.keywords):
+                    added += 1
+        print(f"✅ Indexed {added} new or changed resumes")
+    elif args.command == "query":
+        start = time.perf_counter()
+        total, records = index.search(args.query, limit=args.limit, owner=args.owner)
+        elapsed = (time.perf_counter() - start) * 1000
+        for record in records:
+            print(f"  {record.get('name', record['key'])}  ({time.strftime('%Y-%m-%d %H:%M', time.localtime(record['indexed_at']))})")
+        print(f"🔍 {total} matches in {elapsed:.2f} ms")
+    elif args.command == "compact":
+        index.compact()
+        print("✅ Compacted")
+    print(index.stats())
@@ -0,0 +1,44 @@
+import os
+import sys
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.join(BACKEND_DIR, "benchmarks"))
+
+# Keep retry backoff short so the retry tests do not sleep for seconds
+os.environ.setdefault("LLM_BACKOFF_BASE", "0.01")
+
+
+@pytest.fixture
+def start_server():
+    from fake_openai_server import FakeOpenAIServer
+
+    servers = []
+
+    def start(**options):
+        server = FakeOpenAIServer(**options).start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def make_client():
+    from llm_client import AsyncLLMClient
+
+    clients = []
+
+    def make(server, **options):
+        client = AsyncLLMClient(api_base=server.api_base, api_key="test", **options)
+        clients.append(client)
+        return client
+
+    yield make
+    for client in clients:
+        client.run(client.aclose())
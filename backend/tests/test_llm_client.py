@@ -0,0 +1,93 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from fake_openai_server import CANNED_ANALYSIS
+from llm_client import LLMError
+
+MESSAGES = [{"role": "user", "content": "Analyze this resume."}]
+MODEL = "gpt-4o-mini"
+
+
+def test_chat_returns_message_content(start_server, make_client):
+    server = start_server()
+    client = make_client(server)
+
+    content = client.run(client.chat(MESSAGES, MODEL))
+
+    assert json.loads(content) == CANNED_ANALYSIS
+    assert server.requests == 1
+    assert client.metrics()["successes"] == 1
+
+
+def test_stream_chat_yields_the_whole_message(start_server, make_client):
+    server = start_server(chunk_size=8, chunk_delay=0)
+    client = make_client(server)
+
+    async def collect():
+        return [delta async for delta in client.stream_chat(MESSAGES, MODEL)]
+
+    deltas = asyncio.run(collect())
+
+    assert len(deltas) > 1
+    assert json.loads("".join(deltas)) == CANNED_ANALYSIS
+
+
+def test_chat_times_out(start_server, make_client):
+    server = start_server(delay=1.0)
+    client = make_client(server, max_retries=0)
+
+    with pytest.raises(httpx.TimeoutException):
+        client.run(client.chat(MESSAGES, MODEL, timeout=0.2))
+    assert client.metrics()["failures"] == 1
+
+
+def test_concurrency_is_limited_by_the_semaphore(start_server, make_client):
+    server = start_server(delay=0.2)
+    client = make_client(server, max_concurrency=2)
+
+    async def burst():
+        return await asyncio.gather(*(client.chat(MESSAGES, MODEL) for _ in range(6)))
+
+    results = client.run(burst())
+
+    assert len(results) == 6
+    assert server.requests == 6
+    assert server.max_in_flight == 2
+
+
+def test_server_errors_are_retried(start_server, make_client):
+    server = start_server(fail_first=2, fail_status=503)
+    client = make_client(server, max_retries=3)
+
+    content = client.run(client.chat(MESSAGES, MODEL))
+
+    assert json.loads(content) == CANNED_ANALYSIS
+    assert server.requests == 3
+    assert client.metrics()["retries"] == 2
+
+
+def test_client_errors_are_not_retried(start_server, make_client):
+    server = start_server(fail_first=1, fail_status=400)
+    client = make_client(server, max_retries=3)
+
+    with pytest.raises(LLMError) as error:
+        client.run(client.chat(MESSAGES, MODEL))
+    assert error.value.status_code == 400
+    assert server.requests == 1
+
+
+def test_malformed_stream_chunk_raises_llm_error(start_server, make_client):
+    server = start_server(chunk_size=8, chunk_delay=0, bad_chunk_at=3)
+    client = make_client(server)
+    deltas = []
+
+    async def collect():
+        async for delta in client.stream_chat(MESSAGES, MODEL):
+            deltas.append(delta)
+
+    with pytest.raises(LLMError, match="malformed stream chunk"):
+        asyncio.run(collect())
+    assert len(deltas) == 2
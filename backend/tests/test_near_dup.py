@@ -0,0 +1,143 @@
+import pytest
+
+import near_dup
+from near_dup import NearDupIndex, diff_summary, minhash_signature, owner_key, similarity
+
+RESUME = """Jane Doe
+jane@example.com | 555-123-4567
+Experience
+Senior Software Engineer, Acme Corp, 2019 - present
+Built Flask APIs serving two million requests a day and cut p99 latency by forty percent.
+Led a team of five engineers migrating batch jobs from cron to Airflow on AWS.
+Software Engineer, Initech, 2016 - 2019
+Wrote data pipelines in Python and SQL and maintained the billing service.
+Education
+University of Waterloo, BASc Computer Engineering, 2016
+Skills
+Python, Flask, PostgreSQL, Airflow, AWS, Docker, Kubernetes, React
+"""
+EDITED = RESUME.replace("forty percent", "forty five percent")
+OTHER = """Sam Lee
+Pastry Chef
+Experience
+Head pastry chef at Le Petit Four, running a kitchen of eight cooks and a wholesale bakery line.
+Designed seasonal dessert menus and cut ingredient waste by a fifth.
+Education
+Culinary Institute of America, Baking and Pastry Arts
+"""
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(near_dup, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def make_index(tmp_path, monkeypatch):
+    monkeypatch.setattr(near_dup, "CACHE_FOLDER", str(tmp_path))
+
+    def make(**options):
+        return NearDupIndex(**options)
+
+    return make
+
+
+def test_signature_similarity_tracks_the_text():
+    assert similarity(minhash_signature(RESUME), minhash_signature(RESUME)) == 1.0
+    assert similarity(minhash_signature(RESUME), minhash_signature(EDITED)) >= 0.8
+    assert similarity(minhash_signature(RESUME), minhash_signature(OTHER)) < 0.2
+
+
+def test_near_duplicate_is_found(make_index):
+    index = make_index(threshold=0.8)
+    index.add("original", RESUME, owner="alice")
+
+    matches = index.query(EDITED, owner="alice")
+
+    assert [match["digest"] for match in matches] == ["original"]
+    assert 0.8 <= matches[0]["similarity"] < 1.0
+    assert index.get_text("original", owner="alice") == RESUME
+
+
+def test_unrelated_resume_is_not_matched(make_index):
+    index = make_index(threshold=0.8)
+    index.add("original", RESUME, owner="alice")
+
+    assert index.query(OTHER, owner="alice") == []
+
+
+def test_query_skips_the_excluded_digest(make_index):
+    index = make_index(threshold=0.8)
+    index.add("original", RESUME, owner="alice")
+
+    assert index.query(RESUME, exclude="original", owner="alice") == []
+
+
+def test_other_owners_resumes_never_match(make_index):
+    index = make_index(threshold=0.8)
+    index.add("original", RESUME, owner="alice")
+
+    assert index.query(EDITED, owner="bob") == []
+    assert index.query(EDITED) == []
+    assert index.get_text("original", owner="bob") is None
+
+
+def test_short_client_ids_have_no_owner():
+    assert owner_key("short") == ""
+    assert owner_key(None) == ""
+    assert owner_key("client-0123456789abcdef") == owner_key("  client-0123456789abcdef ")
+    assert owner_key("client-0123456789abcdef") != owner_key("client-0123456789abcdeg")
+
+
+def test_entries_expire_after_the_ttl(make_index, clock):
+    index = make_index(threshold=0.8, ttl=60)
+    index.add("original", RESUME, owner="alice")
+
+    clock.now += 59
+    assert index.query(EDITED, owner="alice")
+
+    clock.now += 2
+    assert index.query(EDITED, owner="alice") == []
+    assert index.get_text("original", owner="alice") is None
+
+    # Expired rows are deleted on the next add
+    index.add("other", OTHER, owner="alice")
+    assert index.stats()["documents"] == 1
+
+
+def test_oldest_entries_are_dropped_beyond_max_entries(make_index, clock):
+    index = make_index(threshold=0.8, ttl=None, max_entries=2)
+    index.add("original", RESUME, owner="alice")
+    clock.now += 1
+    index.add("other", OTHER, owner="alice")
+    clock.now += 1
+    index.add("bobs", EDITED, owner="bob")
+
+    assert index.stats()["documents"] == 2
+    assert index.query(EDITED, owner="alice") == []
+    assert index.get_text("other", owner="alice") == OTHER
+    assert [match["digest"] for match in index.query(RESUME, owner="bob")] == ["bobs"]
+
+
+def test_entries_survive_reopening(make_index):
+    make_index(threshold=0.8).add("original", RESUME, owner="alice")
+
+    assert [match["digest"] for match in make_index(threshold=0.8).query(EDITED, owner="alice")] == ["original"]
+
+
+def test_diff_summary_counts_changed_lines():
+    summary = diff_summary(RESUME, EDITED)
+
+    assert summary["added_lines"] == 1
+    assert summary["removed_lines"] == 1
+    assert any("forty five percent" in line for line in summary["diff"])
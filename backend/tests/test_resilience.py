@@ -0,0 +1,151 @@
+import asyncio
+import time
+
+import pytest
+
+from llm_client import LLMError
+from resilience import CircuitBreaker, CircuitOpenError, RetryBudget
+
+MESSAGES = [{"role": "user", "content": "Analyze this resume."}]
+MODEL = "gpt-4o-mini"
+
+
+def trip(breaker):
+    for _ in range(breaker.failure_threshold):
+        assert breaker.allow()
+        breaker.record_failure()
+
+
+def test_breaker_trips_after_consecutive_failures():
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=60)
+
+    for _ in range(2):
+        breaker.record_failure()
+    assert breaker.state == "closed"
+    assert breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert breaker.open_count == 1
+    assert not breaker.allow()
+
+
+def test_success_resets_the_failure_count():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+
+    assert breaker.state == "closed"
+
+
+def test_breaker_half_opens_after_the_cooldown():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    trip(breaker)
+    assert not breaker.allow()
+
+    time.sleep(0.06)
+
+    assert breaker.allow()
+    assert breaker.state == "half_open"
+    assert breaker.total_open_seconds() >= 0.05
+
+
+def test_half_open_lets_a_single_trial_through():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    trip(breaker)
+
+    assert breaker.allow()
+    assert not breaker.allow()
+
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.allow() and breaker.allow()
+
+
+def test_failed_trial_reopens_the_circuit():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    trip(breaker)
+    time.sleep(0.06)
+
+    assert breaker.allow()
+    breaker.record_failure()
+
+    assert breaker.state == "open"
+    assert breaker.open_count == 2
+    assert not breaker.allow()
+
+
+def test_release_trial_lets_the_next_call_try():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    trip(breaker)
+    assert breaker.allow()
+
+    breaker.release_trial()
+
+    assert breaker.state == "half_open"
+    assert breaker.allow()
+
+
+def test_cancelled_trial_call_releases_the_breaker(start_server, make_client):
+    server = start_server(delay=0.5)
+    client = make_client(server, max_retries=0)
+    client.breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    trip(client.breaker)
+
+    async def cancel_trial():
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(client.chat(MESSAGES, MODEL), timeout=0.1)
+
+    asyncio.run(cancel_trial())
+    time.sleep(0.05)
+
+    # The cancelled call held the only trial; it must not block the next one
+    assert client.run(client.chat(MESSAGES, MODEL))
+    assert client.breaker.state == "closed"
+
+
+def test_open_circuit_fails_fast(start_server, make_client):
+    server = start_server()
+    client = make_client(server)
+    client.breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+    trip(client.breaker)
+
+    with pytest.raises(CircuitOpenError):
+        client.run(client.chat(MESSAGES, MODEL))
+    assert server.requests == 0
+    assert client.metrics()["short_circuited"] == 1
+
+
+def test_retry_budget_refuses_once_spent():
+    budget = RetryBudget(ratio=0.5, minimum=2, maximum=10)
+
+    assert budget.try_spend()
+    assert budget.try_spend()
+    assert not budget.try_spend()
+
+    budget.record_call()
+    assert not budget.try_spend()
+    budget.record_call()
+    assert budget.try_spend()
+
+
+def test_retry_budget_is_capped_at_maximum():
+    budget = RetryBudget(ratio=1, minimum=0, maximum=3)
+
+    for _ in range(10):
+        budget.record_call()
+
+    assert [budget.try_spend() for _ in range(4)] == [True, True, True, False]
+
+
+def test_retries_stop_when_the_budget_is_spent(start_server, make_client):
+    server = start_server(fail_first=10, fail_status=503)
+    client = make_client(server, max_retries=5)
+    client.retry_budget = RetryBudget(ratio=0, minimum=1, maximum=1)
+
+    with pytest.raises(LLMError):
+        client.run(client.chat(MESSAGES, MODEL))
+    assert server.requests == 2
+    assert client.metrics()["retries_denied"] == 1
@@ -0,0 +1,139 @@
+import pytest
+
+import search_index
+from search_index import SearchIndex, index_resume, parse_query, resume_key
+
+RESUMES = {
+    "jane": "Jane Doe. Senior Python engineer, built Flask APIs and data pipelines on AWS.",
+    "raj": "Raj Patel. Java developer with Spring Boot and Kubernetes experience.",
+    "mia": "Mia Chen. Machine learning engineer: Python, PyTorch, computer vision.",
+    "sam": "Sam Lee. Pastry chef and bakery manager; no programming experience.",
+}
+QUERIES = [
+    "python",
+    "python engineer",
+    "python OR java",
+    "engineer -python",
+    "engineer NOT python",
+    '"python engineer"',
+    '"engineer python"',
+    "kw:leadership",
+    "experience OR chef",
+]
+
+
+def fill(index, owner="alice", prefix=""):
+    for key, text in RESUMES.items():
+        keywords = ["leadership"] if key in ("raj", "sam") else []
+        index.add(prefix + key, text, keywords, sha256=f"sha-{key}", owner=owner, name=f"{key}.pdf")
+
+
+def hits(index, query, owner=None):
+    return sorted(record["key"] for record in index.search(query, owner=owner)[1])
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("python", ["jane", "mia"]),
+    ("python engineer", ["jane", "mia"]),
+    ("python flask", ["jane"]),
+    ("python OR java", ["jane", "mia", "raj"]),
+    ("experience -python", ["raj", "sam"]),
+    ("experience NOT chef", ["raj"]),
+    ('"python engineer"', ["jane"]),
+    ('"engineer python"', ["mia"]),
+    ('"python flask"', []),
+    ('"machine learning" OR chef', ["mia", "sam"]),
+    ("kw:leadership", ["raj", "sam"]),
+    ("KW:Leadership -chef", ["raj"]),
+    ("PYTHON", ["jane", "mia"]),
+    ("", []),
+])
+def test_query_operators(query, expected):
+    index = SearchIndex()
+    fill(index)
+
+    assert hits(index, query) == expected
+
+
+def test_parse_query_clauses():
+    assert parse_query('python "machine learning" -java OR NOT chef kw:SQL') == [
+        ([("python",), ("machine", "learning")], [("java",)]),
+        ([("kw:sql",)], [("chef",)]),
+    ]
+
+
+def test_search_is_limited_to_the_owner():
+    index = SearchIndex()
+    fill(index, owner="alice")
+    index.add("bob-jane", RESUMES["jane"], sha256="sha-jane", owner="bob")
+
+    assert hits(index, "python", owner="bob") == ["bob-jane"]
+    assert hits(index, "python", owner="carol") == []
+    assert [record["key"] for record in index.owned("bob")] == ["bob-jane"]
+
+
+def test_journal_is_replayed_after_a_restart(tmp_path):
+    index = SearchIndex(str(tmp_path))
+    fill(index)
+    index.remove("sam")
+    index.add("raj", RESUMES["raj"] + " Now also writes Python.", sha256="sha-raj", owner="alice")
+    expected = {query: hits(index, query) for query in QUERIES}
+
+    reopened = SearchIndex(str(tmp_path))
+
+    assert reopened.stats()["journaled_updates"] == 6
+    assert {query: hits(reopened, query) for query in QUERIES} == expected
+    assert "raj" in hits(reopened, "python")
+    assert reopened.get("sam") is None
+    assert reopened.text("jane") == RESUMES["jane"]
+
+
+def test_updates_from_another_instance_are_seen(tmp_path):
+    writer = SearchIndex(str(tmp_path))
+    reader = SearchIndex(str(tmp_path))
+
+    fill(writer)
+
+    assert hits(reader, "python") == ["jane", "mia"]
+
+
+def test_compaction_keeps_results(tmp_path):
+    index = SearchIndex(str(tmp_path))
+    fill(index)
+    index.remove("raj")
+    fill(index, owner="bob", prefix="bob-")
+    expected = {query: hits(index, query) for query in QUERIES}
+    expected_bob = {query: hits(index, query, owner="bob") for query in QUERIES}
+
+    index.compact()
+
+    stats = index.stats()
+    assert stats["deleted"] == 0
+    assert stats["journaled_updates"] == 0
+    assert {query: hits(index, query) for query in QUERIES} == expected
+    assert {query: hits(index, query, owner="bob") for query in QUERIES} == expected_bob
+
+    reopened = SearchIndex(str(tmp_path))
+    assert {query: hits(reopened, query) for query in QUERIES} == expected
+    assert reopened.find_sha256("sha-mia", owner="alice")["key"] == "mia"
+
+
+def test_automatic_compaction(tmp_path):
+    index = SearchIndex(str(tmp_path), compact_every=3)
+    fill(index)
+
+    assert index.stats()["journaled_updates"] < 3
+    assert hits(SearchIndex(str(tmp_path)), "python") == ["jane", "mia"]
+
+
+def test_index_resume_skips_files_the_owner_already_indexed(tmp_path, monkeypatch):
+    monkeypatch.setattr(search_index, "_index", SearchIndex(str(tmp_path)))
+
+    assert index_resume(resume_key("alice", "abc"), RESUMES["jane"], sha256="abc", keywords=[], owner="alice")
+    assert not index_resume(resume_key("alice", "abc"), RESUMES["jane"], sha256="abc", keywords=[], owner="alice")
+    # The same file uploaded by someone else is theirs to search
+    assert index_resume(resume_key("bob", "abc"), RESUMES["jane"], sha256="abc", keywords=[], owner="bob")
+
+    index = search_index.get_search_index()
+    assert index.stats()["documents"] == 2
+    assert index.find_sha256("abc", owner="alice")["key"] == "alice:abc"
@@ -8,13 +8,18 @@ import { downloadOptimizedResume } from "./api/resumeApi";
 function App() {
   const [resumeData, setResumeData] = useState(null);
   const [isProcessing, setIsProcessing] = useState(false);
+  // Feedback fields streamed in while the upload is still being processed
+  const [partialFeedback, setPartialFeedback] = useState(null);
 
   const handleUploadStart = () => {
     setIsProcessing(true);
+    setResumeData(null);
+    setPartialFeedback(null);
   };
 
   const handleUploadSuccess = (result) => {
     setIsProcessing(false);
+    setPartialFeedback(null);
     if (result && result.ai_feedback) {
       setResumeData({
         ...result.ai_feedback,
@@ -55,12 +60,20 @@ function App() {
           <UploadForm 
             onUploadSuccess={handleUploadSuccess}
             onUploadStart={handleUploadStart}
+            onPartialFeedback={setPartialFeedback}
           />
         </div>
 
         {/* Loading Text */}
         <LoadingText isVisible={isProcessing} />
 
+        {/* Show the feedback generated so far while the rest is on its way */}
+        {isProcessing && partialFeedback && (
+          <div className="animate-border-glow p-6 bg-black border-2 border-yellow-400/60 rounded-lg shadow-lg shadow-yellow-400/20 mb-8">
+            <ResumeFeedback data={partialFeedback} />
+          </div>
+        )}
+
         {/* If we have resumeData from the backend, show the feedback & download button */}
         {resumeData && resumeData.overall_score && (
           <div className="animate-border-glow p-6 bg-black border-2 border-yellow-400 rounded-lg shadow-lg shadow-yellow-400/20">
@@ -4,12 +4,101 @@ const API_BASE_URL = process.env.NODE_ENV === 'production'
   : "http://localhost:10000";                // Local development URL
 
 const TIMEOUT_DURATION = 120000; // 2 minutes timeout
+const POLL_INTERVAL = 2000;       // How often to check on a queued job
+const JOB_TIMEOUT = 600000;       // Give up on a queued job after 10 minutes
 
-export const uploadResume = async (file, jobCategory) => {
+const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+
+// A random id kept in this browser, so the backend only compares an upload
+// with this browser's own earlier uploads (near-duplicate detection)
+const CLIENT_ID_KEY = "resumeClientId";
+const getClientId = () => {
+  try {
+    let clientId = localStorage.getItem(CLIENT_ID_KEY);
+    if (!clientId) {
+      clientId = crypto.randomUUID();
+      localStorage.setItem(CLIENT_ID_KEY, clientId);
+    }
+    return clientId;
+  } catch (e) {
+    return null; // Storage disabled: uploads are simply not compared
+  }
+};
+
+// Poll /jobs/<id>/result until the backend worker finishes the job
+const waitForJob = async (resultUrl) => {
+  const deadline = Date.now() + JOB_TIMEOUT;
+
+  while (Date.now() < deadline) {
+    const response = await fetch(`${API_BASE_URL}${resultUrl}`, {
+      headers: {
+        'Accept': 'application/json',
+      },
+      credentials: 'omit'
+    });
+
+    let data;
+    try {
+      data = await response.json();
+    } catch (e) {
+      console.error('Failed to parse JSON response:', e);
+      data = { error: 'Invalid response from server' };
+    }
+
+    if (response.status === 202) {
+      console.log(`⏳ Job ${data.job_id}: ${data.stage}`);
+      await sleep(POLL_INTERVAL);
+      continue;
+    }
+
+    if (!response.ok) {
+      throw new Error(data.error || `Server error: ${response.status}`);
+    }
+
+    return data;
+  }
+
+  throw new Error("Processing took too long. Please try again in a few moments.");
+};
+
+// Follow /jobs/<id>/events and hand each piece of AI feedback to onPartial
+// as soon as the backend streams it (grouped by category when several were
+// requested). If the connection drops, EventSource reconnects by itself and
+// sends Last-Event-ID, so the backend resumes after the last event seen.
+// Returns a function that stops listening.
+const watchJobEvents = (eventsUrl, onPartial) => {
+  const source = new EventSource(`${API_BASE_URL}${eventsUrl}`);
+  const partial = {};
+
+  source.addEventListener("field", (event) => {
+    const { category, name, value } = JSON.parse(event.data);
+    if (category) {
+      partial[category] = { ...partial[category], [name]: value };
+    } else {
+      partial[name] = value;
+    }
+    onPartial({ ...partial });
+  });
+  source.addEventListener("done", () => source.close());
+  source.addEventListener("failed", () => source.close());
+
+  return () => source.close();
+};
+
+// jobCategory may be an array to analyze the resume for several roles at once;
+// the result then holds one entry per category under `results`
+export const uploadResume = async (file, jobCategory, onPartial) => {
+  let stopWatching = null;
   try {
     const formData = new FormData();
     formData.append("file", file);
-    formData.append("job_category", jobCategory);
+    for (const category of [].concat(jobCategory)) {
+      formData.append("job_category", category);
+    }
+    const clientId = getClientId();
+    if (clientId) {
+      formData.append("client_id", clientId);
+    }
     
     // Debug: Log what's being sent
     console.log("🔍 Debug - File being sent:", file);
@@ -48,7 +137,13 @@ export const uploadResume = async (file, jobCategory) => {
       throw new Error(data.error || `Server error: ${response.status}`);
     }
 
-    return data;
+    // Optionally show feedback fields as they are generated
+    if (onPartial && data.events_url) {
+      stopWatching = watchJobEvents(data.events_url, onPartial);
+    }
+
+    // The upload is processed in the background; wait for the result
+    return await waitForJob(data.result_url);
   } catch (error) {
     console.error("Upload error:", error);
     
@@ -64,6 +159,10 @@ export const uploadResume = async (file, jobCategory) => {
       error: error.message || "Failed to upload resume",
       details: "The server might be starting up or under heavy load. Please try again in a few moments."
     };
+  } finally {
+    if (stopWatching) {
+      stopWatching();
+    }
   }
 };
 
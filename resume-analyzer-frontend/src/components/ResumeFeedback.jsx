@@ -7,12 +7,21 @@ const ResumeFeedback = ({ data }) => {
         Resume Analysis Results
       </h2>
 
-      {/* Score in star */}
-      <div className="star-score">
-        <div className="star-score-content">
-          {data.overall_score}
+      {/* Very long resumes are only partly analyzed */}
+      {data.truncated && (
+        <p className="content-text text-yellow-400/70 italic">
+          {data.truncated.message}
+        </p>
+      )}
+
+      {/* Score in star (streamed feedback may not have it yet) */}
+      {data.overall_score && (
+        <div className="star-score">
+          <div className="star-score-content">
+            {data.overall_score}
+          </div>
         </div>
-      </div>
+      )}
 
       {/* Strengths section */}
       <div>
@@ -20,7 +29,7 @@ const ResumeFeedback = ({ data }) => {
           Strengths
         </h3>
         <ul className="list-disc list-inside space-y-2">
-          {data.strengths.map((strength, index) => (
+          {(data.strengths || []).map((strength, index) => (
             <li key={index} className="content-text text-yellow-400/90 hover:text-yellow-400 transition-colors">
               {strength}
             </li>
@@ -34,7 +43,7 @@ const ResumeFeedback = ({ data }) => {
           Areas for Improvement
         </h3>
         <ul className="list-disc list-inside space-y-2">
-          {data.improvements.map((improvement, index) => (
+          {(data.improvements || []).map((improvement, index) => (
             <li key={index} className="content-text text-yellow-400/90 hover:text-yellow-400 transition-colors">
               {improvement}
             </li>
@@ -48,7 +57,7 @@ const ResumeFeedback = ({ data }) => {
           Actionable Changes
         </h3>
         <ul className="list-disc list-inside space-y-2">
-          {data.actionable_changes.map((change, index) => (
+          {(data.actionable_changes || []).map((change, index) => (
             <li key={index} className="content-text text-yellow-400/90 hover:text-yellow-400 transition-colors">
               {change}
             </li>
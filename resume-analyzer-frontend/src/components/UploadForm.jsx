@@ -2,7 +2,7 @@
 import { useState } from "react";
 import { uploadResume } from "../api/resumeApi";
 
-const UploadForm = ({ onUploadSuccess, onUploadStart }) => {
+const UploadForm = ({ onUploadSuccess, onUploadStart, onPartialFeedback }) => {
   const [selectedFile, setSelectedFile] = useState(null);
   const [jobRole, setJobRole] = useState("");
   const [loading, setLoading] = useState(false);
@@ -32,7 +32,12 @@ const UploadForm = ({ onUploadSuccess, onUploadStart }) => {
     onUploadStart();
 
     try {
-      const result = await uploadResume(selectedFile, jobRole);
+      const result = await uploadResume(selectedFile, jobRole, (partial) => {
+        setUploadStatus("Analyzing resume...");
+        if (onPartialFeedback) {
+          onPartialFeedback(partial);
+        }
+      });
 
       if (result.error) {
         setError(result.error);